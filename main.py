@@ -7,6 +7,7 @@ from PyQt5.QtWidgets import (
 )
 from tu_paquete.pubGUI import PublisherTab
 from tu_paquete.subGUI import SubscriberTab
+from wamp.loop import network_loop
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -98,6 +99,10 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    # Cierra las sesiones WAMP y el hilo de red al salir
+    app.aboutToQuit.connect(network_loop.stop)
     window = MainWindow()
+    # Después de cerrar las sesiones se detiene el hilo de recepción, que vuelca lo pendiente
+    app.aboutToQuit.connect(window.subscriberTab.pipeline.stop)
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,76 @@
+# src/gui/latencyDialog.py
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView,
+    QPushButton, QFileDialog, QMessageBox
+)
+from PyQt5.QtCore import QTimer
+from wamp.probe import latency_probe, PERCENTILES
+
+class LatencyProbeDialog(QDialog):
+    """
+    Muestra en vivo los histogramas de latencia de la sonda por realm/topic y permite exportarlos.
+    """
+    COLUMNS = ["count", "mean", "min"] + [f"p{p:g}" for p in PERCENTILES] + ["max"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Latencia extremo a extremo (ms)")
+        self.resize(800, 300)
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, 2 + len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(["Realm", "Topic"] + self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        btnLayout = QHBoxLayout()
+        self.btnReset = QPushButton("Reiniciar")
+        self.btnReset.clicked.connect(self.resetHistograms)
+        self.btnExportJson = QPushButton("Exportar JSON")
+        self.btnExportJson.clicked.connect(lambda: self.export("json"))
+        self.btnExportCsv = QPushButton("Exportar CSV")
+        self.btnExportCsv.clicked.connect(lambda: self.export("csv"))
+        btnLayout.addWidget(self.btnReset)
+        btnLayout.addStretch()
+        btnLayout.addWidget(self.btnExportJson)
+        btnLayout.addWidget(self.btnExportCsv)
+        layout.addLayout(btnLayout)
+        self.setLayout(layout)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.refresh()
+
+    def refresh(self):
+        snapshot = sorted(latency_probe.snapshot().items())
+        self.table.setRowCount(len(snapshot))
+        for row, ((realm, topic), summary) in enumerate(snapshot):
+            values = [realm, topic]
+            for column in self.COLUMNS:
+                value = summary[column]
+                if column == "count":
+                    values.append(str(value))
+                else:
+                    values.append("-" if value is None else f"{value * 1000:.3f}")
+            for col, text in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+
+    def resetHistograms(self):
+        latency_probe.reset()
+        self.refresh()
+
+    def export(self, fmt):
+        filters = "JSON Files (*.json)" if fmt == "json" else "CSV Files (*.csv)"
+        filepath, _ = QFileDialog.getSaveFileName(self, "Exportar latencias", "", filters)
+        if not filepath:
+            return
+        try:
+            if fmt == "json":
+                latency_probe.export_json(filepath)
+            else:
+                latency_probe.export_csv(filepath)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo exportar:\n{e}")
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
@@ -0,0 +1,91 @@
+# src/gui/messageModel.py
+from PyQt5.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from wamp.history import DEFAULT_HISTORY, RingBuffer
+
+class MessageTableModel(QAbstractTableModel):
+    """
+    Modelo de tabla sobre un RingBuffer de registros (listas o tuplas cuyas primeras
+    columnas son las que se muestran) u otro historial con la misma interfaz, como
+    MessageStore. La vista solo pide las filas visibles, así que insertar o desplazarse
+    cuesta lo mismo con mil que con un millón de mensajes.
+    """
+    def __init__(self, headers, capacity=DEFAULT_HISTORY, parent=None, records=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.records = records if records is not None else RingBuffer(capacity)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return QVariant()
+        return self.records.cell(index.row(), index.column())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return QVariant()
+
+    def append_records(self, records):
+        """
+        Añade un lote con una sola notificación de inserción; si el historial está lleno,
+        antes se retiran las filas más antiguas. Devuelve la secuencia del primer registro.
+        """
+        records = list(records)[-self.records.capacity:]
+        if not records:
+            return self.records.next_seq
+        overflow = self.records.overflow(len(records))
+        if overflow:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self.records.discard(overflow)
+            self.endRemoveRows()
+        first = len(self.records)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        seq = self.records.next_seq
+        for record in records:
+            self.records.append(record)
+        self.endInsertRows()
+        return seq
+
+    def record(self, row):
+        return self.records[row]
+
+    def update(self, seq, column, value):
+        """
+        Cambia una celda del registro `seq` si sigue en el historial.
+        """
+        row = self.records.index_of(seq)
+        if row is None:
+            return
+        self.records[row][column] = value
+        index = self.index(row, column)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def set_capacity(self, capacity):
+        self.beginResetModel()
+        self.records.resize(capacity)
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.records.clear()
+        self.endResetModel()
+
+def make_message_view(model, on_double_click):
+    """
+    QTableView de solo lectura con filas de altura fija (desplazamiento O(1)).
+    """
+    view = QTableView()
+    view.setModel(model)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 6)
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.doubleClicked.connect(on_double_click)
+    return view
@@ -1,9 +1,13 @@
 import json
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTabWidget,
-    QPlainTextEdit, QTreeWidget, QTreeWidgetItem, QPushButton, QMessageBox, QFileDialog
+    QPlainTextEdit, QTreeWidget, QTreeWidgetItem, QPushButton, QMessageBox, QFileDialog,
+    QSpinBox, QDoubleSpinBox, QComboBox, QCheckBox
 )
 from PyQt5.QtCore import Qt
+from wamp.templates import CompiledTemplate, load_payload, quote_bare_markers
+from wamp.workers import MAX_WORKERS
+from .serializerDialog import SerializerCompareDialog
 
 class PublisherEditorWidget(QWidget):
     def __init__(self, parent=None):
@@ -23,12 +27,59 @@ class PublisherEditorWidget(QWidget):
         self.onDemandRadio = QRadioButton("On-Demand")
         self.programadoRadio = QRadioButton("Programado")
         self.tiempoSistemaRadio = QRadioButton("Tiempo del Sistema")
+        self.cargaRadio = QRadioButton("Carga")
         self.onDemandRadio.setChecked(True)
         timeModeLayout.addWidget(self.onDemandRadio)
         timeModeLayout.addWidget(self.programadoRadio)
         timeModeLayout.addWidget(self.tiempoSistemaRadio)
+        timeModeLayout.addWidget(self.cargaRadio)
+        timeModeLayout.addWidget(QLabel("Repetir cada (s, 0 = no):"))
+        self.repeatSpin = QDoubleSpinBox()
+        self.repeatSpin.setRange(0, 86400)
+        self.repeatSpin.setDecimals(3)
+        timeModeLayout.addWidget(self.repeatSpin)
         layout.addLayout(timeModeLayout)
 
+        # Parámetros del modo Carga (solo visibles con ese modo)
+        self.loadWidget = QWidget()
+        loadLayout = QHBoxLayout(self.loadWidget)
+        loadLayout.setContentsMargins(0, 0, 0, 0)
+        loadLayout.addWidget(QLabel("Tasa (msgs/s):"))
+        self.loadRateSpin = QSpinBox()
+        self.loadRateSpin.setRange(1, 1000000)
+        self.loadRateSpin.setValue(1000)
+        loadLayout.addWidget(self.loadRateSpin)
+        loadLayout.addWidget(QLabel("Duración (s):"))
+        self.loadDurationSpin = QDoubleSpinBox()
+        self.loadDurationSpin.setRange(0, 86400)
+        self.loadDurationSpin.setValue(10)
+        loadLayout.addWidget(self.loadDurationSpin)
+        loadLayout.addWidget(QLabel("Mensajes (0 = sin límite):"))
+        self.loadCountSpin = QSpinBox()
+        self.loadCountSpin.setRange(0, 100000000)
+        loadLayout.addWidget(self.loadCountSpin)
+        loadLayout.addWidget(QLabel("Rampa (s):"))
+        self.loadRampSpin = QDoubleSpinBox()
+        self.loadRampSpin.setRange(0, 3600)
+        loadLayout.addWidget(self.loadRampSpin)
+        self.loadRampCombo = QComboBox()
+        self.loadRampCombo.addItems(["lineal", "escalonada"])
+        loadLayout.addWidget(self.loadRampCombo)
+        loadLayout.addWidget(QLabel("Ráfaga (0 = auto):"))
+        self.loadBurstSpin = QSpinBox()
+        self.loadBurstSpin.setRange(0, 100000)
+        loadLayout.addWidget(self.loadBurstSpin)
+        self.loadAckCheck = QCheckBox("Confirmar (ack)")
+        loadLayout.addWidget(self.loadAckCheck)
+        loadLayout.addWidget(QLabel("Procesos:"))
+        self.loadWorkersSpin = QSpinBox()
+        self.loadWorkersSpin.setRange(1, MAX_WORKERS)
+        self.loadWorkersSpin.setToolTip("Con más de 1, la tasa se reparte entre procesos independientes")
+        loadLayout.addWidget(self.loadWorkersSpin)
+        self.loadWidget.setVisible(False)
+        self.cargaRadio.toggled.connect(self.loadWidget.setVisible)
+        layout.addWidget(self.loadWidget)
+
         # Widget de pestañas para la edición del JSON
         self.tabWidget = QTabWidget()
         
@@ -37,9 +88,18 @@ class PublisherEditorWidget(QWidget):
         jsonLayout = QVBoxLayout()
         loadJsonButton = QPushButton("Cargar JSON desde archivo")
         loadJsonButton.clicked.connect(self.loadJsonFromFile)
-        jsonLayout.addWidget(loadJsonButton)
+        compareButton = QPushButton("Comparar serializadores")
+        compareButton.clicked.connect(self.compareSerializers)
+        jsonButtonsLayout = QHBoxLayout()
+        jsonButtonsLayout.addWidget(loadJsonButton)
+        jsonButtonsLayout.addWidget(compareButton)
+        jsonLayout.addLayout(jsonButtonsLayout)
         self.jsonPreview = QPlainTextEdit()
         self.jsonPreview.setPlainText("{}")
+        self.jsonPreview.setToolTip(
+            "Marcadores por mensaje: {{seq}}, {{now_iso}}, {{now_ms}}, {{uuid}},\n"
+            "{{rand_int(0, 100)}}, {{rand_float(0, 1)}}, {{choice([\"OK\", \"ALARM\"])}}"
+        )
         jsonLayout.addWidget(self.jsonPreview)
         self.jsonTab.setLayout(jsonLayout)
         self.tabWidget.addTab(self.jsonTab, "JSON")
@@ -60,6 +120,51 @@ class PublisherEditorWidget(QWidget):
         layout.addWidget(self.tabWidget)
         self.setLayout(layout)
     
+    def getLoadConfig(self):
+        return {
+            "rate": self.loadRateSpin.value(),
+            "duration": self.loadDurationSpin.value() or None,
+            "count": self.loadCountSpin.value() or None,
+            "ramp_up": self.loadRampSpin.value(),
+            "ramp": self.loadRampCombo.currentText(),
+            "burst": self.loadBurstSpin.value() or None,
+            "acknowledge": self.loadAckCheck.isChecked(),
+            "workers": self.loadWorkersSpin.value(),
+        }
+
+    def setLoadConfig(self, config):
+        self.loadRateSpin.setValue(int(config.get("rate", 1000)))
+        self.loadDurationSpin.setValue(config.get("duration") or 0)
+        self.loadCountSpin.setValue(config.get("count") or 0)
+        self.loadRampSpin.setValue(config.get("ramp_up") or 0)
+        self.loadRampCombo.setCurrentText(config.get("ramp", "lineal"))
+        self.loadBurstSpin.setValue(config.get("burst") or 0)
+        self.loadAckCheck.setChecked(bool(config.get("acknowledge", False)))
+        self.loadWorkersSpin.setValue(min(int(config.get("workers") or 1), MAX_WORKERS))
+
+    def getContent(self):
+        """
+        Contenido del editor como objeto JSON; los marcadores quedan como strings "{{...}}".
+        """
+        return json.loads(quote_bare_markers(self.jsonPreview.toPlainText()))
+
+    def getPayload(self):
+        """
+        Analiza el contenido del editor una sola vez: Payload fijo o CompiledTemplate si lleva
+        marcadores. En ambos casos .value es el contenido tal como se editó.
+        Lanza ValueError si el JSON o algún marcador no son válidos.
+        """
+        return load_payload(self.jsonPreview.toPlainText())
+
+    def compareSerializers(self):
+        try:
+            payload = self.getPayload()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"JSON inválido:\n{e}")
+            return
+        obj = payload.render(0) if isinstance(payload, CompiledTemplate) else payload.obj
+        SerializerCompareDialog(obj, self).exec_()
+
     def loadJsonFromFile(self):
         filepath, _ = QFileDialog.getOpenFileName(self, "Cargar JSON", "", "JSON Files (*.json);;All Files (*)")
         if filepath:
@@ -77,7 +182,7 @@ class PublisherEditorWidget(QWidget):
     def loadTreeFromJson(self):
         self.jsonTree.clear()
         try:
-            data = json.loads(self.jsonPreview.toPlainText())
+            data = self.getContent()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"JSON inválido:\n{e}")
             return
@@ -1,13 +1,24 @@
-import sys, os, json, datetime, logging, asyncio, threading
+import sys, os, json, datetime
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea, QTableWidget,
-    QTableWidgetItem, QHeaderView, QAbstractItemView, QPushButton, QSplitter,
-    QGroupBox, QFormLayout, QMessageBox, QLineEdit, QFileDialog, QComboBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea, QPushButton, QSplitter,
+    QGroupBox, QFormLayout, QMessageBox, QLineEdit, QFileDialog, QComboBox, QCheckBox, QSpinBox
 )
 from PyQt5.QtCore import Qt, QTimer
-from autobahn.asyncio.wamp import ApplicationSession, ApplicationRunner
-from common.utils import log_to_file, JsonDetailDialog
+from wamp.publisher import (
+    start_publisher, send_message_now, schedule_message, start_load, fan_out, FanOutPlan,
+    pause_schedule, resume_schedule, cancel_schedule, schedule_stats,
+    configure_queues, queue_stats
+)
+from wamp.outbound import POLICIES, DEFAULT_CAPACITY
+from wamp.load import LoadProfile
+from wamp.probe import latency_probe
+from wamp.templates import load_payload
+from wamp.serializers import set_realm_serializers
+from wamp.topics import split_topics
+from wamp.traffic import published_traffic
 from .pubEditor import PublisherEditorWidget
+from .pubMessageViewer import PublisherMessageViewer
+from .trafficDialog import TrafficStatsDialog
 
 # --- CONFIGURACIÓN DE REALMS Y TOPICS ---
 # Se espera que el archivo /config/realm_topic_config_pub.json tenga la siguiente estructura:
@@ -39,7 +50,8 @@ def load_realm_topic_config():
             realm_name = realm_info.get("realm", "default")
             REALMS_CONFIG[realm_name] = {
                 "router_url": realm_info.get("router_url", "ws://127.0.0.1:60001"),
-                "topics": realm_info.get("topics", [])
+                "topics": realm_info.get("topics", []),
+                "serializers": set_realm_serializers(realm_name, realm_info.get("serializers"))
             }
         print("Configuración de realms y topics cargada desde", config_path)
     except Exception as e:
@@ -59,82 +71,6 @@ def load_realm_topic_config():
 
 load_realm_topic_config()
 
-global_session = None
-global_loop = None
-
-class JSONPublisher(ApplicationSession):
-    def __init__(self, config, topic):
-        super().__init__(config)
-        self.topic = topic
-    async def onJoin(self, details):
-        global global_session, global_loop
-        global_session = self
-        global_loop = asyncio.get_event_loop()
-        print("Conexión establecida en el publicador (realm:", self.config.realm, ")")
-        await asyncio.Future()
-
-def start_publisher(url, realm, topic):
-    def run():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        runner = ApplicationRunner(url=url, realm=realm)
-        runner.run(lambda config: JSONPublisher(config, topic))
-    threading.Thread(target=run, daemon=True).start()
-
-def send_message_now(topic, message, delay=0):
-    global global_session, global_loop
-    if global_session is None or global_loop is None:
-        print("No hay sesión activa. Inicia el publicador primero.")
-        return
-    async def _send():
-        if delay > 0:
-            await asyncio.sleep(delay)
-        if isinstance(message, dict):
-            global_session.publish(topic, **message)
-        else:
-            global_session.publish(topic, message)
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        message_json = json.dumps(message, indent=2, ensure_ascii=False)
-        log_to_file(timestamp, topic, global_session.config.realm, message_json)
-        logging.info(f"Publicado: {timestamp} | Topic: {topic} | Realm: {global_session.config.realm}")
-        print("Mensaje enviado en", topic, ":", message)
-    asyncio.run_coroutine_threadsafe(_send(), global_loop)
-
-class PublisherMessageViewer(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.pubMessages = []
-        self.initUI()
-        
-    def initUI(self):
-        layout = QVBoxLayout(self)
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        # Columnas: Hora, Realm, Topic
-        self.table.setHorizontalHeaderLabels(["Hora", "Realm", "Topic"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.table.itemDoubleClicked.connect(self.showDetails)
-        layout.addWidget(self.table)
-        self.setLayout(layout)
-
-    def add_message(self, realm, topic, timestamp, details):
-        if isinstance(details, str):
-            details = details.replace("\n", " ")
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        self.table.setItem(row, 0, QTableWidgetItem(timestamp))
-        self.table.setItem(row, 1, QTableWidgetItem(realm))
-        self.table.setItem(row, 2, QTableWidgetItem(topic))
-        self.pubMessages.append(details)
-
-    def showDetails(self, item):
-        row = item.row()
-        if row < len(self.pubMessages):
-            dlg = JsonDetailDialog(self.pubMessages[row], self)
-            dlg.exec_()
-
 class PublisherTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -183,21 +119,110 @@ class PublisherTab(QWidget):
         self.globalStartButton = QPushButton("Iniciar Publicador")
         self.globalStartButton.clicked.connect(self.startPublisher)
         connLayout.addWidget(self.globalStartButton)
+        # Sonda de latencia: añade timestamp y secuencia a los kwargs publicados
+        self.probeCheck = QCheckBox("Sonda de latencia")
+        self.probeCheck.setChecked(latency_probe.enabled)
+        self.probeCheck.toggled.connect(self.setProbeEnabled)
+        connLayout.addWidget(self.probeCheck)
+        self.trafficDialog = None
+        self.trafficButton = QPushButton("Estadísticas")
+        self.trafficButton.clicked.connect(self.showTraffic)
+        connLayout.addWidget(self.trafficButton)
         connGroup.setLayout(connLayout)
         mainLayout.addWidget(connGroup)
 
+        # Grupo de envíos programados del proyecto
+        schedGroup = QGroupBox("Envíos Programados")
+        schedLayout = QHBoxLayout()
+        self.pauseScheduleButton = QPushButton("Pausar")
+        self.pauseScheduleButton.clicked.connect(pause_schedule)
+        self.resumeScheduleButton = QPushButton("Reanudar")
+        self.resumeScheduleButton.clicked.connect(resume_schedule)
+        self.cancelScheduleButton = QPushButton("Cancelar Todos")
+        self.cancelScheduleButton.clicked.connect(cancel_schedule)
+        schedLayout.addWidget(self.pauseScheduleButton)
+        schedLayout.addWidget(self.resumeScheduleButton)
+        schedLayout.addWidget(self.cancelScheduleButton)
+        self.scheduleLabel = QLabel("")
+        schedLayout.addWidget(self.scheduleLabel, stretch=1)
+        schedGroup.setLayout(schedLayout)
+        mainLayout.addWidget(schedGroup)
+
+        # Cola de salida acotada de cada sesión (capacidad y política con la cola llena)
+        queueGroup = QGroupBox("Cola de Salida")
+        queueLayout = QHBoxLayout()
+        queueLayout.addWidget(QLabel("Capacidad:"))
+        self.queueCapacitySpin = QSpinBox()
+        self.queueCapacitySpin.setRange(1, 10000000)
+        self.queueCapacitySpin.setValue(DEFAULT_CAPACITY)
+        self.queueCapacitySpin.valueChanged.connect(self.applyQueueConfig)
+        queueLayout.addWidget(self.queueCapacitySpin)
+        queueLayout.addWidget(QLabel("Si está llena:"))
+        self.queuePolicyCombo = QComboBox()
+        self.queuePolicyCombo.addItems(POLICIES)
+        self.queuePolicyCombo.currentTextChanged.connect(self.applyQueueConfig)
+        queueLayout.addWidget(self.queuePolicyCombo)
+        self.queueLabel = QLabel("")
+        queueLayout.addWidget(self.queueLabel, stretch=1)
+        queueGroup.setLayout(queueLayout)
+        mainLayout.addWidget(queueGroup)
+        self.scheduleTimer = QTimer(self)
+        self.scheduleTimer.timeout.connect(self.updateScheduleStatus)
+        self.scheduleTimer.start(1000)
+
         mainLayout.addWidget(QLabel("Resumen de mensajes enviados:"))
         mainLayout.addWidget(self.viewer)
         self.setLayout(mainLayout)
 
+    def updateScheduleStatus(self):
+        stats = schedule_stats()
+        text = f"Pendientes: {stats['pending']}" + (" (en pausa)" if stats["paused"] else "")
+        if stats["count"]:
+            text += (f" | Jitter p50 {stats['p50'] * 1000:.3f} ms, p99 {stats['p99'] * 1000:.3f} ms,"
+                     f" máx {stats['max'] * 1000:.3f} ms ({stats['count']} envíos)")
+        self.scheduleLabel.setText(text)
+        self.updateQueueStatus()
+
+    def applyQueueConfig(self, *args):
+        configure_queues(self.queueCapacitySpin.value(), self.queuePolicyCombo.currentText())
+
+    def updateQueueStatus(self):
+        stats = queue_stats().values()
+        if not stats:
+            self.queueLabel.setText("")
+            return
+        depth = sum(q["depth"] for q in stats)
+        max_depth = max(q["max_depth"] for q in stats)
+        dropped = sum(q["dropped"] for q in stats)
+        rejected = sum(q["rejected"] for q in stats)
+        direct = sum(q["direct"] for q in stats)
+        waits = [q["queued_p99"] for q in stats if q["queued_p99"] is not None]
+        text = f"En cola: {depth} (máx {max_depth}) | Descartados: {dropped} | Rechazados: {rejected}"
+        if waits:
+            text += f" | Espera p99 {max(waits) * 1000:.1f} ms"
+        if direct:
+            text += f" | Carga directa: {direct}"
+        self.queueLabel.setText(text)
+
+    def setProbeEnabled(self, checked):
+        latency_probe.enabled = checked
+
+    def showTraffic(self):
+        if self.trafficDialog is None:
+            self.trafficDialog = TrafficStatsDialog(published_traffic, "Tráfico publicado por topic", self)
+        self.trafficDialog.show()
+        self.trafficDialog.raise_()
+
     def addMessage(self):
         widget = MessageConfigWidget(self.next_id, parent=self)
         self.msgLayout.addWidget(widget)
         self.msgWidgets.append(widget)
         self.next_id += 1
 
-    def addPublisherLog(self, realm, topic, timestamp, details):
-        self.viewer.add_message(realm, topic, timestamp, details)
+    def addPublisherLog(self, realm, topic, timestamp, details, futures=()):
+        row = self.viewer.add_message(realm, topic, timestamp, details)
+        self.viewer.track(row, futures)
+        return row
 
     def startPublisher(self):
         for widget in self.msgWidgets:
@@ -211,17 +236,31 @@ class PublisherTab(QWidget):
         for widget in self.msgWidgets:
             if not widget.message_sent:
                 config = widget.getConfig()
-                send_message_now(config["topic"], config["content"], delay=0)
+                try:
+                    payload = load_payload(config["content"])
+                except ValueError as e:
+                    print(f"Mensaje {config['id']} no enviado:", e)
+                    continue
+                topics = split_topics(config["topic"])
+                if len(topics) > 1:
+                    future = fan_out(FanOutPlan((config["router_url"], config["realm"], topic) for topic in topics), payload)
+                else:
+                    future = send_message_now(config["topic"], payload, delay=0,
+                                              router_url=config["router_url"], realm=config["realm"])
                 widget.message_sent = True
                 timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                sent_message = json.dumps(config["content"], indent=2, ensure_ascii=False)
-                self.addPublisherLog(config["realm"], config["topic"], timestamp, sent_message)
+                self.addPublisherLog(config["realm"], config["topic"], timestamp, payload, [future])
 
     def getProjectConfig(self):
         scenarios = [widget.getConfig() for widget in self.msgWidgets]
-        return {"scenarios": scenarios}
+        queue = {"capacity": self.queueCapacitySpin.value(), "policy": self.queuePolicyCombo.currentText()}
+        return {"scenarios": scenarios, "queue": queue}
 
     def loadProjectFromConfig(self, pub_config):
+        queue = pub_config.get("queue", {})
+        self.queueCapacitySpin.setValue(queue.get("capacity", DEFAULT_CAPACITY))
+        if queue.get("policy") in POLICIES:
+            self.queuePolicyCombo.setCurrentText(queue["policy"])
         scenarios = pub_config.get("scenarios", [])
         self.msgWidgets = []
         self.next_id = 1
@@ -238,11 +277,18 @@ class PublisherTab(QWidget):
                 json.dumps(scenario.get("content", {}), indent=2, ensure_ascii=False)
             )
             widget.editorWidget.commonTimeEdit.setText(scenario.get("time", "00:00:00"))
+            widget.editorWidget.repeatSpin.setValue(scenario.get("repeat", 0))
+            if scenario.get("serializers"):
+                widget.serializersEdit.setText(", ".join(scenario["serializers"]))
+                widget.applySerializers()
+            widget.editorWidget.setLoadConfig(scenario.get("load", {}))
             mode = scenario.get("mode", "onDemand")
             if mode == "programado":
                 widget.editorWidget.programadoRadio.setChecked(True)
             elif mode == "tiempoSistema":
                 widget.editorWidget.tiempoSistemaRadio.setChecked(True)
+            elif mode == "carga":
+                widget.editorWidget.cargaRadio.setChecked(True)
             else:
                 widget.editorWidget.onDemandRadio.setChecked(True)
             self.msgLayout.addWidget(widget)
@@ -282,6 +328,11 @@ class MessageConfigWidget(QGroupBox):
         super().__init__(parent)
         self.msg_id = msg_id
         self.message_sent = False
+        self.loadRun = None
+        self.loadRow = None
+        self.loadTimer = QTimer(self)
+        self.loadTimer.setInterval(500)
+        self.loadTimer.timeout.connect(self.updateLoadStatus)
         self.setTitle(f"Mensaje #{self.msg_id}")
         self.setCheckable(True)
         self.setChecked(True)
@@ -311,9 +362,16 @@ class MessageConfigWidget(QGroupBox):
         self.urlEdit = QLineEdit("ws://127.0.0.1:60001/ws")
         connLayout.addRow("Router URL:", self.urlEdit)
 
+        # Serializadores del realm (compartidos por todos los mensajes del mismo realm)
+        self.serializersEdit = QLineEdit(", ".join(REALMS_CONFIG.get(self.realmCombo.currentText(), {}).get("serializers") or []))
+        self.serializersEdit.setPlaceholderText("Por defecto (p. ej. msgpack, json)")
+        self.serializersEdit.editingFinished.connect(self.applySerializers)
+        connLayout.addRow("Serializadores:", self.serializersEdit)
+
         self.topicCombo = QComboBox()
         self.topicCombo.setEditable(True)
         self.topicCombo.addItems(REALMS_CONFIG.get(self.realmCombo.currentText(), {}).get("topics", []))
+        self.topicCombo.setToolTip("Varios topics separados por comas para difundir el mismo mensaje")
         connLayout.addRow("Topic:", self.topicCombo)
         connGroup.setLayout(connLayout)
         mainLayout.addWidget(connGroup)
@@ -344,7 +402,8 @@ class MessageConfigWidget(QGroupBox):
             # Se añade un nuevo realm con URL por defecto y sin topics
             REALMS_CONFIG[new_realm] = {
                 "router_url": "ws://127.0.0.1:60001",
-                "topics": []
+                "topics": [],
+                "serializers": None
             }
             self.newRealmEdit.clear()
 
@@ -356,6 +415,17 @@ class MessageConfigWidget(QGroupBox):
         self.topicCombo.setEditable(True)
         router_url = details.get("router_url", "ws://127.0.0.1:60001")
         self.urlEdit.setText(router_url + "/ws")
+        self.serializersEdit.setText(", ".join(details.get("serializers") or []))
+
+    def applySerializers(self):
+        realm = self.realmCombo.currentText()
+        try:
+            serializers = set_realm_serializers(realm, self.serializersEdit.text())
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return False
+        REALMS_CONFIG.setdefault(realm, {"router_url": "ws://127.0.0.1:60001", "topics": []})["serializers"] = serializers
+        return True
 
     def toggleContent(self, checked):
         if not checked:
@@ -365,8 +435,14 @@ class MessageConfigWidget(QGroupBox):
             self.setTitle(f"Mensaje #{self.msg_id}")
 
     def sendMessage(self):
+        if self.loadRun is not None and not self.loadRun.done():
+            self.loadRun.stop()
+            return
         if self.message_sent:
             return
+        if not self.applySerializers():
+            return
+        at = None
         if self.editorWidget.onDemandRadio.isChecked():
             delay = 0
         elif self.editorWidget.programadoRadio.isChecked():
@@ -386,31 +462,91 @@ class MessageConfigWidget(QGroupBox):
             scheduled_time = now.replace(hour=h, minute=m, second=s, microsecond=0)
             if scheduled_time < now:
                 scheduled_time += datetime.timedelta(days=1)
+            # Se programa por hora absoluta; el hilo de red la convierte a su reloj monotónico
+            at = scheduled_time.timestamp()
             delay = (scheduled_time - now).total_seconds()
         else:
             delay = 0
 
-        topic = self.topicCombo.currentText().strip()
+        # Varios topics separados por comas: el mismo mensaje se difunde a todos
+        topics = split_topics(self.topicCombo.currentText())
+        if not topics:
+            QMessageBox.critical(self, "Error", "Indica al menos un topic")
+            return
         try:
-            data = json.loads(self.editorWidget.jsonPreview.toPlainText())
+            data = self.editorWidget.getPayload()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"JSON inválido:\n{e}")
             return
-        
-        from .pubGUI import send_message_now
-        send_message_now(topic, data, delay=delay)
+        if self.editorWidget.cargaRadio.isChecked():
+            if len(topics) > 1:
+                QMessageBox.critical(self, "Error", "La carga se lanza sobre un único topic")
+                return
+            self.startLoad(topics[0], data)
+            return
+
+        router_url, realm = self.urlEdit.text().strip(), self.realmCombo.currentText()
+        repeat = 0 if self.editorWidget.onDemandRadio.isChecked() else self.editorWidget.repeatSpin.value()
+        if at is not None or repeat:
+            futures = [schedule_message(topic, data, delay=delay, at=at, interval=repeat or None,
+                                        router_url=router_url, realm=realm) for topic in topics]
+        elif len(topics) > 1:
+            # Un solo envío por la sesión del realm con todos los topics en paralelo (ver FanOutPlan)
+            futures = [fan_out(FanOutPlan((router_url, realm, topic) for topic in topics), data, delay)]
+        else:
+            futures = [send_message_now(topics[0], data, delay=delay, router_url=router_url, realm=realm)]
         self.message_sent = True
         publish_time = datetime.datetime.now() + datetime.timedelta(seconds=delay)
         publish_time_str = publish_time.strftime("%Y-%m-%d %H:%M:%S")
-        sent_message = json.dumps(data, indent=2, ensure_ascii=False)
+        # El visor recibe el mismo Payload que se publica: no se vuelve a serializar
+        if hasattr(self.parent(), "addPublisherLog"):
+            self.parent().addPublisherLog(realm, ", ".join(topics), publish_time_str, data, futures)
+
+    def startLoad(self, topic, data):
+        load_config = self.editorWidget.getLoadConfig()
+        try:
+            profile = LoadProfile.from_config(load_config)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Parámetros de carga inválidos:\n{e}")
+            return
+        try:
+            self.loadRun = start_load(topic, data, profile, router_url=self.urlEdit.text().strip(),
+                                      realm=self.realmCombo.currentText(), acknowledge=load_config["acknowledge"],
+                                      workers=load_config.get("workers", 1))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo iniciar la carga:\n{e}")
+            return
+        self.message_sent = True
+        self.sendButton.setText("Detener Carga")
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        details = {"action": "carga", "load": profile.to_config(), "content": data.value}
         if hasattr(self.parent(), "addPublisherLog"):
-            self.parent().addPublisherLog(self.realmCombo.currentText(), topic, publish_time_str, sent_message)
+            self.loadRow = self.parent().addPublisherLog(self.realmCombo.currentText(), topic, timestamp, details)
+        self.loadTimer.start()
+
+    def updateLoadStatus(self):
+        run = self.loadRun
+        if run is None:
+            self.loadTimer.stop()
+            return
+        status = "Carga: " + run.stats.summary()
+        if getattr(run, "workers", 1) > 1:
+            status += f" [{run.workers} procesos]"
+        if run.done():
+            self.loadTimer.stop()
+            self.sendButton.setText("Enviar Mensaje")
+            if run.future.exception() is not None:
+                status = f"Carga fallida: {run.future.exception()}"
+        if self.loadRow is not None and hasattr(self.parent(), "viewer"):
+            self.parent().viewer.set_status(self.loadRow, status)
 
     def getConfig(self):
         if self.editorWidget.programadoRadio.isChecked():
             mode = "programado"
         elif self.editorWidget.tiempoSistemaRadio.isChecked():
             mode = "tiempoSistema"
+        elif self.editorWidget.cargaRadio.isChecked():
+            mode = "carga"
         else:
             mode = "onDemand"
         return {
@@ -418,7 +554,10 @@ class MessageConfigWidget(QGroupBox):
             "realm": self.realmCombo.currentText(),
             "router_url": self.urlEdit.text().strip(),
             "topic": self.topicCombo.currentText().strip(),
-            "content": json.loads(self.editorWidget.jsonPreview.toPlainText()),
+            "content": self.editorWidget.getContent(),
             "mode": mode,
-            "time": self.editorWidget.commonTimeEdit.text().strip()
+            "time": self.editorWidget.commonTimeEdit.text().strip(),
+            "repeat": self.editorWidget.repeatSpin.value(),
+            "load": self.editorWidget.getLoadConfig(),
+            "serializers": REALMS_CONFIG.get(self.realmCombo.currentText(), {}).get("serializers")
         }
@@ -1,12 +1,12 @@
 # src/tu_paquete/pubMessageConfigWidget.py
-import json, datetime
+import datetime
 from PyQt5.QtWidgets import (
     QGroupBox, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
     QHeaderView, QMessageBox, QLineEdit, QPushButton, QComboBox
 )
 from PyQt5.QtCore import Qt
 from gui.pubEditor import PublisherEditorWidget
-from gui.wamp.publisher import start_publisher, send_message_now
+from wamp.publisher import FanOutPlan, fan_out
 
 class MessageConfigWidget(QGroupBox):
     def __init__(self, msg_id, parent=None):
@@ -193,16 +193,19 @@ class MessageConfigWidget(QGroupBox):
 
     def sendMessage(self):
         realms = []
+        router_urls = {}
         for r in range(self.realmTable.rowCount()):
             r_item = self.realmTable.item(r, 0)
             if r_item and r_item.checkState() == Qt.Checked:
-                realms.append(r_item.text().strip())
+                realm = r_item.text().strip()
+                realms.append(realm)
+                url_item = self.realmTable.item(r, 1)
+                router_urls[realm] = url_item.text().strip() if url_item else None
         all_topics = {}
         for realm in realms:
             all_topics[realm] = list(self.selected_topics_by_realm.get(realm, []))
-        content_text = self.editorWidget.jsonPreview.toPlainText()
         try:
-            content = json.loads(content_text)
+            payload = self.editorWidget.getPayload()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"JSON inválido:\n{e}")
             return
@@ -215,20 +218,9 @@ class MessageConfigWidget(QGroupBox):
                 delay = h * 3600 + m * 60 + s
             except:
                 delay = 0
-        for realm in realms:
-            router_url = None
-            for r in range(self.realmTable.rowCount()):
-                r_item = self.realmTable.item(r, 0)
-                if r_item and r_item.text().strip() == realm:
-                    router_url = self.realmTable.item(r, 1).text().strip()
-                    break
-            if router_url is None:
-                router_url = "ws://127.0.0.1:60001/ws"
-            topics = all_topics.get(realm, [])
-            if topics:
-                for topic in topics:
-                    start_publisher(router_url, realm, topic)
-                    send_message_now(topic, content, delay)
+        # La selección realm × topic se agrupa una vez por sesión y se envía en paralelo
+        plan = FanOutPlan.from_selection(realms, router_urls, all_topics, "ws://127.0.0.1:60001/ws")
+        futures = [fan_out(plan, payload, delay)] if plan.size else []
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_info = {
             "action": "publish",
@@ -236,10 +228,10 @@ class MessageConfigWidget(QGroupBox):
             "topics": all_topics,
             "mode": mode,
             "time": time_str,
-            "content": content
+            "content": payload.value
         }
-        details = json.dumps(log_info, indent=2, ensure_ascii=False)
-        self.publisherTab.viewer.add_message(", ".join(realms), ", ".join([", ".join(all_topics[r]) for r in realms]), timestamp, details)
+        row = self.publisherTab.viewer.add_message(", ".join(realms), ", ".join([", ".join(all_topics[r]) for r in realms]), timestamp, log_info)
+        self.publisherTab.viewer.track(row, futures)
         print(f"Mensaje publicado en realms {realms} con topics {all_topics} a las {timestamp}")
 
     def getConfig(self):
@@ -251,9 +243,8 @@ class MessageConfigWidget(QGroupBox):
         topics = {}
         for realm in realms:
             topics[realm] = list(self.selected_topics_by_realm.get(realm, []))
-        content_text = self.editorWidget.jsonPreview.toPlainText()
         try:
-            content = json.loads(content_text)
+            content = self.editorWidget.getContent()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"JSON inválido:\n{e}")
             return {}
@@ -1,39 +1,98 @@
 # src/tu_paquete/pubMessageViewer.py
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox
+from PyQt5.QtCore import pyqtSignal, pyqtSlot
 from gui.utils import JsonTreeDialog
+from gui.messageModel import MessageTableModel, make_message_view
+from wamp.history import DEFAULT_HISTORY
+from wamp.publisher import BatchResult, PublishResult
+
+# Columnas de cada registro: las cuatro primeras se muestran, la última son los detalles
+TIME, REALM, TOPIC, STATUS, DETAILS = range(5)
 
 class PublisherMessageViewer(QWidget):
+    # (fila, resultado) emitido desde el hilo de red al resolverse cada envío
+    resultReady = pyqtSignal(int, object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.pubMessages = []
+        self.model = MessageTableModel(["Hora", "Realm", "Topic", "Estado"], DEFAULT_HISTORY, self)
+        self._pendingResults = {}  # secuencia de fila -> (envíos esperados, resultados recibidos)
+        self.resultReady.connect(self.onResultReady)
         self.initUI()
 
     def initUI(self):
         layout = QVBoxLayout(self)
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Hora", "Realm", "Topic"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.itemDoubleClicked.connect(self.showDetails)
+        headerLayout = QHBoxLayout()
+        headerLayout.addStretch()
+        headerLayout.addWidget(QLabel("Historial:"))
+        self.historySpin = QSpinBox()
+        self.historySpin.setRange(1000, 1000000)
+        self.historySpin.setSingleStep(10000)
+        self.historySpin.setValue(DEFAULT_HISTORY)
+        self.historySpin.setToolTip("Envíos que se conservan en la vista; los más antiguos se descartan")
+        self.historySpin.editingFinished.connect(self.applyHistorySize)
+        headerLayout.addWidget(self.historySpin)
+        layout.addLayout(headerLayout)
+        self.table = make_message_view(self.model, self.showDetails)
         layout.addWidget(self.table)
         self.setLayout(layout)
         self.setFixedHeight(200)
 
-    def add_message(self, realms, topics, timestamp, details):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
+    def add_message(self, realms, topics, timestamp, details, status=""):
+        """
+        `details` puede ser texto, un objeto JSON o el Payload publicado.
+        Devuelve la secuencia de la fila, estable aunque se descarten las más antiguas.
+        """
         realm_text = ", ".join(realms) if isinstance(realms, list) else str(realms)
         topic_text = ", ".join(topics) if isinstance(topics, list) else str(topics)
-        self.table.setItem(row, 0, QTableWidgetItem(timestamp))
-        self.table.setItem(row, 1, QTableWidgetItem(realm_text))
-        self.table.setItem(row, 2, QTableWidgetItem(topic_text))
-        self.pubMessages.append(details)
-
-    def showDetails(self, item):
-        row = item.row()
-        if row < len(self.pubMessages):
-            data = self.pubMessages[row]
+        return self.model.append_records([[timestamp, realm_text, topic_text, status, details]])
+
+    def set_status(self, seq, status):
+        self.model.update(seq, STATUS, status)
+
+    def applyHistorySize(self):
+        if self.historySpin.value() != self.model.records.capacity:
+            self.model.set_capacity(self.historySpin.value())
+
+    def track(self, seq, futures):
+        """
+        Asocia a la fila los futures devueltos por send_message_now/publish_batch;
+        la columna Estado se actualiza cuando el router confirma (o rechaza) los envíos.
+        """
+        futures = list(futures)
+        if not futures:
+            return
+        self._pendingResults[seq] = (len(futures), [])
+        self.set_status(seq, "Enviando...")
+        for future in futures:
+            future.add_done_callback(lambda f, seq=seq: self.resultReady.emit(seq, f))
+
+    @pyqtSlot(int, object)
+    def onResultReady(self, seq, future):
+        if seq not in self._pendingResults:
+            return
+        expected, results = self._pendingResults[seq]
+        try:
+            result = future.result()
+        except Exception as e:
+            result = PublishResult("", error=str(e) or type(e).__name__)
+        if isinstance(result, BatchResult):
+            results.extend(result.results)
+        else:
+            results.append(result)
+        expected -= 1
+        self._pendingResults[seq] = (expected, results)
+        summary = BatchResult(results)
+        if expected > 0:
+            self.set_status(seq, f"Enviando... {summary.summary()}")
+            return
+        del self._pendingResults[seq]
+        self.set_status(seq, summary.summary())
+
+    def showDetails(self, index):
+        if index.row() < self.model.rowCount():
+            data = self.model.record(index.row())[DETAILS]
+            # Payload/CompiledTemplate: se muestra el objeto sin serializarlo
+            data = getattr(data, "value", data)
             dlg = JsonTreeDialog(data, self)
             dlg.exec_()
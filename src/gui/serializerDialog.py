@@ -0,0 +1,36 @@
+# src/gui/serializerDialog.py
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QLabel
+)
+from wamp.serializers import compare_serializers
+
+class SerializerCompareDialog(QDialog):
+    """
+    Compara tamaño en el cable y coste de codificar/decodificar el payload con cada serializador.
+    """
+    def __init__(self, payload, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Comparación de serializadores")
+        self.resize(600, 220)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Mensaje PUBLISH con el payload actual (media de 200 repeticiones):"))
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Serializador", "Tamaño (bytes)", "vs JSON", "Codificar (µs)", "Decodificar (µs)"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+        self.showResults(compare_serializers(payload))
+
+    def showResults(self, rows):
+        json_size = next((r["size"] for r in rows if r["name"] == "json"), None)
+        self.table.setRowCount(len(rows))
+        for row, result in enumerate(rows):
+            if result["available"]:
+                ratio = f"{result['size'] / json_size * 100:.0f} %" if json_size else "-"
+                values = [result["name"], str(result["size"]), ratio,
+                          f"{result['encode_us']:.1f}", f"{result['decode_us']:.1f}"]
+            else:
+                values = [result["name"], "no disponible", "-", "-", "-"]
+            for col, text in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(text))
@@ -1,39 +1,63 @@
 # src/tu_paquete/subGUI.py
 import os
 import json
-import datetime
-import sys
+import time
 from PyQt5.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QTableWidget,
     QTableWidgetItem, QHeaderView, QMessageBox, QLineEdit, QDialog,
-    QTreeWidget, QComboBox, QSplitter, QGroupBox
+    QTreeWidget, QComboBox, QSplitter, QGroupBox, QCheckBox
 )
-from PyQt5.QtCore import Qt, pyqtSlot, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer
 from gui.subMessageViewer import SubscriberMessageViewer
 from gui.subUtils import JsonTreeDialog
-from wamp.subscriber import start_subscriber
-from gui.utils import log_to_file  # Reutilizamos log_to_file desde utils.py   
+from gui.latencyDialog import LatencyProbeDialog
+from gui.trafficDialog import TrafficStatsDialog
+from wamp.subscriber import update_subscriptions
+from wamp.filters import FilterError, compile_filter
+from wamp.topics import parse_topic
+from wamp.serializers import set_realm_serializers
+from wamp.delivery import FLUSH_HZ, CoalescingBuffer
+from wamp.history import encode_payload
+from wamp.search import tokenize
+from wamp.traffic import received_traffic
+from wamp.sequence import SequenceChecker
+from wamp.receive import ReceivePipeline, echo_batch
+from services.message_log import log_received
 
 class SubscriberTab(QWidget):
-    messageReceived = pyqtSignal(str, str, str, str)  # (realm, topic, timestamp, details)
-
     def __init__(self, parent=None):
         super().__init__(parent)
         self.realms_topics = {}  # Se carga desde el JSON de configuración
         self.selected_topics_by_realm = {}
         self.current_realm = None
-        self.messageReceived.connect(self.onMessageReceived)
+        self.latencyDialog = None
+        self.trafficDialog = None
+        self.activeFilters = {}  # (realm, topic) -> SubscriptionFilter con sus contadores
+        # Los mensajes recibidos se acumulan en el hilo de red y se vuelcan a la vista por lotes
+        self.received = CoalescingBuffer()
+        # Recepción ligera: el bucle de red solo encola; vista, log y consola van por lotes
+        self.pipeline = ReceivePipeline()
+        self.sequenceChecker = None  # SequenceChecker opcional (wamp.sequence)
+        self.flushCount = 0
+        self.lastPipelineDropped = 0
+        self.pipeline.add_sink(self.queueForView)
+        self.pipeline.add_sink(log_received)
+        self.pipeline.add_sink(echo_batch)
+        self.pipeline.start()
         self.initUI()
+        self.flushTimer = QTimer(self)
+        self.flushTimer.timeout.connect(self.flushMessages)
+        self.flushTimer.start(int(1000 / FLUSH_HZ))
         self.loadGlobalRealmTopicConfig()
 
     def initUI(self):
         mainLayout = QHBoxLayout(self)
         # Panel izquierdo: Realms y Topics
         leftLayout = QVBoxLayout()
-        lblRealms = QLabel("Realms (checkbox) + Router URL:")
+        lblRealms = QLabel("Realms (checkbox) + Router URL + Serializadores:")
         leftLayout.addWidget(lblRealms)
-        self.realmTable = QTableWidget(0, 2)
-        self.realmTable.setHorizontalHeaderLabels(["Realm", "Router URL"])
+        self.realmTable = QTableWidget(0, 3)
+        self.realmTable.setHorizontalHeaderLabels(["Realm", "Router URL", "Serializadores"])
         self.realmTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.realmTable.cellClicked.connect(self.onRealmClicked)
         self.realmTable.itemChanged.connect(self.onRealmItemChanged)
@@ -49,16 +73,16 @@ class SubscriberTab(QWidget):
         btnRealmLayout.addWidget(self.btnAddRealm)
         btnRealmLayout.addWidget(self.btnDelRealm)
         leftLayout.addLayout(btnRealmLayout)
-        lblTopics = QLabel("Topics (checkbox):")
+        lblTopics = QLabel("Topics (checkbox) + Filtro (p. ej. kwargs.status == \"ALARM\" and kwargs.level > 3):")
         leftLayout.addWidget(lblTopics)
-        self.topicTable = QTableWidget(0, 1)
-        self.topicTable.setHorizontalHeaderLabels(["Topic"])
+        self.topicTable = QTableWidget(0, 2)
+        self.topicTable.setHorizontalHeaderLabels(["Topic", "Filtro"])
         self.topicTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.topicTable.itemChanged.connect(self.onTopicChanged)
         leftLayout.addWidget(self.topicTable)
         btnTopicLayout = QHBoxLayout()
         self.newTopicEdit = QLineEdit()
-        self.newTopicEdit.setPlaceholderText("Nuevo Topic")
+        self.newTopicEdit.setPlaceholderText("Nuevo Topic (admite prefijo.* y a.*.c)")
         self.btnAddTopic = QPushButton("Agregar Topic")
         self.btnAddTopic.clicked.connect(self.addTopicRow)
         self.btnDelTopic = QPushButton("Borrar Topic")
@@ -67,6 +91,21 @@ class SubscriberTab(QWidget):
         btnTopicLayout.addWidget(self.btnAddTopic)
         btnTopicLayout.addWidget(self.btnDelTopic)
         leftLayout.addLayout(btnTopicLayout)
+        self.filterLabel = QLabel("")
+        leftLayout.addWidget(self.filterLabel)
+        # Comprobación opcional de pérdidas/duplicados/desorden por campo de secuencia
+        seqLayout = QHBoxLayout()
+        self.sequenceCheck = QCheckBox("Comprobar secuencia")
+        seqLayout.addWidget(self.sequenceCheck)
+        self.sequenceFieldEdit = QLineEdit("kwargs.seq")
+        self.sequenceFieldEdit.setToolTip("Campo con el número de secuencia (p. ej. kwargs.seq o args[0].seq)")
+        seqLayout.addWidget(self.sequenceFieldEdit)
+        self.publisherFieldEdit = QLineEdit()
+        self.publisherFieldEdit.setPlaceholderText("Campo del publicador (opcional)")
+        seqLayout.addWidget(self.publisherFieldEdit)
+        leftLayout.addLayout(seqLayout)
+        self.sequenceLabel = QLabel("")
+        leftLayout.addWidget(self.sequenceLabel)
         ctrlLayout = QHBoxLayout()
         self.btnSubscribe = QPushButton("Suscribirse")
         self.btnSubscribe.clicked.connect(self.startSubscription)
@@ -74,6 +113,12 @@ class SubscriberTab(QWidget):
         self.btnReset = QPushButton("Reset Log")
         self.btnReset.clicked.connect(self.resetLog)
         ctrlLayout.addWidget(self.btnReset)
+        self.btnLatency = QPushButton("Latencias")
+        self.btnLatency.clicked.connect(self.showLatency)
+        ctrlLayout.addWidget(self.btnLatency)
+        self.btnTraffic = QPushButton("Estadísticas")
+        self.btnTraffic.clicked.connect(self.showTraffic)
+        ctrlLayout.addWidget(self.btnTraffic)
         leftLayout.addLayout(ctrlLayout)
         mainLayout.addLayout(leftLayout, stretch=1)
         # Panel derecho: Viewer de mensajes
@@ -94,7 +139,8 @@ class SubscriberTab(QWidget):
                         if realm:
                             realms_dict[realm] = {
                                 "router_url": item.get("router_url", "ws://127.0.0.1:60001/ws"),
-                                "topics": item.get("topics", [])
+                                "topics": item.get("topics", []),
+                                "serializers": item.get("serializers")
                             }
                     data = {"realms": realms_dict}
                 self.realms_topics = data.get("realms", {})
@@ -117,6 +163,7 @@ class SubscriberTab(QWidget):
             self.realmTable.setItem(row, 0, itemRealm)
             router_url = info.get("router_url", "ws://127.0.0.1:60001/ws")
             self.realmTable.setItem(row, 1, QTableWidgetItem(router_url))
+            self.realmTable.setItem(row, 2, QTableWidgetItem(", ".join(info.get("serializers") or [])))
         self.realmTable.blockSignals(False)
         if self.realmTable.rowCount() > 0:
             self.realmTable.selectRow(0)
@@ -143,6 +190,8 @@ class SubscriberTab(QWidget):
                 else:
                     t_item.setCheckState(Qt.Unchecked)
                 self.topicTable.setItem(row_idx, 0, t_item)
+                filters = self.realms_topics.get(realm, {}).get("filters", {})
+                self.topicTable.setItem(row_idx, 1, QTableWidgetItem(filters.get(t, "")))
             self.topicTable.blockSignals(False)
 
     def onRealmItemChanged(self, item):
@@ -152,6 +201,16 @@ class SubscriberTab(QWidget):
         if not self.current_realm:
             return
         realm = self.current_realm
+        if item.column() == 1:
+            topic_item = self.topicTable.item(item.row(), 0)
+            if topic_item:
+                filters = self.realms_topics.setdefault(realm, {}).setdefault("filters", {})
+                expression = item.text().strip()
+                if expression:
+                    filters[topic_item.text().strip()] = expression
+                else:
+                    filters.pop(topic_item.text().strip(), None)
+            return
         selected = set()
         for row in range(self.topicTable.rowCount()):
             t_item = self.topicTable.item(row, 0)
@@ -169,6 +228,7 @@ class SubscriberTab(QWidget):
             item.setCheckState(Qt.Unchecked)
             self.realmTable.setItem(row, 0, item)
             self.realmTable.setItem(row, 1, QTableWidgetItem("ws://127.0.0.1:60001/ws"))
+            self.realmTable.setItem(row, 2, QTableWidgetItem(""))
             self.newRealmEdit.clear()
 
     def deleteRealmRow(self):
@@ -183,12 +243,18 @@ class SubscriberTab(QWidget):
     def addTopicRow(self):
         new_topic = self.newTopicEdit.text().strip()
         if new_topic:
+            try:
+                parse_topic(new_topic)
+            except ValueError as e:
+                QMessageBox.warning(self, "Advertencia", str(e))
+                return
             row = self.topicTable.rowCount()
             self.topicTable.insertRow(row)
             t_item = QTableWidgetItem(new_topic)
             t_item.setFlags(t_item.flags() | Qt.ItemIsUserCheckable)
             t_item.setCheckState(Qt.Unchecked)
             self.topicTable.setItem(row, 0, t_item)
+            self.topicTable.setItem(row, 1, QTableWidgetItem(""))
             self.newTopicEdit.clear()
 
     def deleteTopicRow(self):
@@ -202,21 +268,12 @@ class SubscriberTab(QWidget):
 
     def startSubscription(self):
         """
-        Se suscribe SOLO a los topics marcados en cada realm al pulsar "Suscribirse".
-        Si existe una sesión previa, se cierra antes de iniciar una nueva.
+        Aplica la selección actual: una sesión por realm marcado con SOLO sus topics marcados.
+        Los realms ya suscritos no se reconectan; solo se suscriben/cancelan los topics que cambian,
+        y los realms desmarcados se cierran.
         """
-        global global_session_sub
-
-        # Si hay una sesión previa, cerrarla
-        if global_session_sub is not None:
-            try:
-                global_session_sub.leave()
-                print("🔄 Sesión previa cerrada correctamente.")
-            except Exception as e:
-                print(f"⚠️ Error al cerrar sesión previa: {e}")
-            global_session_sub = None
-
-        selected_realms = []
+        selection = {}
+        filters = {}
         selected_topics_by_realm = {}
 
         # Recorrer la tabla de realms para obtener los seleccionados
@@ -226,57 +283,170 @@ class SubscriberTab(QWidget):
             if realm_item and realm_item.checkState() == Qt.Checked:
                 realm = realm_item.text().strip()
                 router_url = url_item.text().strip() if url_item else "ws://127.0.0.1:60001/ws"
+                ser_item = self.realmTable.item(row, 2)
+                try:
+                    serializers = set_realm_serializers(realm, ser_item.text() if ser_item else None)
+                except ValueError as e:
+                    QMessageBox.critical(self, "Error", f"Realm {realm}: {e}")
+                    return
+                self.realms_topics.setdefault(realm, {})["serializers"] = serializers
                 topics = self.realms_topics.get(realm, {}).get("topics", [])
                 # Filtrar SOLO los topics seleccionados que pertenezcan a este realm
-                selected_topics = [
-                    self.topicTable.item(i, 0).text().strip()
-                    for i in range(self.topicTable.rowCount())
-                    if self.topicTable.item(i, 0).checkState() == Qt.Checked and
-                    self.topicTable.item(i, 0).text().strip() in topics
-                ]
+                selected_topics = [t for t in topics if t in self.selected_topics_by_realm.get(realm, set())]
                 if selected_topics:
-                    selected_realms.append((realm, router_url))
+                    selection[(router_url, realm)] = selected_topics
                     selected_topics_by_realm[realm] = selected_topics
+                    # Los filtros se compilan aquí para avisar de errores antes de suscribirse
+                    expressions = self.realms_topics.get(realm, {}).get("filters", {})
+                    compiled = {}
+                    for topic in selected_topics:
+                        try:
+                            parse_topic(topic)
+                        except ValueError as e:
+                            QMessageBox.critical(self, "Error", f"Topic de {realm}: {e}")
+                            return
+                        try:
+                            predicate = compile_filter(expressions.get(topic))
+                        except FilterError as e:
+                            QMessageBox.critical(self, "Error", f"Filtro de {realm} / {topic}:\n{e}")
+                            return
+                        if predicate is not None:
+                            compiled[topic] = predicate
+                    filters[(router_url, realm)] = compiled
 
-        if not selected_realms:
+        if not selection:
             QMessageBox.warning(self, "Advertencia", "No hay realms seleccionados para la suscripción.")
             return
+        try:
+            self.sequenceChecker = self.makeSequenceChecker()
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Secuencia: {e}")
+            return
 
         print(f"✅ Realms seleccionados y sus topics: {selected_topics_by_realm}")
+        # La secuencia se comprueba antes de los filtros: lo filtrado no cuenta como perdido
+        update_subscriptions(selection, self.pipeline.on_message, filters,
+                             self.checkSequence if self.sequenceChecker is not None else None)
+        self.activeFilters = {(realm, topic): f for (_, realm), compiled in filters.items()
+                              for topic, f in compiled.items()}
+        timestamp = time.time()
+        for (router_url, realm), topics in selection.items():
+            subscription_info = {
+                "action": "subscribe",
+                "realm": realm,
+                "router_url": router_url,
+                "topics": topics,
+                "serializers": self.realms_topics.get(realm, {}).get("serializers"),
+                "filters": {t: f.expression for t, f in filters[(router_url, realm)].items()}
+            }
+            self.viewer.add_message(realm, ", ".join(topics), timestamp, subscription_info)
 
-        for realm, router_url in selected_realms:
-            topics = selected_topics_by_realm.get(realm, [])
-            if topics:
-                start_subscriber(router_url, realm, topics, self.handleMessage)
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                subscription_info = {
-                    "action": "subscribe",
-                    "realm": realm,
-                    "router_url": router_url,
-                    "topics": topics
-                }
-                details = json.dumps(subscription_info, indent=2, ensure_ascii=False)
-                self.viewer.add_message(realm, ", ".join(topics), timestamp, details)
-                print(f"✅ Suscrito correctamente a realm '{realm}' con topics {topics}")
-            else:
-                print(f"⚠️ No hay topics seleccionados para realm {realm}, no se suscribe.")
+    def queueForView(self, batch):
+        # Hilo de recepción: la vista guarda el contenido en JSON compacto (ver MessageStore)
+        # y los tokens de búsqueda se calculan aquí, no en la GUI (ver wamp.search)
+        rows = [(timestamp, realm, topic, encode_payload(content), tokenize(content))
+                for timestamp, realm, topic, content in batch]
+        received_traffic.record_many([(row[0], row[1], row[2], len(row[3])) for row in rows])
+        self.received.push_many(rows)
+
+    def flushMessages(self):
+        self.viewer.add_messages(self.received.drain())
+        self.flushCount += 1
+        if self.flushCount % FLUSH_HZ == 0:
+            # El resumen recorre todos los flujos: una vez por segundo
+            checker = self.sequenceChecker
+            self.sequenceLabel.setText(checker.summary() if checker is not None else "")
+        dropped = self.pipeline.dropped
+        if self.received.received or dropped:
+            status = self.received.status()
+            if dropped:
+                status += f", {dropped} descartados en recepción"
+            # Se resalta mientras la recepción siga descartando
+            self.viewer.setRateStatus(status, self.received.throttling or dropped > self.lastPipelineDropped)
+            self.lastPipelineDropped = dropped
+        if self.activeFilters:
+            self.filterLabel.setText("\n".join(f"Filtro {realm} / {topic}: {f.summary()}"
+                                                for (realm, topic), f in sorted(self.activeFilters.items())))
+        else:
+            self.filterLabel.setText("")
+
+    def makeSequenceChecker(self):
+        if not self.sequenceCheck.isChecked():
+            return None
+        return SequenceChecker(self.sequenceFieldEdit.text().strip() or "kwargs.seq",
+                               self.publisherFieldEdit.text().strip() or None)
 
-    def handleMessage(self, realm, topic, content):
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        details = json.dumps(content, indent=2, ensure_ascii=False)
-        self.messageReceived.emit(realm, topic, timestamp, details)
-        log_to_file(timestamp, realm, topic, details)
-        print(f"Mensaje recibido en realm '{realm}', topic '{topic}' a las {timestamp}")
-        sys.stdout.flush()
+    def checkSequence(self, realm, topic, args, kwargs):
+        # Hilo de red, antes de los filtros; el comprobador se sustituye entero al suscribirse
+        # o al hacer reset
+        checker = self.sequenceChecker
+        if checker is not None:
+            checker.check(realm, topic, args, kwargs)
 
-    @pyqtSlot(str, str, str, str)
-    def onMessageReceived(self, realm, topic, timestamp, details):
-        self.viewer.add_message(realm, topic, timestamp, details)
+    def showLatency(self):
+        if self.latencyDialog is None:
+            self.latencyDialog = LatencyProbeDialog(self)
+        self.latencyDialog.show()
+        self.latencyDialog.raise_()
+
+    def showTraffic(self):
+        if self.trafficDialog is None:
+            self.trafficDialog = TrafficStatsDialog(received_traffic, "Tráfico recibido por topic", self)
+        self.trafficDialog.show()
+        self.trafficDialog.raise_()
 
     def resetLog(self):
-        self.viewer.table.setRowCount(0)
-        self.viewer.messages = []
+        self.viewer.clear()
+        self.received.reset()
+        self.pipeline.dropped = self.lastPipelineDropped = 0
+        self.viewer.setRateStatus("", False)
+        if self.sequenceChecker is not None:
+            self.sequenceChecker = SequenceChecker(self.sequenceChecker.field, self.sequenceChecker.publisher_field)
+            self.sequenceLabel.setText("")
+
+    def getProjectConfigLocal(self):
+        subscriptions = []
+        for row in range(self.realmTable.rowCount()):
+            realm_item = self.realmTable.item(row, 0)
+            url_item = self.realmTable.item(row, 1)
+            if realm_item and realm_item.checkState() == Qt.Checked:
+                realm = realm_item.text().strip()
+                subscriptions.append({
+                    "realm": realm,
+                    "router_url": url_item.text().strip() if url_item else "ws://127.0.0.1:60001/ws",
+                    "topics": sorted(self.selected_topics_by_realm.get(realm, set())),
+                    "serializers": self.realms_topics.get(realm, {}).get("serializers"),
+                    "filters": dict(self.realms_topics.get(realm, {}).get("filters", {}))
+                })
+        sequence = {"enabled": self.sequenceCheck.isChecked(), "field": self.sequenceFieldEdit.text().strip(),
+                    "publisher_field": self.publisherFieldEdit.text().strip() or None}
+        return {"subscriptions": subscriptions, "sequence": sequence}
 
     def loadProjectFromConfig(self, sub_config):
-        # Método a implementar según necesidades
-        pass
+        subscriptions = sub_config.get("subscriptions", [])
+        sequence = sub_config.get("sequence") or {}
+        self.sequenceCheck.setChecked(bool(sequence.get("enabled")))
+        self.sequenceFieldEdit.setText(sequence.get("field") or "kwargs.seq")
+        self.publisherFieldEdit.setText(sequence.get("publisher_field") or "")
+        for sub in subscriptions:
+            realm = sub.get("realm")
+            if not realm:
+                continue
+            info = self.realms_topics.setdefault(realm, {"router_url": sub.get("router_url", "ws://127.0.0.1:60001/ws"), "topics": []})
+            info["router_url"] = sub.get("router_url", info.get("router_url"))
+            if sub.get("serializers"):
+                info["serializers"] = sub["serializers"]
+            if sub.get("filters"):
+                info["filters"] = dict(sub["filters"])
+            for topic in sub.get("topics", []):
+                if topic not in info["topics"]:
+                    info["topics"].append(topic)
+            self.selected_topics_by_realm[realm] = set(sub.get("topics", []))
+        self.populateRealmTable()
+        selected = {sub.get("realm") for sub in subscriptions}
+        self.realmTable.blockSignals(True)
+        for row in range(self.realmTable.rowCount()):
+            item = self.realmTable.item(row, 0)
+            if item and item.text().strip() in selected:
+                item.setCheckState(Qt.Checked)
+        self.realmTable.blockSignals(False)
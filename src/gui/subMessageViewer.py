@@ -1,36 +1,133 @@
 # src/tu_paquete/subMessageViewer.py
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView
+import json
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QLineEdit, QPushButton
 from gui.subUtils import JsonTreeDialog
+from gui.messageModel import MessageTableModel, make_message_view
+from wamp.history import DEFAULT_HISTORY, MessageStore
+from wamp.search import HistoryIndex, SearchError, tokenize
+
+# Columnas de cada registro: las tres primeras se muestran, la última es el contenido
+TIME, REALM, TOPIC, DETAILS = range(4)
 
 class SubscriberMessageViewer(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.messages = []
+        # Historial columnar: el contenido se guarda en JSON compacto y se decodifica al abrirlo
+        self.model = MessageTableModel(["Hora", "Realm", "Topic"], parent=self,
+                                       records=MessageStore(DEFAULT_HISTORY))
+        # Índice de búsqueda que se actualiza con cada mensaje (ver wamp.search)
+        self.index = HistoryIndex()
+        self.matches = []
+        self.matchPos = -1
         self.initUI()
 
     def initUI(self):
         layout = QVBoxLayout(self)
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Hora", "Realm", "Topic"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.itemDoubleClicked.connect(self.showDetails)
+        headerLayout = QHBoxLayout()
+        # Indicador de tasa; se resalta cuando la vista descarta mensajes por exceso de tráfico
+        self.rateLabel = QLabel("")
+        headerLayout.addWidget(self.rateLabel, stretch=1)
+        headerLayout.addWidget(QLabel("Historial:"))
+        self.historySpin = QSpinBox()
+        self.historySpin.setRange(1000, 1000000)
+        self.historySpin.setSingleStep(10000)
+        self.historySpin.setValue(DEFAULT_HISTORY)
+        self.historySpin.setToolTip("Mensajes que se conservan en la vista; los más antiguos se descartan")
+        self.historySpin.editingFinished.connect(self.applyHistorySize)
+        headerLayout.addWidget(self.historySpin)
+        layout.addLayout(headerLayout)
+        searchLayout = QHBoxLayout()
+        self.searchEdit = QLineEdit()
+        self.searchEdit.setPlaceholderText("Buscar: topic:MsgAlerts kwargs.id:1234 after:12:00")
+        self.searchEdit.returnPressed.connect(self.search)
+        searchLayout.addWidget(self.searchEdit, stretch=1)
+        self.prevButton = QPushButton("◀")
+        self.prevButton.setToolTip("Coincidencia anterior")
+        self.prevButton.clicked.connect(lambda: self.showMatch(self.matchPos - 1))
+        searchLayout.addWidget(self.prevButton)
+        self.nextButton = QPushButton("▶")
+        self.nextButton.setToolTip("Coincidencia siguiente")
+        self.nextButton.clicked.connect(lambda: self.showMatch(self.matchPos + 1))
+        searchLayout.addWidget(self.nextButton)
+        self.searchLabel = QLabel("")
+        searchLayout.addWidget(self.searchLabel)
+        layout.addLayout(searchLayout)
+        self.table = make_message_view(self.model, self.showDetails)
         layout.addWidget(self.table)
         self.setLayout(layout)
 
     def add_message(self, realm, topic, timestamp, details):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        self.table.setItem(row, 0, QTableWidgetItem(timestamp))
-        self.table.setItem(row, 1, QTableWidgetItem(realm))
-        self.table.setItem(row, 2, QTableWidgetItem(topic))
-        self.messages.append(details)
-
-    def showDetails(self, item):
-        row = item.row()
-        if row < len(self.messages):
-            data = self.messages[row]
+        """
+        timestamp en segundos (epoch); details es el objeto JSON o ya codificado (bytes).
+        """
+        self.add_messages([(timestamp, realm, topic, details)])
+
+    def add_messages(self, rows):
+        """
+        Añade un lote de registros (timestamp, realm, topic, details[, tokens]) con una sola
+        inserción. `tokens` (wamp.search.tokenize) se calcula fuera de la GUI cuando se puede;
+        si falta, se obtiene aquí del contenido.
+        """
+        rows = rows[-self.model.records.capacity:]
+        if not rows:
+            return
+        seq = self.model.append_records([row[:4] for row in rows])
+        for offset, row in enumerate(rows):
+            if len(row) > 4:
+                tokens = row[4]
+            else:
+                details = row[DETAILS]
+                tokens = tokenize(json.loads(details) if isinstance(details, (bytes, bytearray)) else details)
+            self.index.add(seq + offset, row[TIME], row[REALM], row[TOPIC], tokens)
+        self.index.prune(self.model.records.first_seq)
+
+    def applyHistorySize(self):
+        if self.historySpin.value() != self.model.records.capacity:
+            self.model.set_capacity(self.historySpin.value())
+            self.index.prune(self.model.records.first_seq)
+
+    def clear(self):
+        self.model.clear()
+        self.index.clear()
+        self.matches = []
+        self.matchPos = -1
+        self.searchLabel.setText("")
+
+    def search(self):
+        query = self.searchEdit.text().strip()
+        self.matches = []
+        if not query:
+            self.searchLabel.setText("")
+            return
+        try:
+            self.matches = self.index.search(query)
+        except SearchError as e:
+            self.searchLabel.setText(str(e))
+            return
+        if not self.matches:
+            self.searchLabel.setText("Sin resultados")
+            return
+        # Se empieza por la coincidencia más reciente
+        self.showMatch(len(self.matches) - 1)
+
+    def showMatch(self, position):
+        if not self.matches:
+            return
+        self.matchPos = position % len(self.matches)
+        row = self.model.records.index_of(self.matches[self.matchPos])
+        if row is None:
+            self.searchLabel.setText(f"{self.matchPos + 1}/{len(self.matches)} (ya no está en el historial)")
+            return
+        self.searchLabel.setText(f"{self.matchPos + 1}/{len(self.matches)}")
+        self.table.selectRow(row)
+        self.table.scrollTo(self.model.index(row, 0))
+
+    def setRateStatus(self, text, throttling):
+        self.rateLabel.setText(text)
+        self.rateLabel.setStyleSheet("color: #b00020; font-weight: bold;" if throttling else "")
+
+    def showDetails(self, index):
+        if index.row() < self.model.rowCount():
+            data = self.model.record(index.row())[DETAILS]
             dlg = JsonTreeDialog(data, self)
             dlg.exec_()
@@ -0,0 +1,91 @@
+# src/gui/trafficDialog.py
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QPushButton, QLabel
+)
+from PyQt5.QtCore import Qt, QTimer
+
+# Intervalo de refresco del panel (ms)
+REFRESH_MS = 1000
+
+class TrafficStatsDialog(QDialog):
+    """
+    Panel de tráfico por realm/topic (wamp.traffic): tasas instantánea y media móvil,
+    tamaños e intervalos entre mensajes. Se puede ordenar por cualquier columna.
+    """
+    COLUMNS = [
+        ("Realm", "realm"), ("Topic", "topic"), ("Mensajes", "count"),
+        ("msgs/s", "rate"), ("msgs/s (media)", "ewma_rate"),
+        ("KB/s", "byte_rate"), ("KB/s (media)", "ewma_byte_rate"),
+        ("Tam. mín (B)", "min_size"), ("Tam. medio (B)", "avg_size"), ("Tam. máx (B)", "max_size"),
+        ("Intervalo p50 (ms)", "gap_p50"), ("Intervalo p99 (ms)", "gap_p99"), ("Intervalo máx (ms)", "gap_max"),
+    ]
+
+    def __init__(self, stats, title, parent=None):
+        super().__init__(parent)
+        self.stats = stats
+        self.setWindowTitle(title)
+        self.resize(1100, 350)
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([label for label, _ in self.COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(3, Qt.DescendingOrder)
+        layout.addWidget(self.table)
+        btnLayout = QHBoxLayout()
+        self.totalLabel = QLabel("")
+        btnLayout.addWidget(self.totalLabel, stretch=1)
+        self.btnReset = QPushButton("Reiniciar")
+        self.btnReset.clicked.connect(self.resetStats)
+        btnLayout.addWidget(self.btnReset)
+        layout.addLayout(btnLayout)
+        self.setLayout(layout)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(REFRESH_MS)
+        self.refresh()
+
+    def _item(self, key, value):
+        item = QTableWidgetItem()
+        if value is None:
+            item.setData(Qt.DisplayRole, "-")
+        elif key in ("realm", "topic"):
+            item.setData(Qt.DisplayRole, value)
+        elif key.startswith("gap_"):
+            item.setData(Qt.DisplayRole, round(value * 1000, 3))
+        elif key.endswith("byte_rate"):
+            item.setData(Qt.DisplayRole, round(value / 1024, 1))
+        elif key in ("count", "min_size", "max_size"):
+            item.setData(Qt.DisplayRole, int(value))
+        else:
+            # Números (no texto) para que la columna se ordene por valor
+            item.setData(Qt.DisplayRole, round(value, 1))
+        return item
+
+    def refresh(self):
+        snapshot = self.stats.snapshot()
+        # Se desactiva la ordenación mientras se rellena para que las filas no se muevan
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(snapshot))
+        for row, ((realm, topic), summary) in enumerate(snapshot.items()):
+            values = dict(summary, realm=realm, topic=topic)
+            for col, (_, key) in enumerate(self.COLUMNS):
+                self.table.setItem(row, col, self._item(key, values[key]))
+        self.table.setSortingEnabled(True)
+        rate = sum(s["rate"] for s in snapshot.values())
+        byte_rate = sum(s["byte_rate"] for s in snapshot.values())
+        self.totalLabel.setText(f"{len(snapshot)} topics | {rate:.0f} msgs/s | {byte_rate / 1024:.1f} KB/s")
+
+    def resetStats(self):
+        self.stats.reset()
+        self.refresh()
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
+
+    def showEvent(self, event):
+        # El temporizador se detiene al cerrar; se reanuda al volver a mostrar el panel
+        self.timer.start(REFRESH_MS)
+        super().showEvent(event)
@@ -1,15 +1,7 @@
 # src/tu_paquete/utils.py
-import os
 import json
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTreeWidget, QTreeWidgetItem, QHeaderView
-
-def log_to_file(timestamp, topic, role, message_json):
-    log_folder = "logs"
-    if not os.path.exists(log_folder):
-        os.makedirs(log_folder)
-    file_path = os.path.join(log_folder, "log.txt")
-    with open(file_path, "a", encoding="utf-8") as f:
-        f.write(f"{timestamp} | {role} | {topic} | {message_json}\n")
+from services.message_log import log_to_file  # Se mantiene aquí por compatibilidad
 
 class JsonTreeDialog(QDialog):
     def __init__(self, json_data, parent=None):
@@ -0,0 +1,44 @@
+# src/services/message_log.py
+import datetime
+import json
+import os
+
+def _log_path():
+    log_folder = "logs"
+    if not os.path.exists(log_folder):
+        os.makedirs(log_folder)
+    return os.path.join(log_folder, "log.txt")
+
+def _format(timestamp, topic, role, message_json, realm=None):
+    # Con realm el rol se escribe como "rol@realm" para poder filtrar al reproducir (wamp.replay)
+    if realm:
+        role = f"{role}@{realm}"
+    return f"{timestamp} | {role} | {topic} | {message_json}\n"
+
+def log_to_file(timestamp, topic, role, message_json, realm=None):
+    with open(_log_path(), "a", encoding="utf-8") as f:
+        f.write(_format(timestamp, topic, role, message_json, realm))
+
+def log_received(batch):
+    """
+    Registra un lote de mensajes recibidos (ver wamp.receive) abriendo el archivo una sola vez.
+    """
+    lines = [
+        _format(datetime.datetime.fromtimestamp(timestamp).isoformat(sep=" ", timespec="milliseconds"),
+                topic, "suscriptor", json.dumps(content, indent=2, ensure_ascii=False, default=str), realm)
+        for timestamp, realm, topic, content in batch
+    ]
+    with open(_log_path(), "a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+def log_published(batch):
+    """
+    Registra un lote de mensajes publicados: (timestamp epoch, realm, topic, Payload).
+    """
+    lines = [
+        _format(datetime.datetime.fromtimestamp(timestamp).isoformat(sep=" ", timespec="milliseconds"),
+                topic, "publicador", payload.pretty, realm)
+        for timestamp, realm, topic, payload in batch
+    ]
+    with open(_log_path(), "a", encoding="utf-8") as f:
+        f.writelines(lines)
@@ -0,0 +1,20 @@
+# tests/test_delivery.py
+from src.wamp.delivery import CoalescingBuffer
+
+def test_drain_batches_and_counts_dropped():
+    """
+    Se prueba que cada volcado devuelve a lo sumo max_per_flush mensajes (los más recientes)
+    y que el resto se cuenta como descartado de la vista.
+    """
+    buffer = CoalescingBuffer(max_per_flush=10, capacity=100)
+    for i in range(150):
+        buffer.push(i)
+    batch = buffer.drain()
+    # 50 se pierden por capacidad y 90 por el límite de la vista
+    assert batch == list(range(140, 150))
+    assert buffer.received == 150 and buffer.dropped == 140
+    assert buffer.throttling and "140 descartados" in buffer.status()
+    buffer.push("a")
+    assert buffer.drain() == ["a"]
+    buffer.reset()
+    assert buffer.drain() == [] and buffer.dropped == 0 and not buffer.throttling
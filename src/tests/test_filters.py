@@ -0,0 +1,37 @@
+# tests/test_filters.py
+import pytest
+from src.wamp.filters import FilterError, compile_filter, compile_filters
+
+def test_filter_expressions():
+    """
+    Se prueban comparaciones, operadores lógicos, rutas anidadas y campos ausentes.
+    """
+    f = compile_filter('kwargs.status == "ALARM" and kwargs.level > 3')
+    assert f("r", "t", (), {"status": "ALARM", "level": 5})
+    assert not f("r", "t", (), {"status": "ALARM", "level": 2})
+    assert not f("r", "t", (), {"level": 9})
+    assert (f.matched, f.rejected) == (1, 2)
+    f = compile_filter('args[0].id in [1, 2] or not kwargs["x-y"] or 1 < kwargs.n <= 3 or topic == "b"')
+    assert f("r", "a", ({"id": 2},), {"x-y": 1})
+    assert f("r", "a", (), {})  # x-y ausente: not -> cierto
+    assert f("r", "a", (), {"x-y": 1, "n": 3})
+    assert not f("r", "a", (), {"x-y": 1, "n": 4})
+    assert f("r", "b", (), {"x-y": 1})
+    # Tipos no comparables no lanzan excepción
+    assert not compile_filter("kwargs.level > 3")("r", "t", (), {"level": "alto"})
+    assert compile_filter("kwargs.a.b != null")("r", "t", (), {"a": {"b": 0}})
+    assert compile_filter("  ") is None
+    # Las listas con topic/realm se evalúan por evento
+    f = compile_filter('kwargs.a in [topic, "x"]')
+    assert f("r", "t", (), {"a": "t"}) and f("r", "u", (), {"a": "x"}) and not f("r", "u", (), {"a": "t"})
+
+def test_invalid_filters():
+    """
+    Se prueba que se rechazan expresiones con sintaxis o construcciones no permitidas.
+    """
+    for expression in ["kwargs.a ==", "__import__('os')", "kwargs.a + 1 > 2", "foo == 1", "kwargs.a is None",
+                       "kwargs.a == -'x'", "kwargs.a == -True", "kwargs.a in [foo, 'x']"]:
+        with pytest.raises(FilterError):
+            compile_filter(expression)
+    with pytest.raises(FilterError, match="topic1"):
+        compile_filters({"topic1": "kwargs.a =="})
@@ -0,0 +1,42 @@
+# tests/test_history.py
+from src.wamp.history import RingBuffer
+
+def test_ring_buffer_wraps_and_keeps_sequences():
+    """
+    Se prueba que el historial conserva los más recientes y que las secuencias son estables.
+    """
+    ring = RingBuffer(3)
+    seqs = [ring.append(i) for i in range(5)]
+    assert seqs == [0, 1, 2, 3, 4]
+    assert list(ring) == [2, 3, 4] and ring[0] == 2 and ring[-1] == 4
+    assert ring.get(1) is None and ring.get(3) == 3 and ring.index_of(4) == 2
+    assert ring.overflow(2) == 2
+    ring.discard(2)
+    assert list(ring) == [4] and ring.first_seq == 4
+    ring.resize(5)
+    for i in range(5, 9):
+        ring.append(i)
+    assert list(ring) == [4, 5, 6, 7, 8] and ring.get(4) == 4
+    ring.resize(2)
+    assert list(ring) == [7, 8] and ring.get(7) == 7
+    ring.clear()
+    assert len(ring) == 0 and ring.append("x") == 9
+
+def test_message_store_columnar_rows():
+    """
+    Se prueba que el almacén columnar decodifica las filas al pedirlas, interna realm/topic
+    y compacta el buffer de contenidos al desplazarse la ventana.
+    """
+    from src.wamp.history import MessageStore
+    store = MessageStore(4)
+    for i in range(10):
+        store.append((1700000000.0 + i, "realm1", f"topic{i % 2}", {"args": [i], "kwargs": {}}))
+    assert len(store) == 4 and store.first_seq == 6
+    assert store.payload(0) == {"args": [6], "kwargs": {}}
+    assert store.cell(1, 1) == "realm1" and store.cell(1, 2) == "topic1"
+    assert store.names == ["realm1", "topic0", "topic1"]
+    assert store.get(9)[3]["args"] == [9] and store.get(5) is None
+    # El buffer no conserva los contenidos de más de la mitad de filas desplazadas
+    assert len(store._data) <= 2 * sum(len(store.raw(i)) for i in range(len(store)))
+    store.resize(2)
+    assert [row[3]["args"][0] for row in store] == [8, 9] and store.first_seq == 8
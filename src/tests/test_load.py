@@ -0,0 +1,95 @@
+# tests/test_load.py
+import asyncio
+from src.wamp.load import TokenBucket, LoadProfile, LoadStats, run_load
+
+def test_token_bucket_refill():
+    """
+    Se prueba que la cubeta se rellena a la tasa indicada sin superar la capacidad.
+    """
+    bucket = TokenBucket(rate=100, capacity=10, now=0.0)
+    assert bucket.take(0.0, 50) == 10
+    assert bucket.take(0.0, 1) == 0
+    assert bucket.take(0.05, 50) == 5
+    assert bucket.take(10.0, 50) == 10
+    assert abs(bucket.wait_time(10.0, 5) - 0.05) < 1e-9
+
+def test_load_profile_ramp():
+    """
+    Se prueba la rampa lineal y escalonada de la tasa objetivo.
+    """
+    profile = LoadProfile(1000, duration=10, ramp_up=4)
+    assert profile.rate_at(2) == 500
+    assert profile.rate_at(5) == 1000
+    step = LoadProfile(1000, count=10, ramp_up=4, ramp="escalonada")
+    assert step.rate_at(0.5) == 250
+    assert step.rate_at(3.9) == 1000
+
+def test_run_load_count():
+    """
+    Se prueba que el pacer publica exactamente el número de mensajes pedido.
+    """
+    published = []
+    profile = LoadProfile(20000, count=2000, burst=100)
+    stats = asyncio.run(run_load(lambda topic, **kw: published.append(kw), "TestTopic", {"key": "value"}, profile))
+    assert stats.sent == 2000 and len(published) == 2000
+    assert stats.errors == 0
+    assert stats.achieved_rate() > 0
+
+def test_run_load_acknowledge():
+    """
+    Se prueba el conteo de acks con publicaciones que devuelven futures.
+    """
+    async def scenario():
+        loop = asyncio.get_event_loop()
+        def publish(topic, **kwargs):
+            future = loop.create_future()
+            loop.call_soon(future.set_result, None)
+            return future
+        stats = LoadStats(LoadProfile(5000, count=500))
+        await run_load(publish, "TestTopic", {}, stats.profile, stats, acknowledge=True, max_in_flight=50)
+        await asyncio.sleep(0.01)
+        return stats
+    stats = asyncio.run(scenario())
+    assert stats.sent == 500 and stats.acked == 500 and stats.in_flight == 0
+
+def test_split_profile_and_merge_stats(monkeypatch):
+    """
+    Se prueba el reparto de un perfil entre procesos y la suma de sus contadores.
+    """
+    from src.wamp import workers
+    # El tope de procesos depende de los núcleos de la máquina: se fija para la prueba
+    monkeypatch.setattr(workers, "MAX_WORKERS", 4)
+    profile = LoadProfile(1000, count=10, burst=8)
+    parts = workers.split_profile(profile, 3)
+    assert [p.count for p in parts] == [4, 3, 3]
+    assert parts[0].rate == 1000 / 3 and parts[0].burst == 2
+    assert [p.count for p in workers.split_profile(profile, 8)] == [3, 3, 2, 2]
+    assert len(workers.split_profile(LoadProfile(1000, count=2), 3)) == 2
+    a, b = LoadStats(profile), LoadStats(profile)
+    a.sent, a.acked, a.started, a.finished = 6, 6, 1.0, 3.0
+    b.sent, b.errors, b.started, b.finished = 4, 1, 2.0, None
+    a.ack_latency.record(0.002)
+    total = LoadStats(profile)
+    total.set_totals([a.to_dict(), b.to_dict()])
+    assert (total.sent, total.acked, total.errors, total.started) == (10, 6, 1, 1.0)
+    assert total.finished is None and total.ack_latency.count == 1
+
+def test_run_load_ends_on_errors_and_stop():
+    """
+    Se prueba que una carga por número de mensajes termina aunque todos los envíos fallen y
+    que la parada funciona mientras se esperan confirmaciones que no llegan.
+    """
+    def failing(topic, *args, **kwargs):
+        raise RuntimeError("topic rechazado")
+    stats = asyncio.run(run_load(failing, "TestTopic", {}, LoadProfile(10000, count=20)))
+    assert stats.sent == 0 and stats.errors == 20
+
+    async def stuck():
+        loop = asyncio.get_event_loop()
+        stop_at = loop.time() + 0.3
+        stats = await run_load(lambda topic, *a, **k: loop.create_future(), "TestTopic", {},
+                               LoadProfile(10000, count=1000), acknowledge=True, max_in_flight=5,
+                               should_stop=lambda: loop.time() >= stop_at)
+        return stats, loop.time() - stop_at
+    stats, late = asyncio.run(stuck())
+    assert stats.sent >= 5 and stats.in_flight == stats.sent and late < 1.0
@@ -0,0 +1,99 @@
+# tests/test_outbound.py
+import asyncio
+from src.wamp.outbound import OutboundItem, OutboundQueue
+
+def _run(policy, capacity, n, hold):
+    """
+    Encola n mensajes en una cola cuyo consumidor queda bloqueado hasta que se libera `hold`.
+    """
+    async def scenario():
+        loop = asyncio.get_event_loop()
+        release = asyncio.Event()
+        delivered = []
+
+        async def deliver(item):
+            await release.wait()
+            delivered.append(item.message)
+            return ("ok", item.message)
+        queue = OutboundQueue(loop, deliver, lambda item, reason: ("error", reason),
+                              capacity=capacity, policy=policy, max_in_flight=1)
+        items = [OutboundItem("t", i) for i in range(n)]
+        for item in items:
+            await queue.put(item)
+            await asyncio.sleep(0)
+        snapshot = queue.snapshot()
+        if hold:
+            release.set()
+        results = [await asyncio.wrap_future(item.future) for item in items]
+        queue.close()
+        await asyncio.sleep(0)
+        return snapshot, results, delivered
+    return asyncio.new_event_loop().run_until_complete(scenario())
+
+def test_drop_oldest_and_fail_fast():
+    """
+    Se prueba que con la cola llena se descartan los más antiguos o se rechazan los nuevos.
+    """
+    snapshot, results, delivered = _run("descartar_antiguos", 2, 5, True)
+    # El primero ya está en curso; de los cuatro restantes solo caben los dos últimos
+    assert delivered == [0, 3, 4]
+    assert snapshot["dropped"] == 2 and snapshot["depth"] == 2
+    assert [r[0] for r in results] == ["ok", "error", "error", "ok", "ok"]
+    snapshot, results, delivered = _run("fallar", 2, 5, True)
+    assert delivered == [0, 1, 2]
+    assert snapshot["rejected"] == 2
+    assert results[4] == ("error", "rechazado: cola llena")
+
+def test_block_waits_for_space():
+    """
+    Se prueba que con la política bloquear el productor espera y no se pierde nada.
+    """
+    async def scenario():
+        loop = asyncio.get_event_loop()
+
+        async def deliver(item):
+            await asyncio.sleep(0.001)
+            return item.message
+        queue = OutboundQueue(loop, deliver, lambda item, reason: None, capacity=2, max_in_flight=1)
+        items = [OutboundItem("t", i) for i in range(10)]
+        for item in items:
+            await queue.put(item)
+        results = [await asyncio.wrap_future(item.future) for item in items]
+        queue.close()
+        await asyncio.sleep(0)
+        return queue.snapshot(), results
+    snapshot, results = asyncio.new_event_loop().run_until_complete(scenario())
+    assert results == list(range(10))
+    assert snapshot["max_depth"] <= 2 and snapshot["blocked"] > 0
+
+def test_block_from_other_thread_is_bounded():
+    """
+    Se prueba que encolar desde otro hilo (la GUI) con la cola llena y "bloquear" vuelve
+    dentro del tiempo de espera y da el mensaje por rechazado.
+    """
+    import time
+    loop = asyncio.new_event_loop()
+    queue = OutboundQueue(loop, None, lambda item, reason: ("error", reason), capacity=1, policy="bloquear")
+    first = queue.submit(OutboundItem("t", 0), timeout=0.05)
+    started = time.monotonic()
+    second = queue.submit(OutboundItem("t", 1), timeout=0.05)
+    elapsed = time.monotonic() - started
+    assert not first.done() and second.done()
+    assert second.result() == ("error", "rechazado: tiempo de espera agotado con la cola llena")
+    assert 0.04 <= elapsed < 1.0 and queue.snapshot()["rejected"] == 1
+    loop.close()
+
+def test_direct_load_sends_are_counted():
+    """
+    Se prueba que los envíos de una carga que no pasan por la cola aparecen en sus métricas.
+    """
+    loop = asyncio.new_event_loop()
+    queue = OutboundQueue(loop, None, None)
+    stats = type("Stats", (), {"sent": 0})()
+    queue.track_direct(stats)
+    stats.sent = 7
+    assert queue.snapshot()["direct"] == 7
+    queue.untrack_direct(stats)
+    stats.sent = 9
+    assert queue.snapshot()["direct"] == 7 and queue.snapshot()["enqueued"] == 0
+    loop.close()
@@ -0,0 +1,45 @@
+# tests/test_probe.py
+import csv
+import json
+from src.wamp.probe import LatencyHistogram, LatencyProbe, PROBE_KEY
+
+def test_histogram_percentiles():
+    """
+    Se prueba que los percentiles del histograma tienen un error relativo acotado.
+    """
+    hist = LatencyHistogram()
+    for i in range(1, 10001):
+        hist.record(i / 1e6)  # 1 µs .. 10 ms
+    assert hist.count == 10000
+    assert hist.min == 1 and hist.max == 10000
+    for p, expected in ((50, 5000), (90, 9000), (99, 9900)):
+        value = hist.percentile(p) * 1e6
+        assert abs(value - expected) / expected < 0.02
+    assert hist.percentile(100) * 1e6 == 10000
+
+def test_histogram_merge_roundtrip():
+    """
+    Se prueba que merge() y to_dict()/from_dict() conservan las muestras.
+    """
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for i in range(100):
+        a.record(0.001)
+        b.record(0.002)
+    merged = LatencyHistogram.from_dict(json.loads(json.dumps(a.to_dict()))).merge(b)
+    assert merged.count == 200
+    assert merged.percentile(50) < 0.0015 < merged.percentile(99)
+
+def test_probe_stamp_and_observe(tmp_path):
+    """
+    Se prueba el ciclo completo de la sonda: marca, observación y exportación.
+    """
+    probe = LatencyProbe()
+    stamped = probe.stamp({"key": "value"})
+    assert stamped["key"] == "value" and stamped[PROBE_KEY]["seq"] == 1
+    assert probe.observe("TestRealm", "TestTopic", stamped)
+    assert not probe.observe("TestRealm", "TestTopic", {"key": "value"})
+    assert probe.snapshot()[("TestRealm", "TestTopic")]["count"] == 1
+    path = tmp_path / "latency.csv"
+    probe.export_csv(str(path))
+    rows = list(csv.reader(open(path, encoding="utf-8")))
+    assert rows[1][:3] == ["TestRealm", "TestTopic", "1"]
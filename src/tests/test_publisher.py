@@ -1,6 +1,7 @@
 # tests/test_publisher.py
 import time
-from src.wamp.publisher import start_publisher, send_message_now
+from src.wamp.payload import Payload
+from src.wamp.publisher import PublishedLog, start_publisher, send_message_now
 
 def test_start_publisher():
     """
@@ -21,3 +22,45 @@ def test_send_message_now():
         send_message_now("TestTopic", {"key": "value"}, delay=0)
     except Exception as e:
         assert False, f"send_message_now arrojó excepción: {e}"
+
+def test_batch_result_summary():
+    """
+    Se prueba la agregación de resultados por mensaje (acks, fallos y latencias).
+    """
+    from src.wamp.publisher import PublishResult, BatchResult
+    results = [
+        PublishResult("TestTopic", 0, ok=True, latency=0.002),
+        PublishResult("TestTopic", 1, ok=True, latency=0.004),
+        PublishResult("TestTopic", 2, error="wamp.error.not_authorized"),
+    ]
+    batch = BatchResult(results)
+    assert batch.sent == 3 and batch.acked == 2
+    assert not batch.ok
+    assert abs(batch.avg_latency - 0.003) < 1e-9
+    assert "2/3 OK" in batch.summary()
+
+def test_fan_out_plan_groups_by_session():
+    """
+    Se prueba que la selección realm × topic se agrupa por (router_url, realm) sin duplicados.
+    """
+    from src.wamp.publisher import FanOutPlan
+    plan = FanOutPlan.from_selection(
+        ["r1", "r2", "r3"], {"r1": "ws://a/ws", "r2": None},
+        {"r1": ["t1", "t2", "t1"], "r2": ["t3"], "r3": []}, "ws://default/ws")
+    assert plan.sessions == {("ws://a/ws", "r1"): ("t1", "t2"), ("ws://default/ws", "r2"): ("t3",)}
+    assert plan.size == 3
+
+def test_published_log_formats_in_batches(tmp_path, monkeypatch):
+    """
+    Se prueba que el log de publicados no forma el JSON con sangría al encolar y que el
+    lote se escribe con rol@realm al vaciarlo.
+    """
+    monkeypatch.chdir(tmp_path)
+    log = PublishedLog(interval=60)
+    payloads = [Payload({"id": i}, data=b'{"id":%d}' % i) for i in range(3)]
+    for payload in payloads:
+        log.append("realm1", "app.a", payload)
+    assert all(p._pretty is None for p in payloads) and payloads[0].size == 8
+    log.stop()
+    text = (tmp_path / "logs" / "log.txt").read_text(encoding="utf-8")
+    assert text.count("| publicador@realm1 | app.a |") == 3 and '"id": 2' in text
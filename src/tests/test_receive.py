@@ -0,0 +1,46 @@
+# tests/test_receive.py
+import io
+import time
+from src.wamp.receive import ReceivePipeline, echo_batch
+
+def test_pipeline_batches_to_sinks():
+    """
+    Se prueba que los eventos se encolan sin procesar y llegan en un único lote a cada sink.
+    """
+    pipeline = ReceivePipeline()
+    batches = []
+    pipeline.add_sink(batches.append)
+    for i in range(3):
+        pipeline.on_message("realm1", "topic1", (i,), {"id": i})
+    assert batches == []
+    assert pipeline.flush() == 3 and pipeline.flush() == 0
+    batch, = batches
+    assert [content for _, _, _, content in batch] == [{"args": [i], "kwargs": {"id": i}} for i in range(3)]
+    assert abs(batch[0][0] - time.time()) < 5
+    out = io.StringIO()
+    echo_batch(batch, out)
+    assert out.getvalue().startswith("3 mensajes recibidos")
+
+def test_pipeline_thread_flushes_on_stop():
+    """
+    Se prueba que el hilo de recepción procesa lo pendiente al detenerse.
+    """
+    pipeline = ReceivePipeline(interval=10)
+    received = []
+    pipeline.add_sink(received.extend)
+    pipeline.start()
+    pipeline.on_message("realm1", "topic1", (), {})
+    pipeline.stop()
+    assert len(received) == 1 and pipeline.received == 1
+
+def test_pipeline_pending_is_bounded():
+    """
+    Se prueba que, sin procesar, lo pendiente no pasa de max_pending y se cuentan los descartados.
+    """
+    pipeline = ReceivePipeline(max_pending=10)
+    batches = []
+    pipeline.add_sink(batches.append)
+    for i in range(25):
+        pipeline.on_message("realm1", "topic1", (), {"id": i})
+    assert pipeline.dropped == 15 and pipeline.flush() == 10
+    assert [content["kwargs"]["id"] for _, _, _, content in batches[0]] == list(range(15, 25))
@@ -0,0 +1,111 @@
+# tests/test_replay.py
+import asyncio
+import json
+from src.services.message_log import log_received, log_to_file
+from src.wamp.replay import DEFAULT_ROLES, ErrorList, ReplayStats, make_filter, read_records, replay
+
+LOG = """basura | sin formato
+2025-03-20 12:00:00.000 | publicador@realm1 | app.a | {
+  "id": 1
+}
+2025-03-20 12:00:00.200 | suscriptor@realm2 | app.b | {
+  "id": 2,
+  "list": [
+    1
+  ]
+}
+2025-03-20 12:00:00.400 | publicador | other | "texto"
+"""
+
+def test_read_records_multiline_and_jsonl(tmp_path):
+    """
+    Se prueba la lectura de registros de varias líneas del log y de capturas JSON Lines.
+    """
+    path = tmp_path / "log.txt"
+    path.write_text(LOG, encoding="utf-8")
+    errors = []
+    records = list(read_records(str(path), errors))
+    assert [r.topic for r in records] == ["app.a", "app.b", "other"]
+    assert records[0].realm == "realm1" and records[0].role == "publicador"
+    assert records[1].payload == {"id": 2, "list": [1]}
+    assert records[2].realm is None and records[2].payload == "texto"
+    assert abs(records[1].timestamp - records[0].timestamp - 0.2) < 1e-6
+    path = tmp_path / "captura.jsonl"
+    path.write_text(json.dumps({"timestamp": 1700000000000, "realm": "r", "topic": "t", "args": [5]}) + "\n",
+                    encoding="utf-8")
+    record, = read_records(str(path))
+    assert record.timestamp == 1700000000.0 and record.payload == 5
+
+def test_replay_scaled_and_filtered(tmp_path):
+    """
+    Se prueba que la reproducción filtra por topic/realm y respeta los intervalos escalados.
+    """
+    path = tmp_path / "log.txt"
+    path.write_text(LOG, encoding="utf-8")
+    sent = []
+
+    class FakeSession:
+        async def send(self, topic, message, delay, acknowledge):
+            sent.append((topic, asyncio.get_event_loop().time()))
+            return type("Result", (), {"ok": True})()
+
+    async def scenario(speed, accept):
+        stats = ReplayStats()
+        await replay(read_records(str(path), stats.errors), lambda r: FakeSession(), speed, accept, stats)
+        return stats
+    loop = asyncio.new_event_loop()
+    stats = loop.run_until_complete(scenario(2.0, make_filter(topics=["app.*"])))
+    assert [t for t, _ in sent] == ["app.a", "app.b"]
+    # 200 ms originales a velocidad 2x
+    assert 0.08 <= sent[1][1] - sent[0][1] < 0.2
+    assert stats.read == 3 and stats.matched == 2 and stats.published == 2 and len(stats.errors) == 1
+    sent.clear()
+    stats = loop.run_until_complete(scenario(0, make_filter(realms=["realm2"])))
+    assert [t for t, _ in sent] == ["app.b"]
+    loop.close()
+
+def test_replay_real_log_unwraps_and_skips_received(tmp_path, monkeypatch):
+    """
+    Se prueba que un log real con ambos lados solo reproduce lo publicado por defecto y que
+    los registros de log_received se desenvuelven a los kwargs/args originales.
+    """
+    monkeypatch.chdir(tmp_path)
+    log_to_file("2025-03-20 12:00:00.000", "app.a", "publicador", json.dumps({"id": 1}), "realm1")
+    log_received([(1742468400.1, "realm1", "app.a", {"args": [], "kwargs": {"id": 1}}),
+                  (1742468400.2, "realm1", "app.b", {"args": [7], "kwargs": {}})])
+    path = str(tmp_path / "logs" / "log.txt")
+    received = [r for r in read_records(path) if r.role == "suscriptor"]
+    assert [r.payload for r in received] == [{"id": 1}, 7]
+    sent = []
+
+    class FakeSession:
+        async def send(self, topic, message, delay, acknowledge):
+            sent.append((topic, message))
+            return type("Result", (), {"ok": True})()
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(replay(read_records(path), lambda r: FakeSession(), 0, make_filter(roles=DEFAULT_ROLES)))
+    loop.close()
+    assert sent == [("app.a", {"id": 1})]
+
+def test_replay_rejects_partial_events_and_caps_errors(tmp_path):
+    """
+    Se prueba que los eventos con varios args (o args y kwargs) se rechazan en lugar de
+    publicar una parte, y que los errores guardados están acotados pero se cuentan todos.
+    """
+    path = tmp_path / "captura.jsonl"
+    lines = [{"timestamp": 1, "topic": "a", "args": [1, 2]},
+             {"timestamp": 2, "topic": "b", "args": [1], "kwargs": {"x": 1}},
+             {"timestamp": 3, "topic": "c", "args": [5]}]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+    errors = ErrorList(limit=1)
+    assert [r.payload for r in read_records(str(path), errors)] == [5]
+    assert errors.total == 2 and len(errors) == 1
+
+    def no_realm(record):
+        raise ValueError("sin realm")
+    records = [r for _ in range(300) for r in read_records(str(path))]
+    loop = asyncio.new_event_loop()
+    stats = loop.run_until_complete(replay(records, no_realm, 0))
+    loop.close()
+    assert stats.failed == 300 and stats.errors.total == 300 and len(stats.errors) == 100
+    assert stats.to_dict()["skipped"] == 300
@@ -0,0 +1,22 @@
+# tests/test_run.py
+from src.wamp.run import scenario_targets, scenario_timing, PROGRAMMED, ON_DEMAND
+
+def test_scenario_targets_formats():
+    """
+    Se prueba que se expanden los dos formatos de escenario guardados por la GUI.
+    """
+    single = {"realm": "default", "router_url": "ws://127.0.0.1:60001/ws", "topic": "MsgEP"}
+    assert scenario_targets(single) == [("ws://127.0.0.1:60001/ws", "default", "MsgEP")]
+    multi = {"realms": ["default", "default2"], "topics": {"default": ["MsgEP", "MsgCrEnt"], "default2": []},
+             "router_url": "ws://127.0.0.1:60002/ws"}
+    assert scenario_targets(multi) == [
+        ("ws://127.0.0.1:60002/ws", "default", "MsgEP"),
+        ("ws://127.0.0.1:60002/ws", "default", "MsgCrEnt"),
+    ]
+
+def test_scenario_timing():
+    """
+    Se prueba el cálculo del retardo de los modos On-Demand y Programado.
+    """
+    assert scenario_timing(ON_DEMAND, "01:00:00") == (0, None)
+    assert scenario_timing(PROGRAMMED, "00:05:00") == (300, None)
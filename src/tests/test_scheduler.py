@@ -0,0 +1,81 @@
+# tests/test_scheduler.py
+import asyncio
+from src.wamp.scheduler import Scheduler
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_scheduler_order_and_jitter():
+    """
+    Se prueba que los envíos se disparan en orden de vencimiento y se mide el jitter.
+    """
+    async def scenario():
+        scheduler = Scheduler()
+        fired = []
+        now = scheduler.loop.time()
+        for i in reversed(range(200)):
+            scheduler.call_at(now + 0.01 + i * 0.0002, fired.append, i)
+        await asyncio.sleep(0.1)
+        return scheduler, fired
+    scheduler, fired = run(scenario())
+    assert fired == list(range(200))
+    summary = scheduler.jitter_summary()
+    assert summary["count"] == 200 and summary["early"] == 0
+
+def test_periodic_and_cancel():
+    """
+    Se prueba un envío periódico con número de repeticiones y la cancelación de otro.
+    """
+    async def scenario():
+        scheduler = Scheduler()
+        ticks, cancelled = [], []
+        job = scheduler.call_every(0.005, ticks.append, 1, count=4)
+        other = scheduler.call_later(0.01, cancelled.append, 1)
+        scheduler.cancel(other)
+        await asyncio.sleep(0.08)
+        return job, ticks, cancelled
+    job, ticks, cancelled = run(scenario())
+    assert len(ticks) == 4 and job.runs == 4
+    assert cancelled == []
+
+def test_timeline_pause_resume():
+    """
+    Se prueba que pausar una línea de tiempo retrasa sus envíos y cancelarla los descarta.
+    """
+    async def scenario():
+        scheduler = Scheduler()
+        timeline = scheduler.timeline("proyecto")
+        fired, other = [], []
+        scheduler.call_later(0.02, fired.append, "a", timeline=timeline)
+        scheduler.call_later(0.02, other.append, "b")
+        timeline.pause()
+        await asyncio.sleep(0.04)
+        paused_state = (list(fired), list(other))
+        timeline.resume()
+        await asyncio.sleep(0.04)
+        resumed = list(fired)
+        scheduler.call_later(0.01, fired.append, "c", timeline=timeline)
+        timeline.cancel()
+        await asyncio.sleep(0.03)
+        return paused_state, resumed, fired
+    paused_state, resumed, fired = run(scenario())
+    assert paused_state == ([], ["b"])
+    assert resumed == ["a"]
+    assert fired == ["a"]
+
+def test_scheduler_survives_loop_restart():
+    """
+    Se prueba que el planificador usa el bucle actual tras reiniciarse el hilo de red.
+    """
+    scheduler = Scheduler()
+
+    async def first():
+        scheduler.call_later(10, print, "no llega")
+
+    async def second():
+        fired = []
+        scheduler.call_later(0.01, fired.append, 1)
+        await asyncio.sleep(0.05)
+        return fired
+    run(first())
+    assert run(second()) == [1]
@@ -0,0 +1,65 @@
+# tests/test_search.py
+import datetime
+import pytest
+from src.wamp.search import HistoryIndex, SearchError, parse_time, tokenize
+
+def build_index():
+    index = HistoryIndex()
+    today = datetime.date(2024, 5, 1)
+    base = datetime.datetime.combine(today, datetime.time(11, 0)).timestamp()
+    for seq in range(200):
+        topic = "MsgAlerts.cpu" if seq % 2 else "Telemetry"
+        content = {"args": [], "kwargs": {"id": seq, "status": "ALARM" if seq % 10 == 0 else "ok",
+                                          "text": "Disco lleno" if seq == 42 else "normal"}}
+        index.add(seq, base + seq * 60, "Realm1", topic, tokenize(content))
+    return index, today
+
+def test_search_queries():
+    """
+    Se prueban las consultas por topic, ruta=valor, palabra y rango horario, y su combinación.
+    """
+    index, today = build_index()
+    assert index.search("kwargs.id:123") == [123]
+    assert index.search("topic:MsgAlerts kwargs.id:124") == []
+    assert index.search("topic:MsgAlerts kwargs.status:alarm") == []
+    assert index.search("topic:Telemetry kwargs.status:ALARM") == list(range(0, 200, 10))
+    assert index.search("lleno") == [42]
+    # 11:00 + 100 min = 12:40
+    assert index.search("after:12:40 before:12:45 topic:MsgAlerts", today=today) == [101, 103, 105]
+    assert index.search("kwargs.id:*", limit=5) == [195, 196, 197, 198, 199]
+    assert index.search('"kwargs.text:disco lleno"') == [42]
+    assert index.search("topic:MsgAlerts", limit=3) == [195, 197, 199]
+    assert index.search("realm:Realm1 topic:Msg*", limit=2) == [197, 199]
+    with pytest.raises(SearchError):
+        index.search("after:25:99", today=today)
+    assert parse_time("2024-05-01 12:00") == datetime.datetime(2024, 5, 1, 12).timestamp()
+
+def test_prune_follows_history():
+    """
+    Se prueba que lo que sale del historial deja de encontrarse y que el índice se recorta.
+    """
+    index, _ = build_index()
+    index.prune(150)
+    assert index.search("kwargs.status:alarm") == [150, 160, 170, 180, 190]
+    assert len(index) == 50 and "kwargs.id=42" not in index.tokens
+
+def test_high_cardinality_paths_use_hashes():
+    """
+    Se prueba que una ruta con muchos valores distintos pasa a hashes sin perder resultados,
+    también tras podar; las de pocos valores siguen con una lista por valor.
+    """
+    index = HistoryIndex(max_values=50)
+    for seq in range(200):
+        content = {"args": [], "kwargs": {"id": seq, "status": "ALARM" if seq % 10 == 0 else "ok"}}
+        index.add(seq, 1000.0 + seq, "Realm1", "Telemetry", tokenize(content))
+    assert set(index.hashed) == {"kwargs.id"}
+    assert not any(token.startswith("kwargs.id=") for token in index.tokens)
+    assert "kwargs.status=alarm" in index.tokens
+    # Valores anteriores y posteriores al paso a hashes
+    assert index.search("kwargs.id:3") == [3] and index.search("kwargs.id:123") == [123]
+    assert index.search("kwargs.status:alarm kwargs.id:120") == [120]
+    assert index.search("kwargs.status:alarm kwargs.id:121") == []
+    assert index.search("kwargs.id:*", limit=2) == [198, 199]
+    index.prune(150)
+    assert index.search("kwargs.id:123") == [] and index.search("kwargs.id:160") == [160]
+    assert len(index.hashed["kwargs.id"][1]) == 50
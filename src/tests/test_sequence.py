@@ -0,0 +1,47 @@
+# tests/test_sequence.py
+import pytest
+from src.wamp.sequence import SequenceChecker, SequenceStream, compile_path
+
+def test_stream_detects_gaps_duplicates_and_reordering():
+    """
+    Se prueba la clasificación de cada secuencia y los contadores del flujo.
+    """
+    stream = SequenceStream(window=64)
+    statuses = [stream.observe(seq) for seq in [1, 2, 3, 6, 5, 5, 7, 4]]
+    assert statuses == ["ok", "ok", "ok", "gap", "reordered", "duplicate", "ok", "reordered"]
+    assert (stream.missing, stream.duplicates, stream.reordered) == (0, 1, 2)
+    stream.observe(200)  # salto mayor que la ventana
+    assert stream.missing == 192
+    assert stream.observe(100) == "late"
+    assert stream.observe(199) == "reordered" and stream.missing == 191
+    assert stream.observe(0) == "restart" and stream.restarts == 1
+    assert len(stream.bits) == 8  # memoria fija: 64 bits
+
+def test_stream_detects_restart_within_window():
+    """
+    Se prueba que repetir una prueba corta (0..99 dos veces) es un reinicio y no 100 duplicados.
+    """
+    stream = SequenceStream()
+    for _ in range(2):
+        for seq in range(100):
+            stream.observe(seq)
+    assert (stream.restarts, stream.duplicates, stream.missing, stream.reordered) == (1, 0, 0, 0)
+    assert stream.observe(50) == "duplicate"
+    stream = SequenceStream()
+    assert [stream.observe(seq) for seq in [5, 6, 7, 1]] == ["ok", "ok", "ok", "restart"]
+
+def test_checker_keys_streams_by_publisher():
+    """
+    Se prueba que cada publicador tiene su propio flujo y que se cuentan los mensajes sin secuencia.
+    """
+    checker = SequenceChecker("kwargs.seq", "kwargs.pub")
+    batch = [(0, "R", "t", {"args": [], "kwargs": {"seq": seq, "pub": pub}})
+             for pub, seq in [("a", 1), ("b", 1), ("a", 2), ("b", 3), ("a", 2)]]
+    batch.append((0, "R", "t", {"args": [], "kwargs": {"otro": 1}}))
+    checker.check_batch(batch)
+    totals = checker.totals()
+    assert (totals["streams"], totals["missing"], totals["duplicates"], totals["without_seq"]) == (2, 1, 1, 1)
+    assert [row["publisher"] for row in checker.report()] == ["a", "b"]
+    assert compile_path("args[0].seq")([{"seq": 7}], {}) == 7
+    with pytest.raises(ValueError):
+        compile_path("seq")
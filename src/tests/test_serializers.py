@@ -0,0 +1,22 @@
+# tests/test_serializers.py
+import pytest
+from src.wamp.serializers import normalize_serializers, compare_serializers
+
+def test_normalize_serializers():
+    """
+    Se prueba que la configuración de serializadores se valida y normaliza.
+    """
+    assert normalize_serializers("MsgPack, json") == ["msgpack", "json"]
+    assert normalize_serializers(["cbor", "cbor"]) == ["cbor"]
+    assert normalize_serializers("") is None
+    with pytest.raises(ValueError):
+        normalize_serializers(["protobuf"])
+
+def test_compare_serializers_reports_json():
+    """
+    Se prueba que la comparación siempre incluye JSON con tamaño y tiempos.
+    """
+    rows = {r["name"]: r for r in compare_serializers({"a": 1, "b": "x" * 100}, repeat=5)}
+    assert set(rows) == {"msgpack", "cbor", "ubjson", "json"}
+    assert rows["json"]["available"] and rows["json"]["size"] > 100
+    assert rows["json"]["encode_us"] >= 0
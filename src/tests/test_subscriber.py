@@ -2,8 +2,8 @@
 import time
 from src.wamp.subscriber import start_subscriber
 
-def dummy_on_message(realm, topic, message):
-    print("Mensaje dummy recibido:", realm, topic, message)
+def dummy_on_message(realm, topic, args, kwargs):
+    print("Mensaje dummy recibido:", realm, topic, args, kwargs)
 
 def test_start_subscriber():
     """
@@ -14,3 +14,77 @@ def test_start_subscriber():
         time.sleep(1)
     except Exception as e:
         assert False, f"start_subscriber falló: {e}"
+
+def test_realm_subscription_applies_diff():
+    """
+    Se prueba que un cambio de topics solo suscribe los nuevos y cancela los retirados, sin reconectar.
+    """
+    import asyncio
+    from src.wamp.subscriber import RealmSubscription
+
+    class FakeSession:
+        def __init__(self):
+            self.subscriptions = {"a": object(), "b": object()}
+            self.calls = []
+
+        def is_attached(self):
+            return True
+
+        async def add_topic(self, topic):
+            self.calls.append(("+", topic))
+            self.subscriptions[topic] = object()
+
+        async def remove_topic(self, topic):
+            self.calls.append(("-", topic))
+            del self.subscriptions[topic]
+
+    async def scenario():
+        entry = RealmSubscription("ws://127.0.0.1:60001/ws", "TestRealm", dummy_on_message)
+        entry.session = session = FakeSession()
+        entry.topics = {"b", "c"}
+        await entry.sync()
+        return entry, session
+    entry, session = asyncio.new_event_loop().run_until_complete(scenario())
+    assert session.calls == [("-", "a"), ("+", "c")]
+    assert entry.session is session and entry.subscribed == {"b", "c"}
+
+def test_for_each_topic_is_bounded_and_isolates_failures():
+    """
+    Se prueba que las suscripciones se lanzan en paralelo sin superar la ventana y que un fallo no detiene al resto.
+    """
+    import asyncio
+    from src.wamp.subscriber import for_each_topic
+    state = {"in_flight": 0, "peak": 0, "done": []}
+
+    async def subscribe(topic):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        if topic == "t3":
+            raise RuntimeError("no autorizado")
+        state["done"].append(topic)
+
+    topics = [f"t{i}" for i in range(20)]
+    failures = asyncio.new_event_loop().run_until_complete(for_each_topic(subscribe, topics, window=4))
+    assert state["peak"] == 4
+    assert list(failures) == ["t3"] and len(state["done"]) == 19
+
+def test_sequence_is_checked_before_filters():
+    """
+    Se prueba que los eventos descartados por el filtro pasan por observe_callback, de modo
+    que el comprobador de secuencia no los cuenta como perdidos.
+    """
+    from autobahn.wamp.types import ComponentConfig
+    from src.wamp.filters import compile_filter
+    from src.wamp.sequence import SequenceChecker
+    from src.wamp.subscriber import MultiTopicSubscriber
+    checker = SequenceChecker("kwargs.seq")
+    delivered = []
+    session = MultiTopicSubscriber.factory([], lambda *event: delivered.append(event),
+                                           {"t": compile_filter("kwargs.seq > 5")}, checker.check)(ComponentConfig(realm="r"))
+    on_event = session.handler("r", "t")
+    for seq in range(10):
+        on_event(seq=seq)
+    assert [kwargs["seq"] for _, _, _, kwargs in delivered] == [6, 7, 8, 9]
+    assert checker.totals()["received"] == 10 and checker.totals()["missing"] == 0
@@ -0,0 +1,51 @@
+# tests/test_templates.py
+import json
+import pytest
+from src.wamp.templates import as_payload, compile_payload, load_payload
+
+def test_template_render_matches_bytes():
+    """
+    Se prueba que objeto y bytes de un mismo mensaje coinciden y que los marcadores
+    solos conservan su tipo mientras que los interpolados se convierten en texto.
+    """
+    template = compile_payload('{"id": {{seq}}, "ref": "msg-{{seq}}", "n": {{rand_int(5, 5)}},'
+                               ' "fijo": {"a": [1, 2]}, "estado": "{{choice([\'OK\'])}}"}')
+    obj, data = template.render_pair(7)
+    assert obj == {"id": 7, "ref": "msg-7", "n": 5, "fijo": {"a": [1, 2]}, "estado": "OK"}
+    assert json.loads(data) == obj
+    # Las partes sin marcadores se comparten entre mensajes, no se copian
+    assert template.render(8)["fijo"] is template.source_obj["fijo"]
+    assert template.render()["id"] == 1 and template.render()["id"] == 2
+
+def test_static_and_invalid_payloads():
+    """
+    Se prueba que un JSON sin marcadores se devuelve tal cual y que los errores se detectan al compilar.
+    """
+    assert load_payload('{"a": 1}').obj == {"a": 1}
+    with pytest.raises(ValueError):
+        compile_payload('{"a": {{desconocido}}}')
+    with pytest.raises(ValueError):
+        compile_payload('{"a": {{seq}')
+
+def test_payload_encodings_cached():
+    """
+    Se prueba que un payload fijo se analiza una vez y reutiliza sus codificaciones.
+    """
+    payload = load_payload('{"a": [1, 2], "b": "ñ"}')
+    assert payload.obj == {"a": [1, 2], "b": "ñ"}
+    assert payload.compact == '{"a":[1,2],"b":"ñ"}'
+    assert payload.pretty is payload.pretty
+    assert as_payload(payload) is payload
+
+def test_as_payload_reuses_template_bytes(monkeypatch):
+    """
+    Se prueba que el Payload de una plantilla lleva los bytes del render, sin otro json.dumps.
+    """
+    template = compile_payload('{"seq": {{seq}}, "fijo": [1, "ñ"]}')
+    dumps = json.dumps
+    calls = []
+    monkeypatch.setattr(json, "dumps", lambda *a, **k: calls.append(1) or dumps(*a, **k))
+    payload = as_payload(template)
+    assert payload.data == '{"seq":1,"fijo":[1,"ñ"]}'.encode("utf-8")
+    assert payload.obj == {"seq": 1, "fijo": [1, "ñ"]} and payload.compact == '{"seq":1,"fijo":[1,"ñ"]}'
+    assert calls == []
@@ -0,0 +1,42 @@
+# tests/test_topics.py
+import pytest
+from src.wamp.topics import EXACT, PREFIX, WILDCARD, TopicTrie, parse_topic, split_topics
+
+def test_parse_topic():
+    """
+    Se prueba la traducción de los patrones de la GUI a uri + match de WAMP.
+    """
+    p = parse_topic("MsgAlerts.*")
+    assert (p.uri, p.match) == ("MsgAlerts.", PREFIX)
+    p = parse_topic("app.*.estado")
+    assert (p.uri, p.match) == ("app..estado", WILDCARD)
+    assert parse_topic("app..estado").match == WILDCARD
+    assert parse_topic(" app.sensor.1 ").match == EXACT
+    for invalid in ["", "*", "app.sens*", "a.*x.b"]:
+        with pytest.raises(ValueError):
+            parse_topic(invalid)
+
+def test_trie_best_match():
+    """
+    Se prueba que el trie resuelve el patrón más específico: exacto, prefijo más largo, comodín.
+    """
+    trie = TopicTrie()
+    for pattern in ["MsgAlerts.*", "MsgAlerts.disk.*", "MsgAlerts.disk.full", "app.*.estado"]:
+        trie.add(pattern)
+    assert trie.best("MsgAlerts.cpu") == "MsgAlerts.*"
+    assert trie.best("MsgAlerts.disk.sda") == "MsgAlerts.disk.*"
+    assert trie.best("MsgAlerts.disk.full") == "MsgAlerts.disk.full"
+    assert trie.best("MsgAlerts") is None  # el prefijo exige algo más tras el punto
+    assert trie.best("app.motor.estado") == "app.*.estado"
+    assert trie.best("app.motor.x.estado") is None
+    # Al retirar un patrón se invalida la caché
+    trie.remove("MsgAlerts.disk.*")
+    assert trie.best("MsgAlerts.disk.sda") == "MsgAlerts.*"
+    assert len(trie) == 3 and "app.*.estado" in trie
+
+def test_split_topics():
+    """
+    Se prueba la lista de topics de publicación escrita en un único campo.
+    """
+    assert split_topics(" MsgEP, MsgCrEnt,,MsgEP ") == ["MsgEP", "MsgCrEnt"]
+    assert split_topics("") == [] and split_topics(None) == []
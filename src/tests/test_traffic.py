@@ -0,0 +1,23 @@
+# tests/test_traffic.py
+import pytest
+from src.wamp.traffic import TrafficStats
+
+def test_traffic_counters():
+    """
+    Se prueban tasas, tamaños e intervalos entre llegadas con un reloj controlado.
+    """
+    stats = TrafficStats(clock=lambda: 0.0)
+    stats.record_many([(0.1 * i, "R", "a", 100 + i) for i in range(10)])
+    stats.record("R", "b", 50, now=0.5)
+    snapshot = stats.snapshot(now=1.0)
+    a = snapshot[("R", "a")]
+    assert a["count"] == 10 and a["bytes"] == 1045
+    assert (a["min_size"], a["max_size"], a["avg_size"]) == (100, 109, 104.5)
+    assert a["rate"] == pytest.approx(10.0) and a["ewma_rate"] == pytest.approx(10.0)
+    assert a["gap_p50"] == pytest.approx(0.1, rel=0.02)
+    assert snapshot[("R", "b")]["gap_p50"] is None
+    # Sin tráfico la tasa instantánea cae a 0 y la media móvil decae
+    a = stats.snapshot(now=2.0)[("R", "a")]
+    assert a["rate"] == 0 and 0 < a["ewma_rate"] < 10.0
+    stats.reset()
+    assert stats.snapshot(now=3.0) == {}
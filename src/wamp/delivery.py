@@ -0,0 +1,81 @@
+# src/wamp/delivery.py
+import collections
+import threading
+import time
+
+# Frecuencia de volcado a la GUI (Hz)
+FLUSH_HZ = 30
+# Máximo de filas que se añaden a la vista por volcado
+MAX_PER_FLUSH = 200
+# Máximo de mensajes retenidos entre dos volcados
+CAPACITY = 20000
+# Ventana (segundos) para calcular la tasa de mensajes
+RATE_WINDOW = 1.0
+
+class CoalescingBuffer:
+    """
+    Buffer entre el hilo de red y la GUI: el hilo de red añade con push() (barato, sin
+    señales Qt) y un temporizador de la GUI recoge lotes con drain() a FLUSH_HZ. Si
+    llegan más mensajes de los que la vista puede mostrar, se conservan los más recientes
+    y el resto se cuenta como descartado de la vista (el log a archivo no se ve afectado).
+    """
+    def __init__(self, max_per_flush=MAX_PER_FLUSH, capacity=CAPACITY):
+        self.max_per_flush = max_per_flush
+        self._items = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._window = collections.deque()
+        self.received = 0
+        self.dropped = 0
+        self.rate = 0.0
+        self.throttling = False
+
+    def push(self, item):
+        with self._lock:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self.received += 1
+
+    def push_many(self, items):
+        with self._lock:
+            overflow = len(self._items) + len(items) - self._items.maxlen
+            if overflow > 0:
+                self.dropped += overflow
+            self._items.extend(items)
+            self.received += len(items)
+
+    def drain(self):
+        """
+        Devuelve la lista de mensajes a mostrar en este volcado (a lo sumo max_per_flush).
+        """
+        with self._lock:
+            items, self._items = self._items, collections.deque(maxlen=self._items.maxlen)
+            dropped_before = self.dropped
+            if len(items) > self.max_per_flush:
+                self.dropped += len(items) - self.max_per_flush
+            received = self.received
+        now = time.monotonic()
+        self._window.append((now, received, self.dropped))
+        while len(self._window) > 1 and now - self._window[0][0] > RATE_WINDOW:
+            self._window.popleft()
+        first_time, first_received, first_dropped = self._window[0]
+        if now > first_time:
+            self.rate = (received - first_received) / (now - first_time)
+        # Hay limitación si se ha descartado algo durante la última ventana
+        self.throttling = self.dropped > first_dropped or self.dropped > dropped_before
+        return list(items)[-self.max_per_flush:]
+
+    def reset(self):
+        with self._lock:
+            self._items.clear()
+            self.received = 0
+            self.dropped = 0
+        self._window.clear()
+        self.rate = 0.0
+        self.throttling = False
+
+    def status(self):
+        """
+        Texto del indicador: "N msgs/s, M descartados de la vista".
+        """
+        return f"{self.rate:.0f} msgs/s, {self.dropped} descartados de la vista"
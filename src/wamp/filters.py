@@ -0,0 +1,201 @@
+# src/wamp/filters.py
+"""
+Filtros de suscripción. Una expresión como
+
+    kwargs.status == "ALARM" and kwargs.level > 3
+
+se compila una vez en un predicado (cierres de Python, sin eval) que el suscriptor evalúa
+en el hilo de red por cada evento, antes de pasarlo a la vista o al log.
+
+Sintaxis: campos args[0], kwargs.a.b, kwargs["con-guion"], topic y realm; constantes
+(números, "texto", true/false/null o True/False/None, listas); comparaciones
+==, !=, <, <=, >, >=, in, not in (encadenables: 1 < kwargs.x <= 5); and, or, not y
+paréntesis. Un campo que no existe no cumple ninguna comparación salvo != .
+"""
+import ast
+import operator
+
+class FilterError(ValueError):
+    pass
+
+# Valor de un campo ausente
+MISSING = object()
+
+CONSTANTS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+COMPARISONS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+}
+# Posición de cada raíz en la tupla de evaluación (realm, topic, args, kwargs)
+ROOTS = {"realm": 0, "topic": 1, "args": 2, "kwargs": 3}
+
+def _step(value, key):
+    if isinstance(value, dict):
+        return value.get(key, MISSING)
+    if isinstance(value, (list, tuple)) and isinstance(key, int):
+        return value[key] if -len(value) <= key < len(value) else MISSING
+    return MISSING
+
+def _compile_field(node):
+    """
+    Devuelve (índice de la raíz, ruta de claves) de un campo, o None si no lo es.
+    """
+    path = []
+    while True:
+        if isinstance(node, ast.Attribute):
+            path.append(node.attr)
+            node = node.value
+        elif isinstance(node, ast.Subscript):
+            key = node.slice
+            if isinstance(key, ast.Index):  # Python < 3.9
+                key = key.value
+            if not isinstance(key, ast.Constant) or not isinstance(key.value, (str, int)):
+                raise FilterError("Los índices deben ser números o textos constantes")
+            path.append(key.value)
+            node = node.value
+        elif isinstance(node, ast.Name) and node.id in ROOTS:
+            return ROOTS[node.id], tuple(reversed(path))
+        else:
+            return None
+
+def _compile_value(node):
+    field = _compile_field(node)
+    if field is not None:
+        root, path = field
+        if not path:
+            return lambda event: event[root]
+
+        def get(event):
+            value = event[root]
+            for key in path:
+                value = _step(value, key)
+                if value is MISSING:
+                    break
+            return value
+        return get
+    if isinstance(node, ast.Constant) and isinstance(node.value, (str, int, float, bool, type(None))):
+        value = node.value
+        return lambda event: value
+    if isinstance(node, ast.Name) and node.id in CONSTANTS:
+        value = CONSTANTS[node.id]
+        return lambda event: value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant):
+        if isinstance(node.operand.value, bool) or not isinstance(node.operand.value, (int, float)):
+            raise FilterError(f"Solo se puede negar un número: -{node.operand.value!r}")
+        value = -node.operand.value
+        return lambda event: value
+    if isinstance(node, (ast.List, ast.Tuple)):
+        items = [_compile_value(item) for item in node.elts]
+        # Solo constantes: la lista se construye una vez (topic/realm dependen del evento)
+        if all(isinstance(item, ast.Constant) or (isinstance(item, ast.Name) and item.id in CONSTANTS)
+               for item in node.elts):
+            constant = [item(None) for item in items]
+            return lambda event: constant
+        return lambda event: [item(event) for item in items]
+    if isinstance(node, ast.Name):
+        raise FilterError(f"Nombre desconocido: {node.id} (use args, kwargs, topic o realm)")
+    raise FilterError(f"Expresión no permitida: {ast.dump(node)[:60]}")
+
+def _compare(op, left, right):
+    if left is MISSING or right is MISSING:
+        return op is operator.ne
+    try:
+        return op(left, right)
+    except TypeError:
+        # Tipos no comparables (p. ej. texto > número): no cumple
+        return False
+
+def _compile_bool(node):
+    if isinstance(node, ast.BoolOp):
+        # Se encadenan de dos en dos para evitar generadores en cada evento
+        parts = [_compile_bool(value) for value in node.values]
+        combined = parts[0]
+        for part in parts[1:]:
+            if isinstance(node.op, ast.And):
+                combined = (lambda a, b: lambda event: a(event) and b(event))(combined, part)
+            else:
+                combined = (lambda a, b: lambda event: a(event) or b(event))(combined, part)
+        return combined
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        inner = _compile_bool(node.operand)
+        return lambda event: not inner(event)
+    if isinstance(node, ast.Compare):
+        operands = [_compile_value(node.left)] + [_compile_value(c) for c in node.comparators]
+        ops = [COMPARISONS[type(op)] for op in node.ops if type(op) in COMPARISONS]
+        if len(ops) != len(node.ops):
+            raise FilterError("Operador de comparación no permitido (use ==, !=, <, <=, >, >=, in, not in)")
+        if len(ops) == 1:
+            left, right, op = operands[0], operands[1], ops[0]
+            return lambda event: _compare(op, left(event), right(event))
+
+        def chain(event):
+            left = operands[0](event)
+            for op, operand in zip(ops, operands[1:]):
+                right = operand(event)
+                if not _compare(op, left, right):
+                    return False
+                left = right
+            return True
+        return chain
+    # Un campo o constante sola: se evalúa su veracidad (campo ausente = falso)
+    value = _compile_value(node)
+
+    def truthy(event):
+        v = value(event)
+        return v is not MISSING and bool(v)
+    return truthy
+
+class SubscriptionFilter:
+    """
+    Predicado compilado con sus contadores. filter(realm, topic, args, kwargs) -> bool.
+    """
+    __slots__ = ("expression", "_predicate", "matched", "rejected")
+
+    def __init__(self, expression, predicate):
+        self.expression = expression
+        self._predicate = predicate
+        self.matched = 0
+        self.rejected = 0
+
+    def __call__(self, realm, topic, args, kwargs):
+        if self._predicate((realm, topic, args, kwargs)):
+            self.matched += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def summary(self):
+        return f"{self.matched} coinciden, {self.rejected} descartados"
+
+def compile_filter(expression):
+    """
+    Compila la expresión; devuelve None si está vacía. Lanza FilterError si no es válida.
+    """
+    if expression is None or not str(expression).strip():
+        return None
+    expression = str(expression).strip()
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise FilterError(f"Sintaxis inválida en el filtro: {e.msg}") from None
+    try:
+        return SubscriptionFilter(expression, _compile_bool(tree.body))
+    except FilterError:
+        raise
+    except Exception as e:
+        raise FilterError(f"Filtro no válido: {e}") from None
+
+def compile_filters(expressions):
+    """
+    {topic: expresión} -> {topic: SubscriptionFilter}, omitiendo las vacías.
+    """
+    compiled = {}
+    for topic, expression in (expressions or {}).items():
+        try:
+            predicate = compile_filter(expression)
+        except FilterError as e:
+            raise FilterError(f"Filtro de {topic}: {e}") from None
+        if predicate is not None:
+            compiled[topic] = predicate
+    return compiled
@@ -0,0 +1,268 @@
+# src/wamp/history.py
+import datetime
+import json
+from array import array
+
+# Tamaño por defecto del historial de los visores
+DEFAULT_HISTORY = 100000
+
+class RingBuffer:
+    """
+    Historial de capacidad fija: añadir e indexar son O(1) y, una vez lleno, cada
+    inserción desplaza al más antiguo. Cada elemento recibe un número de secuencia
+    absoluto que no cambia al desplazarse la ventana (get(seq) devuelve None si ya salió).
+    """
+    def __init__(self, capacity=DEFAULT_HISTORY):
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser al menos 1")
+        self.capacity = int(capacity)
+        self._items = [None] * self.capacity
+        self._head = 0
+        self._len = 0
+        self.first_seq = 0
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        return self._items[(self._head + index) % self.capacity]
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        self._items[(self._head + index) % self.capacity] = value
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self._items[(self._head + i) % self.capacity]
+
+    @property
+    def next_seq(self):
+        return self.first_seq + self._len
+
+    def overflow(self, count):
+        """
+        Cuántos elementos se desplazarían al añadir `count`.
+        """
+        return max(0, self._len + count - self.capacity)
+
+    def discard(self, count):
+        """
+        Descarta los `count` elementos más antiguos.
+        """
+        count = min(count, self._len)
+        for i in range(count):
+            self._items[(self._head + i) % self.capacity] = None
+        self._head = (self._head + count) % self.capacity
+        self._len -= count
+        self.first_seq += count
+
+    def append(self, item):
+        """
+        Añade al final (desplazando el más antiguo si está lleno) y devuelve su secuencia.
+        """
+        if self._len == self.capacity:
+            self.discard(1)
+        self._items[(self._head + self._len) % self.capacity] = item
+        self._len += 1
+        return self.next_seq - 1
+
+    def index_of(self, seq):
+        """
+        Posición actual del elemento con secuencia `seq`, o None si ya no está.
+        """
+        index = seq - self.first_seq
+        return index if 0 <= index < self._len else None
+
+    def get(self, seq):
+        index = self.index_of(seq)
+        return None if index is None else self[index]
+
+    def cell(self, index, column):
+        return self[index][column]
+
+    def resize(self, capacity):
+        """
+        Cambia la capacidad conservando los elementos más recientes.
+        """
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser al menos 1")
+        items = list(self)[-capacity:]
+        self.first_seq += self._len - len(items)
+        self.capacity = int(capacity)
+        self._items = items + [None] * (self.capacity - len(items))
+        self._head = 0
+        self._len = len(items)
+
+    def clear(self):
+        self.first_seq = self.next_seq
+        self._items = [None] * self.capacity
+        self._head = 0
+        self._len = 0
+
+def encode_payload(obj):
+    """
+    Serialización compacta con la que MessageStore guarda cada mensaje.
+    """
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+def format_time(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(sep=" ", timespec="milliseconds")
+
+class MessageStore:
+    """
+    Historial columnar de mensajes recibidos con la misma interfaz que RingBuffer.
+    Cada fila ocupa un float64 (hora), dos enteros (realm y topic internados) y su
+    contenido en JSON compacto dentro de un único buffer de bytes con su array de
+    offsets; las filas (hora, realm, topic, contenido) se decodifican solo al pedirlas.
+    Al desplazarse la ventana, el buffer se compacta cuando la mitad es espacio muerto.
+    """
+    def __init__(self, capacity=DEFAULT_HISTORY):
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser al menos 1")
+        self.names = []
+        self._ids = {}
+        self._allocate(int(capacity))
+        self.first_seq = 0
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._realms = array("I", bytes(4 * capacity))
+        self._topics = array("I", bytes(4 * capacity))
+        self._offsets = array("Q", bytes(8 * capacity))
+        self._sizes = array("I", bytes(4 * capacity))
+        self._data = bytearray()
+        self._base = 0  # offset absoluto de _data[0]
+        self._head = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def next_seq(self):
+        return self.first_seq + self._len
+
+    @property
+    def nbytes(self):
+        """
+        Memoria aproximada del historial (arrays más buffer de contenidos).
+        """
+        arrays = (self._times, self._realms, self._topics, self._offsets, self._sizes)
+        return sum(a.itemsize * len(a) for a in arrays) + len(self._data)
+
+    def intern(self, name):
+        name_id = self._ids.get(name)
+        if name_id is None:
+            name_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def _slot(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        return (self._head + index) % self.capacity
+
+    def overflow(self, count):
+        return max(0, self._len + count - self.capacity)
+
+    def index_of(self, seq):
+        index = seq - self.first_seq
+        return index if 0 <= index < self._len else None
+
+    def append(self, record):
+        """
+        record = (timestamp epoch, realm, topic, contenido); el contenido puede venir ya
+        codificado con encode_payload (bytes). Devuelve la secuencia del mensaje.
+        """
+        timestamp, realm, topic, payload = record
+        if not isinstance(payload, (bytes, bytearray)):
+            payload = encode_payload(payload)
+        if self._len == self.capacity:
+            self.discard(1)
+        slot = (self._head + self._len) % self.capacity
+        self._times[slot] = timestamp
+        self._realms[slot] = self.intern(realm)
+        self._topics[slot] = self.intern(topic)
+        self._offsets[slot] = self._base + len(self._data)
+        self._sizes[slot] = len(payload)
+        self._data += payload
+        self._len += 1
+        return self.next_seq - 1
+
+    def discard(self, count):
+        count = min(count, self._len)
+        self._head = (self._head + count) % self.capacity
+        self._len -= count
+        self.first_seq += count
+        if not self._len:
+            self._base += len(self._data)
+            self._data = bytearray()
+            return
+        dead = self._offsets[self._head] - self._base
+        if dead > len(self._data) // 2:
+            del self._data[:dead]
+            self._base += dead
+
+    def raw(self, index):
+        """
+        Contenido codificado (bytes) de la fila `index`.
+        """
+        slot = self._slot(index)
+        start = self._offsets[slot] - self._base
+        return bytes(self._data[start:start + self._sizes[slot]])
+
+    def payload(self, index):
+        return json.loads(self.raw(index))
+
+    def cell(self, index, column):
+        slot = self._slot(index)
+        if column == 0:
+            return format_time(self._times[slot])
+        if column == 1:
+            return self.names[self._realms[slot]]
+        if column == 2:
+            return self.names[self._topics[slot]]
+        return self.payload(index)
+
+    def __getitem__(self, index):
+        slot = self._slot(index)
+        return (format_time(self._times[slot]), self.names[self._realms[slot]],
+                self.names[self._topics[slot]], self.payload(index))
+
+    def __iter__(self):
+        for index in range(self._len):
+            yield self[index]
+
+    def _rows(self):
+        for index in range(self._len):
+            slot = self._slot(index)
+            yield (self._times[slot], self.names[self._realms[slot]], self.names[self._topics[slot]], self.raw(index))
+
+    def get(self, seq):
+        index = self.index_of(seq)
+        return None if index is None else self[index]
+
+    def resize(self, capacity):
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser al menos 1")
+        rows = list(self._rows())[-capacity:]
+        first_seq = self.next_seq - len(rows)
+        self._allocate(int(capacity))
+        for row in rows:
+            self.append(row)
+        self.first_seq = first_seq
+
+    def clear(self):
+        first_seq = self.next_seq
+        self._allocate(self.capacity)
+        self.first_seq = first_seq
@@ -0,0 +1,280 @@
+# src/wamp/load.py
+import asyncio
+import functools
+import time
+from .probe import LatencyHistogram
+
+# Rampas de subida soportadas por LoadProfile
+RAMP_LINEAR = "lineal"
+RAMP_STEP = "escalonada"
+RAMP_STEPS = 4
+# Intervalo objetivo entre ráfagas cuando no se indica tamaño de ráfaga
+DEFAULT_TICK = 0.005
+# Segundos entre comprobaciones de parada mientras se esperan confirmaciones
+ACK_POLL = 0.2
+
+class TokenBucket:
+    """
+    Cubeta de tokens: se rellena a `rate` tokens/s hasta `capacity`.
+    Cada mensaje publicado consume un token.
+    """
+    def __init__(self, rate, capacity, now):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.updated = now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def set_rate(self, rate, now):
+        self._refill(now)
+        self.rate = float(rate)
+
+    def take(self, now, n):
+        """
+        Consume hasta n tokens y devuelve cuántos se concedieron.
+        """
+        self._refill(now)
+        granted = min(int(n), int(self.tokens))
+        self.tokens -= granted
+        return granted
+
+    def wait_time(self, now, n=1):
+        """
+        Segundos hasta que haya n tokens disponibles.
+        """
+        self._refill(now)
+        missing = min(float(n), self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        if self.rate <= 0:
+            return DEFAULT_TICK
+        return missing / self.rate
+
+class LoadProfile:
+    """
+    Perfil de carga: tasa objetivo (msgs/s), fin por duración (s) y/o número de mensajes,
+    rampa de subida (s) y tamaño de ráfaga (mensajes enviados seguidos por despertar).
+    """
+    def __init__(self, rate, duration=None, count=None, ramp_up=0.0, ramp=RAMP_LINEAR, burst=None):
+        if rate <= 0:
+            raise ValueError("La tasa objetivo debe ser mayor que 0")
+        if not duration and not count:
+            raise ValueError("Se necesita una duración o un número de mensajes")
+        self.rate = float(rate)
+        self.duration = float(duration) if duration else None
+        self.count = int(count) if count else None
+        self.ramp_up = max(0.0, float(ramp_up or 0.0))
+        self.ramp = ramp
+        self.burst = int(burst) if burst else max(1, int(self.rate * DEFAULT_TICK))
+
+    def rate_at(self, elapsed):
+        if self.ramp_up <= 0 or elapsed >= self.ramp_up:
+            return self.rate
+        fraction = elapsed / self.ramp_up
+        if self.ramp == RAMP_STEP:
+            fraction = (int(fraction * RAMP_STEPS) + 1) / RAMP_STEPS
+        # Nunca por debajo de 1 msg/s para que la rampa arranque
+        return max(1.0, self.rate * fraction)
+
+    def finished(self, elapsed, sent):
+        if self.count is not None and sent >= self.count:
+            return True
+        return self.duration is not None and elapsed >= self.duration
+
+    def to_config(self):
+        return {
+            "rate": self.rate,
+            "duration": self.duration,
+            "count": self.count,
+            "ramp_up": self.ramp_up,
+            "ramp": self.ramp,
+            "burst": self.burst,
+        }
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.get("rate", 100),
+            duration=config.get("duration"),
+            count=config.get("count"),
+            ramp_up=config.get("ramp_up", 0.0),
+            ramp=config.get("ramp", RAMP_LINEAR),
+            burst=config.get("burst"),
+        )
+
+class LoadStats:
+    """
+    Contadores de una ejecución de carga. Se escriben en el hilo de red y
+    la GUI puede leerlos en cualquier momento con snapshot().
+    Son combinables (to_dict/set_totals) para sumar los de varios procesos.
+    """
+    def __init__(self, profile):
+        self.profile = profile
+        self.sent = 0
+        self.acked = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.started = None
+        self.finished = None
+        self.last_error = None
+        self.ack_latency = LatencyHistogram()
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+    def achieved_rate(self):
+        elapsed = self.elapsed()
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def target_rate(self):
+        return self.profile.rate_at(self.elapsed())
+
+    def on_ack(self, future, latency=None):
+        self.in_flight -= 1
+        if future.cancelled() or future.exception() is not None:
+            self.errors += 1
+            self.last_error = "cancelado" if future.cancelled() else str(future.exception())
+        else:
+            self.acked += 1
+            if latency is not None:
+                self.ack_latency.record(latency)
+
+    def to_dict(self):
+        return {
+            "sent": self.sent,
+            "acked": self.acked,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "started": self.started,
+            "finished": self.finished,
+            "last_error": self.last_error,
+            "ack_latency": self.ack_latency.to_dict(),
+        }
+
+    def set_totals(self, parts):
+        """
+        Sustituye los contadores por la suma de `parts` (dicts de to_dict() de cada proceso).
+        La ejecución solo se da por terminada cuando han terminado todas las partes.
+        """
+        parts = list(parts)
+        ack_latency = LatencyHistogram()
+        for part in parts:
+            ack_latency.merge(LatencyHistogram.from_dict(part["ack_latency"]))
+        started = [p["started"] for p in parts if p["started"] is not None]
+        finished = [p["finished"] for p in parts]
+        errors = [p["last_error"] for p in parts if p["last_error"]]
+        self.sent = sum(p["sent"] for p in parts)
+        self.acked = sum(p["acked"] for p in parts)
+        self.errors = sum(p["errors"] for p in parts)
+        self.in_flight = sum(p["in_flight"] for p in parts)
+        self.started = min(started) if started else None
+        self.finished = max(finished) if finished and None not in finished else None
+        self.last_error = errors[-1] if errors else self.last_error
+        self.ack_latency = ack_latency
+
+    def snapshot(self):
+        return {
+            "sent": self.sent,
+            "acked": self.acked,
+            "errors": self.errors,
+            "elapsed": self.elapsed(),
+            "achieved_rate": self.achieved_rate(),
+            "target_rate": self.target_rate(),
+            "ack_p50": self.ack_latency.percentile(50),
+            "ack_p99": self.ack_latency.percentile(99),
+            "done": self.finished is not None,
+        }
+
+    def summary(self):
+        snap = self.snapshot()
+        text = (f"{snap['sent']} enviados en {snap['elapsed']:.1f} s - "
+                f"{snap['achieved_rate']:.0f}/{self.profile.rate:.0f} msgs/s")
+        if snap["acked"]:
+            text += f", {snap['acked']} ack"
+            if snap["ack_p99"] is not None:
+                text += f" (p99 {snap['ack_p99'] * 1000:.1f} ms)"
+        if snap["errors"]:
+            text += f", {snap['errors']} errores"
+        return text
+
+def _split(message, options=None):
+    args, kwargs = ((), dict(message)) if isinstance(message, dict) else ((message,), {})
+    if options is not None:
+        kwargs["options"] = options
+    return args, kwargs
+
+async def run_load(publish, topic, message, profile, stats=None, options=None,
+                   acknowledge=False, max_in_flight=1000, should_stop=None):
+    """
+    Publica `message` en `topic` al ritmo de `profile` usando una cubeta de tokens.
+    `publish` es session.publish (o compatible). Se ejecuta por completo en el bucle
+    de red: cada despertar envía una ráfaga sin pasar por el hilo de la GUI.
+    Si `message` es invocable (p. ej. una CompiledTemplate), se llama para cada mensaje.
+    Los envíos que fallan cuentan para `profile.count`: si el router rechaza el topic, la
+    carga termina igualmente.
+    """
+    stats = stats or LoadStats(profile)
+    loop = asyncio.get_event_loop()
+    render = message if callable(message) else None
+    if render is None:
+        args, kwargs = _split(message, options)
+    ack_ready = asyncio.Event()
+    ack_ready.set()
+
+    def on_ack(future, sent_at):
+        stats.on_ack(future, loop.time() - sent_at)
+        if stats.in_flight < max_in_flight:
+            ack_ready.set()
+
+    now = loop.time()
+    bucket = TokenBucket(profile.rate_at(0.0), profile.burst, now)
+    start = now
+    stats.started = time.monotonic()
+    attempted = 0  # enviados + fallidos al publicar
+    try:
+        while not (should_stop and should_stop()):
+            now = loop.time()
+            elapsed = now - start
+            if profile.finished(elapsed, attempted):
+                break
+            bucket.set_rate(profile.rate_at(elapsed), now)
+            n = bucket.take(now, profile.burst)
+            if profile.count is not None:
+                n = min(n, profile.count - attempted)
+            if n <= 0:
+                await asyncio.sleep(bucket.wait_time(now, profile.burst))
+                continue
+            for _ in range(n):
+                attempted += 1
+                try:
+                    if render is not None:
+                        args, kwargs = _split(render(), options)
+                    result = publish(topic, *args, **kwargs)
+                except Exception as e:
+                    stats.errors += 1
+                    stats.last_error = str(e)
+                    continue
+                stats.sent += 1
+                if acknowledge and result is not None:
+                    stats.in_flight += 1
+                    result.add_done_callback(functools.partial(on_ack, sent_at=loop.time()))
+            if acknowledge and stats.in_flight >= max_in_flight:
+                ack_ready.clear()
+                # Espera por tramos para atender a la parada aunque no lleguen confirmaciones
+                while stats.in_flight >= max_in_flight and not (should_stop and should_stop()):
+                    try:
+                        await asyncio.wait_for(ack_ready.wait(), ACK_POLL)
+                    except asyncio.TimeoutError:
+                        pass
+            else:
+                await asyncio.sleep(0)
+    finally:
+        stats.finished = time.monotonic()
+    return stats
@@ -0,0 +1,122 @@
+# src/wamp/loop.py
+import asyncio
+import threading
+from autobahn.asyncio.wamp import ApplicationRunner
+from .serializers import make_serializers
+
+class NetworkLoop:
+    """
+    Hilo de red único con un bucle asyncio donde se ejecutan todas las sesiones WAMP
+    (publicadores y suscriptores). Los demás hilos le envían trabajo con submit() y
+    call_soon(), que son seguros entre hilos.
+    """
+    def __init__(self):
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._shutdown_hooks = []
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._ready.clear()
+                self._thread = threading.Thread(target=self._run, name="wamp-network", daemon=True)
+                self._thread.start()
+        self._ready.wait()
+        return self.loop
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        loop.call_soon(self._ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            self.loop = None
+
+    def in_loop_thread(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro):
+        """
+        Programa una corrutina en el bucle de red y devuelve un concurrent.futures.Future.
+        """
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def call_soon(self, callback, *args):
+        """
+        Ejecuta callback(*args) en el hilo de red.
+        """
+        loop = self.start()
+        return loop.call_soon_threadsafe(callback, *args)
+
+    def add_shutdown_hook(self, hook):
+        """
+        Registra una corrutina sin argumentos que se ejecuta en el bucle al llamar a stop().
+        """
+        self._shutdown_hooks.append(hook)
+
+    def stop(self, timeout=5.0):
+        """
+        Cierre determinista: ejecuta los hooks de cierre (p. ej. leave de las sesiones),
+        cancela las tareas pendientes y espera a que termine el hilo de red.
+        """
+        with self._lock:
+            thread, loop = self._thread, self.loop
+        if thread is None or loop is None or not thread.is_alive():
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), loop)
+        try:
+            future.result(timeout)
+        except Exception as e:
+            print("Error al cerrar el bucle de red:", e)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        with self._lock:
+            self._thread = None
+
+    async def _shutdown(self):
+        for hook in reversed(self._shutdown_hooks):
+            try:
+                await hook()
+            except Exception as e:
+                print("Error en hook de cierre:", e)
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+network_loop = NetworkLoop()
+
+async def open_session(url, realm, make, serializers=None):
+    """
+    Conecta una sesión WAMP en el bucle actual y espera a que se una al realm.
+    `serializers` es una lista de nombres (ver wamp.serializers); None usa la negociación
+    por defecto. Debe ejecutarse en el hilo de red. Devuelve la sesión ya unida.
+    """
+    loop = asyncio.get_event_loop()
+    joined = loop.create_future()
+
+    def on_join(session, *args, **kwargs):
+        if not joined.done():
+            joined.set_result(session)
+
+    def on_disconnect(session, *args, **kwargs):
+        if not joined.done():
+            joined.set_exception(ConnectionError(f"Conexión cerrada antes de unirse al realm {realm}"))
+
+    def factory(config):
+        session = make(config)
+        session.on("join", on_join)
+        session.on("disconnect", on_disconnect)
+        return session
+
+    runner = ApplicationRunner(url=url, realm=realm, serializers=make_serializers(serializers))
+    await runner.run(factory, start_loop=False)
+    return await joined
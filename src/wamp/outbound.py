@@ -0,0 +1,260 @@
+# src/wamp/outbound.py
+import asyncio
+import collections
+import concurrent.futures
+import threading
+import time
+from .probe import LatencyHistogram
+
+# Políticas cuando la cola está llena
+POLICY_BLOCK = "bloquear"
+POLICY_DROP_OLDEST = "descartar_antiguos"
+POLICY_DROP_NEWEST = "descartar_nuevos"
+POLICY_FAIL = "fallar"
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_FAIL)
+DEFAULT_CAPACITY = 10000
+DEFAULT_POLICY = POLICY_BLOCK
+
+class OutboundItem:
+    """
+    Mensaje pendiente de publicar. future es un concurrent.futures.Future con el resultado.
+    index es su posición dentro de un lote; con echo=False no se muestra en consola.
+    """
+    __slots__ = ("topic", "message", "acknowledge", "index", "echo", "future", "enqueued_at")
+
+    def __init__(self, topic, message, acknowledge=True, index=0, echo=True):
+        self.topic = topic
+        self.message = message
+        self.acknowledge = acknowledge
+        self.index = index
+        self.echo = echo
+        self.future = concurrent.futures.Future()
+        self.enqueued_at = None
+
+class OutboundQueue:
+    """
+    Cola de salida acotada de una sesión. Los productores encolan desde cualquier hilo
+    (submit) o desde el bucle (put); un único consumidor en el bucle entrega los mensajes
+    en orden con a lo sumo max_in_flight publicaciones en curso. Con la cola llena se
+    aplica la política: bloquear al productor, descartar el más antiguo, descartar el
+    nuevo o fallar al instante.
+    deliver(item) es una corrutina que publica y devuelve el resultado; reject(item, motivo)
+    construye el resultado de un mensaje descartado.
+    Las cargas (wamp.load) publican directamente en la sesión, sin encolar, para no
+    limitar la tasa; se registran con track_direct() y cuentan en `direct`.
+    """
+    def __init__(self, loop, deliver, reject, capacity=DEFAULT_CAPACITY, policy=DEFAULT_POLICY, max_in_flight=100):
+        self.loop = loop
+        self.deliver = deliver
+        self.reject = reject
+        self.max_in_flight = max_in_flight
+        self.capacity = DEFAULT_CAPACITY
+        self.policy = DEFAULT_POLICY
+        self.configure(capacity, policy)
+        self._items = collections.deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._consumer = None
+        self._wakeup = None
+        self._space = None
+        self._closed = False
+        # Métricas
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.blocked = 0
+        self.max_depth = 0
+        self.queued_time = LatencyHistogram()
+        self._direct = 0
+        self._direct_loads = ()  # LoadStats en curso; tupla para leerla sin lock desde la GUI
+
+    def configure(self, capacity=None, policy=None):
+        if capacity is not None:
+            if capacity < 1:
+                raise ValueError("La capacidad de la cola debe ser al menos 1")
+            self.capacity = int(capacity)
+        if policy is not None:
+            if policy not in POLICIES:
+                raise ValueError(f"Política de cola desconocida: {policy} (válidas: {', '.join(POLICIES)})")
+            self.policy = policy
+
+    @property
+    def depth(self):
+        return len(self._items)
+
+    @property
+    def direct(self):
+        return self._direct + sum(stats.sent for stats in self._direct_loads)
+
+    def track_direct(self, stats):
+        """
+        Cuenta en `direct` los envíos de una carga (LoadStats) mientras dura. Desde el bucle.
+        """
+        self._direct_loads = self._direct_loads + (stats,)
+
+    def untrack_direct(self, stats):
+        self._direct_loads = tuple(s for s in self._direct_loads if s is not stats)
+        self._direct += stats.sent
+
+    def _in_loop(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _offer(self, item):
+        """
+        Intenta encolar con el lock tomado. Devuelve (aceptado, descartados).
+        """
+        if self._closed:
+            return False, [(item, "cola cerrada")]
+        if len(self._items) < self.capacity:
+            self._append(item)
+            return True, []
+        if self.policy == POLICY_DROP_OLDEST:
+            oldest = self._items.popleft()
+            self.dropped += 1
+            self._append(item)
+            return True, [(oldest, "descartado: cola llena")]
+        if self.policy == POLICY_DROP_NEWEST:
+            self.dropped += 1
+            return False, [(item, "descartado: cola llena")]
+        if self.policy == POLICY_FAIL:
+            self.rejected += 1
+            return False, [(item, "rechazado: cola llena")]
+        return False, []
+
+    def _append(self, item):
+        item.enqueued_at = time.monotonic()
+        self._items.append(item)
+        self.enqueued += 1
+        if len(self._items) > self.max_depth:
+            self.max_depth = len(self._items)
+
+    def _settle(self, discarded):
+        for item, reason in discarded:
+            if not item.future.done():
+                item.future.set_result(self.reject(item, reason))
+
+    def submit(self, item, timeout=None):
+        """
+        Encola desde un hilo distinto del bucle. Con la política "bloquear" espera hueco
+        (hasta timeout segundos; después el mensaje se rechaza). Devuelve item.future.
+        """
+        if self._in_loop():
+            # En el propio bucle no se puede bloquear: se usa la versión asíncrona
+            asyncio.ensure_future(self.put(item))
+            return item.future
+        with self._not_full:
+            accepted, discarded = self._offer(item)
+            if not accepted and not discarded:
+                self.blocked += 1
+                if self._not_full.wait_for(lambda: self._closed or len(self._items) < self.capacity, timeout):
+                    accepted, discarded = self._offer(item)
+                else:
+                    self.rejected += 1
+                    discarded = [(item, "rechazado: tiempo de espera agotado con la cola llena")]
+        self._settle(discarded)
+        if accepted:
+            self.loop.call_soon_threadsafe(self._wake)
+        return item.future
+
+    async def put(self, item):
+        """
+        Encola desde el bucle. Con la política "bloquear" la corrutina espera hueco.
+        """
+        blocked = False
+        while True:
+            with self._lock:
+                accepted, discarded = self._offer(item)
+            self._settle(discarded)
+            if accepted:
+                self._wake()
+                return item.future
+            if discarded:
+                return item.future
+            if not blocked:
+                blocked = True
+                self.blocked += 1
+            self._ensure_events()
+            self._space.clear()
+            await self._space.wait()
+
+    def _ensure_events(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._space = asyncio.Event()
+
+    def _wake(self):
+        self._ensure_events()
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.ensure_future(self._drain())
+        self._wakeup.set()
+
+    def _pop(self):
+        with self._not_full:
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._not_full.notify()
+        self._space.set()
+        self.queued_time.record(time.monotonic() - item.enqueued_at)
+        return item
+
+    async def _drain(self):
+        slots = asyncio.Semaphore(self.max_in_flight)
+        while not self._closed:
+            # Se reserva hueco de envío antes de sacar el mensaje: mientras el router no
+            # confirme, los mensajes siguen contando como profundidad de la cola
+            await slots.acquire()
+            item = self._pop()
+            if item is None:
+                slots.release()
+                self._wakeup.clear()
+                if not self._items:
+                    await self._wakeup.wait()
+                continue
+            task = asyncio.ensure_future(self._deliver(item))
+            task.add_done_callback(lambda t: slots.release())
+
+    async def _deliver(self, item):
+        try:
+            result = await self.deliver(item)
+        except Exception as e:
+            result = self.reject(item, str(e) or type(e).__name__)
+        self.delivered += 1
+        if not item.future.done():
+            item.future.set_result(result)
+
+    def close(self):
+        """
+        Detiene el consumidor y da por fallidos los mensajes pendientes. Desde el bucle.
+        """
+        with self._not_full:
+            self._closed = True
+            pending = list(self._items)
+            self._items.clear()
+            self._not_full.notify_all()
+        if self._consumer is not None:
+            self._consumer.cancel()
+        if self._space is not None:
+            self._space.set()
+        self._settle((item, "cola cerrada") for item in pending)
+
+    def snapshot(self):
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "blocked": self.blocked,
+            "direct": self.direct,
+            "queued_p50": self.queued_time.percentile(50),
+            "queued_p99": self.queued_time.percentile(99),
+            "queued_max": self.queued_time.max / 1e6 if self.queued_time.max is not None else None,
+        }
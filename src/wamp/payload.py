@@ -0,0 +1,59 @@
+# src/wamp/payload.py
+import json
+
+class Payload:
+    """
+    Contenido de un mensaje analizado una sola vez. Las codificaciones compacta (envío,
+    consola) y con sangría (archivo de log, visor) se calculan al pedirlas y se guardan,
+    de modo que publicador, log y visor comparten el mismo objeto sin volver a serializar.
+    """
+    __slots__ = ("obj", "_compact", "_data", "_pretty")
+
+    def __init__(self, obj, compact=None, data=None):
+        self.obj = obj
+        self._compact = compact
+        self._data = data  # JSON compacto en bytes (p. ej. de CompiledTemplate.render_pair)
+        self._pretty = None
+
+    @property
+    def value(self):
+        """
+        El objeto, con el mismo acceso que CompiledTemplate.value (contenido tal como se editó).
+        """
+        return self.obj
+
+    @classmethod
+    def parse(cls, text):
+        return cls(json.loads(text))
+
+    @property
+    def compact(self):
+        if self._compact is None:
+            if self._data is not None:
+                self._compact = self._data.decode("utf-8")
+            else:
+                self._compact = json.dumps(self.obj, separators=(",", ":"), ensure_ascii=False)
+        return self._compact
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self.compact.encode("utf-8")
+        return self._data
+
+    @property
+    def size(self):
+        # Bytes del JSON compacto (lo que cuenta wamp.traffic)
+        return len(self.data)
+
+    @property
+    def pretty(self):
+        if self._pretty is None:
+            self._pretty = json.dumps(self.obj, indent=2, ensure_ascii=False)
+        return self._pretty
+
+    def __str__(self):
+        return self.compact
+
+    def __repr__(self):
+        return f"Payload({self.compact})"
@@ -0,0 +1,172 @@
+# src/wamp/probe.py
+import csv
+import itertools
+import json
+import math
+import threading
+import time
+
+# Clave que el publicador añade a los kwargs de los mensajes sonda
+PROBE_KEY = "_probe"
+# Percentiles mostrados y exportados
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+# Sub-buckets por potencia de 2: error relativo máximo de 1/64 (~1.6 %)
+SUB_BUCKET_BITS = 6
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+def _bucket_index(value):
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + ((value >> shift) - SUB_BUCKETS)
+
+def _bucket_upper(index):
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    sub = index % SUB_BUCKETS + SUB_BUCKETS
+    return ((sub + 1) << shift) - 1
+
+class LatencyHistogram:
+    """
+    Histograma logarítmico de latencias en microsegundos (estilo HDR): coste O(1)
+    por muestra, memoria proporcional al rango de valores y combinable con merge().
+    """
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1e6))
+        index = _bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    def percentile(self, p):
+        """
+        Latencia (segundos) por debajo de la cual cae el p % de las muestras.
+        """
+        if not self.count:
+            return None
+        target = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(_bucket_upper(index), self.max) / 1e6
+        return self.max / 1e6
+
+    def mean(self):
+        return self.total / self.count / 1e6 if self.count else None
+
+    def summary(self):
+        data = {"count": self.count, "mean": self.mean(),
+                "min": self.min / 1e6 if self.min is not None else None,
+                "max": self.max / 1e6 if self.max is not None else None}
+        for p in PERCENTILES:
+            data[f"p{p:g}"] = self.percentile(p)
+        return data
+
+    def to_dict(self):
+        return {"counts": {str(k): v for k, v in self.counts.items()}, "count": self.count,
+                "total": self.total, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls()
+        hist.counts = {int(k): v for k, v in data.get("counts", {}).items()}
+        hist.count = data.get("count", 0)
+        hist.total = data.get("total", 0)
+        hist.min = data.get("min")
+        hist.max = data.get("max")
+        return hist
+
+class LatencyProbe:
+    """
+    Sonda de latencia extremo a extremo. El publicador marca los mensajes con un
+    timestamp monotónico y un número de secuencia; el suscriptor, en el mismo proceso,
+    registra la latencia de un solo sentido en un histograma por (realm, topic).
+    """
+    def __init__(self):
+        self.enabled = False
+        self._seq = itertools.count(1)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def stamp(self, kwargs):
+        """
+        Devuelve una copia de kwargs con la marca de la sonda añadida.
+        """
+        stamped = dict(kwargs)
+        stamped[PROBE_KEY] = {"seq": next(self._seq), "t": time.monotonic()}
+        return stamped
+
+    def observe(self, realm, topic, kwargs):
+        """
+        Registra la latencia si kwargs trae la marca de la sonda. Devuelve True si la trae.
+        """
+        probe = kwargs.get(PROBE_KEY)
+        if not isinstance(probe, dict) or "t" not in probe:
+            return False
+        latency = time.monotonic() - probe["t"]
+        key = (realm, topic)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = LatencyHistogram()
+            hist.record(latency)
+        return True
+
+    def snapshot(self):
+        """
+        Resumen por (realm, topic): count, mean, min, max y percentiles en segundos.
+        """
+        with self._lock:
+            return {key: hist.summary() for key, hist in self._histograms.items()}
+
+    def histograms(self):
+        with self._lock:
+            return {key: LatencyHistogram().merge(hist) for key, hist in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def export_json(self, path):
+        with self._lock:
+            rows = [{"realm": realm, "topic": topic, "summary": hist.summary(), "histogram": hist.to_dict()}
+                    for (realm, topic), hist in sorted(self._histograms.items())]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"unit": "seconds", "topics": rows}, f, indent=2, ensure_ascii=False)
+
+    def export_csv(self, path):
+        snapshot = self.snapshot()
+        columns = ["count", "mean", "min"] + [f"p{p:g}" for p in PERCENTILES] + ["max"]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["realm", "topic"] + [c if c == "count" else c + "_ms" for c in columns])
+            for (realm, topic), summary in sorted(snapshot.items()):
+                values = [summary[c] if c == "count" or summary[c] is None else round(summary[c] * 1000, 3)
+                          for c in columns]
+                writer.writerow([realm, topic] + values)
+
+latency_probe = LatencyProbe()
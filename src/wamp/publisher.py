@@ -1,49 +1,696 @@
 # src/wamp/publisher.py
 import asyncio
+import collections
+import concurrent.futures
 import threading
-import datetime
-import json
-from autobahn.asyncio.wamp import ApplicationSession, ApplicationRunner
-from gui.utils import log_to_file
+import time
+from autobahn.asyncio.wamp import ApplicationSession
+from autobahn.wamp.types import PublishOptions
+from services.message_log import log_published
+from .loop import network_loop, open_session
+from .load import LoadStats, run_load
+from .probe import latency_probe
+from .outbound import DEFAULT_CAPACITY, DEFAULT_POLICY, OutboundItem, OutboundQueue
+from .scheduler import scheduler
+from .serializers import serializers_for
+from .payload import Payload
+from .templates import as_payload
+from .traffic import published_traffic
+from .workers import WorkerLoadRun
 
-# Variables globales para la sesión del publicador
-global_session = None
-global_loop = None
+# Segundos sin actividad tras los cuales una sesión del pool se cierra
+IDLE_TIMEOUT = 300.0
+# Máximo de publicaciones sin confirmar por lote
+MAX_IN_FLIGHT = 100
+# Espera máxima (segundos) del hilo de la GUI por hueco en una cola llena con la política "bloquear"
+SUBMIT_TIMEOUT = 0.1
+# Segundos entre dos escrituras por lotes del log de publicados
+LOG_INTERVAL = 0.2
 
 class JSONPublisher(ApplicationSession):
-    def __init__(self, config, topic):
+    def __init__(self, config, pooled=None):
         super().__init__(config)
-        self.topic = topic
+        self.pooled = pooled
 
     async def onJoin(self, details):
-        global global_session, global_loop
-        global_session = self
-        global_loop = asyncio.get_event_loop()
         print("Conexión establecida en el publicador (realm:", self.config.realm, ")")
-        await asyncio.Future()  # Mantiene la sesión activa
-
-def start_publisher(url, realm, topic):
-    def run():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        runner = ApplicationRunner(url=url, realm=realm)
-        runner.run(lambda config: JSONPublisher(config, topic))
-    threading.Thread(target=run, daemon=True).start()
-
-def send_message_now(topic, message, delay=0):
-    global global_session, global_loop
-    if global_session is None or global_loop is None:
-        print("No hay sesión activa. Inicia el publicador primero.")
-        return
-    async def _send():
+
+    def onDisconnect(self):
+        if self.pooled is not None:
+            self.pooled.on_disconnect(self)
+
+class PublishResult:
+    """
+    Resultado de una publicación: si el router la aceptó y la latencia hasta el ack (segundos).
+    Sin acknowledge, ok indica que el mensaje salió por el transporte y latency es None.
+    """
+    __slots__ = ("topic", "index", "ok", "latency", "error", "publication_id")
+
+    def __init__(self, topic, index=0, ok=False, latency=None, error=None, publication_id=None):
+        self.topic = topic
+        self.index = index
+        self.ok = ok
+        self.latency = latency
+        self.error = error
+        self.publication_id = publication_id
+
+    def __repr__(self):
+        if self.ok:
+            return f"PublishResult({self.topic!r}, #{self.index}, ok, latency={self.latency})"
+        return f"PublishResult({self.topic!r}, #{self.index}, error={self.error!r})"
+
+class BatchResult:
+    """
+    Resultados agregados de un conjunto de publicaciones.
+    """
+    def __init__(self, results):
+        self.results = list(results)
+        self.sent = len(self.results)
+        self.failures = [r for r in self.results if not r.ok]
+        self.acked = self.sent - len(self.failures)
+        latencies = [r.latency for r in self.results if r.ok and r.latency is not None]
+        self.min_latency = min(latencies) if latencies else None
+        self.max_latency = max(latencies) if latencies else None
+        self.avg_latency = sum(latencies) / len(latencies) if latencies else None
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    def summary(self):
+        text = f"{self.acked}/{self.sent} OK"
+        if self.avg_latency is not None:
+            text += f" (ack medio {self.avg_latency * 1000:.1f} ms, máx {self.max_latency * 1000:.1f} ms)"
+        if self.failures:
+            text += f" - error: {self.failures[0].error}"
+        return text
+
+class FanOutPlan:
+    """
+    Envío de un mismo mensaje a una matriz realm × topic, agrupado una sola vez por
+    sesión: sessions es {(router_url, realm): (topic, ...)} en el orden de selección.
+    """
+    __slots__ = ("sessions",)
+
+    def __init__(self, targets):
+        sessions = {}
+        for router_url, realm, topic in targets:
+            topics = sessions.setdefault((router_url, realm), [])
+            if topic not in topics:
+                topics.append(topic)
+        self.sessions = {key: tuple(topics) for key, topics in sessions.items() if topics}
+
+    @classmethod
+    def from_selection(cls, realms, router_urls, topics_by_realm, default_url):
+        """
+        realms: realms marcados; router_urls: {realm: url}; topics_by_realm: {realm: [topics]}.
+        """
+        return cls((router_urls.get(realm) or default_url, realm, topic)
+                   for realm in realms for topic in topics_by_realm.get(realm, ()))
+
+    @property
+    def size(self):
+        return sum(len(topics) for topics in self.sessions.values())
+
+    def __len__(self):
+        return self.size
+
+class PooledSession:
+    """
+    Sesión de publicador compartida por todos los envíos a un mismo (router_url, realm).
+    Se conecta en el primer uso; los envíos esperan a que la sesión se una al realm.
+    Todos sus métodos se ejecutan en el hilo de red.
+    """
+    def __init__(self, router_url, realm):
+        self.router_url = router_url
+        self.realm = realm
+        self.session = None
+        self.last_used = time.monotonic()
+        self.in_flight = 0
+        self.serializers = serializers_for(realm)
+        self.queue = None
+        self._connecting = None
+
+    @property
+    def key(self):
+        return (self.router_url, self.realm)
+
+    def is_idle(self, now, idle_timeout):
+        busy = self.in_flight > 0 or self._connecting is not None or (self.queue is not None and self.queue.depth)
+        return not busy and now - self.last_used >= idle_timeout
+
+    def connect(self):
+        if self.session is None and self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._connect())
+
+    async def _connect(self):
+        try:
+            self.session = await open_session(
+                self.router_url, self.realm, lambda config: JSONPublisher(config, self), self.serializers
+            )
+        except Exception as e:
+            print(f"Error en la sesión del publicador ({self.realm} @ {self.router_url}):", e)
+        finally:
+            self._connecting = None
+
+    async def ready(self):
+        """
+        Espera a que la sesión esté unida al realm, conectándola si hace falta.
+        """
+        if self.session is None:
+            self.connect()
+            await asyncio.shield(self._connecting)
+        if self.session is None:
+            raise ConnectionError(f"No hay sesión con {self.router_url} (realm: {self.realm})")
+        return self.session
+
+    def on_disconnect(self, session):
+        if self.session is session:
+            self.session = None
+
+    async def _publish_one(self, topic, message, acknowledge, index=0):
+        result = PublishResult(topic, index)
+        try:
+            session = await self.ready()
+            start = time.monotonic()
+            options = PublishOptions(acknowledge=acknowledge)
+            args, kwargs = ((), message) if isinstance(message, dict) else ((message,), {})
+            if latency_probe.enabled:
+                kwargs = latency_probe.stamp(kwargs)
+            publication = session.publish(topic, *args, options=options, **kwargs)
+            if acknowledge:
+                publication = await publication
+                result.latency = time.monotonic() - start
+                result.publication_id = publication.id
+            result.ok = True
+        except Exception as e:
+            result.error = str(e) or type(e).__name__
+        return result
+
+    async def send(self, topic, message, delay=0, acknowledge=True):
+        """
+        Publica un mensaje (tras delay segundos) en la sesión compartida y devuelve su PublishResult.
+        Pasa por la cola de salida acotada de la sesión si la tiene.
+        """
+        self.connect()
         if delay > 0:
             await asyncio.sleep(delay)
-        if isinstance(message, dict):
-            global_session.publish(topic, **message)
+        return await self._enqueue(OutboundItem(topic, message, acknowledge))
+
+    async def _enqueue(self, item):
+        if self.queue is None:
+            return await self.deliver(item)
+        await self.queue.put(item)
+        return await asyncio.wrap_future(item.future)
+
+    async def deliver(self, item):
+        """
+        Publica un mensaje de la cola de salida, lo registra y devuelve su PublishResult.
+        """
+        self.last_used = time.monotonic()
+        self.in_flight += 1
+        try:
+            payload = as_payload(item.message)
+            result = await self._publish_one(item.topic, payload.obj, item.acknowledge, item.index)
+            if result.ok:
+                _log_published(item.topic, payload, self.realm)
+                _record_published(self.realm, item.topic, payload)
+                if item.echo:
+                    print("Mensaje enviado en", item.topic, ":", payload.compact)
+            elif item.echo:
+                print(f"Error al publicar en {item.topic} (realm: {self.realm}):", result.error)
+            return result
+        finally:
+            self.in_flight -= 1
+            self.last_used = time.monotonic()
+
+    async def publish_batch(self, topic, messages, acknowledge=True, max_in_flight=MAX_IN_FLIGHT):
+        """
+        Publica varios mensajes de forma concurrente con a lo sumo max_in_flight sin confirmar.
+        Pasan por la cola de salida como los de send(), sin mostrarse uno a uno en consola.
+        """
+        self.connect()
+        self.last_used = time.monotonic()
+        self.in_flight += 1
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def one(index, message):
+            async with semaphore:
+                return await self._enqueue(OutboundItem(topic, message, acknowledge, index, echo=False))
+        try:
+            results = await asyncio.gather(*(one(i, m) for i, m in enumerate(messages)))
+            return BatchResult(results)
+        finally:
+            self.in_flight -= 1
+            self.last_used = time.monotonic()
+
+    async def run_load(self, topic, message, profile, stats, acknowledge=False, should_stop=None):
+        """
+        Ejecuta un perfil de carga sobre esta sesión (ver wamp.load.run_load).
+        El camino de carga no registra ni formatea los mensajes enviados y no pasa por la
+        cola de salida (la limitaría a su max_in_flight); sus envíos cuentan como `direct`
+        en las métricas de la cola.
+        """
+        if isinstance(message, Payload):
+            message = message.obj
+        self.in_flight += 1
+        queue = self.queue
+        if queue is not None:
+            queue.track_direct(stats)
+        try:
+            session = await self.ready()
+            options = PublishOptions(acknowledge=True) if acknowledge else None
+            print(f"Carga iniciada en {topic} (realm: {self.realm}): {profile.rate:.0f} msgs/s")
+
+            def stamped(topic, *args, **kwargs):
+                return session.publish(topic, *args, **latency_probe.stamp(kwargs))
+            publish = stamped if latency_probe.enabled else session.publish
+            await run_load(publish, topic, message, profile, stats, options=options,
+                           acknowledge=acknowledge, should_stop=should_stop)
+            print(f"Carga finalizada en {topic} (realm: {self.realm}):", stats.summary())
+            return stats
+        finally:
+            if queue is not None:
+                queue.untrack_direct(stats)
+            self.in_flight -= 1
+            self.last_used = time.monotonic()
+
+    async def close(self):
+        if self._connecting is not None:
+            self._connecting.cancel()
+        session, self.session = self.session, None
+        if session is not None and session.is_attached():
+            await session.leave()
+
+class PublisherPool:
+    """
+    Pool de sesiones de publicador indexado por (router_url, realm).
+    Reutiliza una única conexión por realm y cierra las que quedan inactivas.
+    Cada (router_url, realm) tiene además una cola de salida acotada que sobrevive
+    a las reconexiones. Los métodos se ejecutan en el hilo de red salvo queue(),
+    configure_queues() y queue_stats(); desde la GUI se usan start_publisher() y send_message_now().
+    """
+    def __init__(self, idle_timeout=IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.default_key = None
+        self.queue_capacity = DEFAULT_CAPACITY
+        self.queue_policy = DEFAULT_POLICY
+        self._sessions = {}
+        self._reaper = None
+        self._queues = {}
+        self._queues_lock = threading.Lock()
+
+    def queue(self, router_url, realm):
+        """
+        Cola de salida de (router_url, realm); se puede llamar desde cualquier hilo.
+        """
+        key = (router_url, realm)
+        with self._queues_lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = OutboundQueue(
+                    network_loop.start(), lambda item: self.get(*key).deliver(item),
+                    lambda item, reason: PublishResult(item.topic, item.index, error=reason),
+                    self.queue_capacity, self.queue_policy, MAX_IN_FLIGHT)
+            return queue
+
+    def configure_queues(self, capacity=None, policy=None):
+        """
+        Cambia capacidad y/o política de las colas actuales y de las nuevas.
+        """
+        with self._queues_lock:
+            queues = list(self._queues.values())
+        for queue in queues:
+            queue.configure(capacity, policy)
+        if capacity is not None:
+            self.queue_capacity = int(capacity)
+        if policy is not None:
+            self.queue_policy = policy
+
+    def queue_stats(self):
+        with self._queues_lock:
+            return {key: queue.snapshot() for key, queue in self._queues.items()}
+
+    def get(self, router_url, realm):
+        key = (router_url, realm)
+        pooled = self._sessions.get(key)
+        if pooled is not None and pooled.serializers != serializers_for(realm):
+            # Cambió el serializador configurado para el realm: se reconecta
+            asyncio.ensure_future(pooled.close())
+            pooled = None
+        if pooled is None:
+            pooled = PooledSession(router_url, realm)
+            pooled.queue = self.queue(router_url, realm)
+            self._sessions[key] = pooled
+            self._schedule_reaper()
+        return pooled
+
+    def default(self):
+        if self.default_key is None:
+            return None
+        return self.get(*self.default_key)
+
+    def _schedule_reaper(self):
+        if self._reaper is None and self._sessions:
+            loop = asyncio.get_event_loop()
+            self._reaper = loop.call_later(self.idle_timeout / 2, self._reap)
+
+    def _reap(self):
+        self._reaper = None
+        self.evict_idle()
+        self._schedule_reaper()
+
+    def evict_idle(self):
+        now = time.monotonic()
+        idle = [k for k, s in self._sessions.items() if s.is_idle(now, self.idle_timeout)]
+        for key in idle:
+            pooled = self._sessions.pop(key)
+            print(f"Cerrando sesión inactiva del publicador (realm: {pooled.realm}, router: {pooled.router_url})")
+            asyncio.ensure_future(pooled.close())
+
+    async def close_all(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self.default_key = None
+        with self._queues_lock:
+            queues = list(self._queues.values())
+            self._queues.clear()
+        for queue in queues:
+            queue.close()
+        await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+
+class PublishedLog:
+    """
+    Etapa de log de los mensajes publicados. Tras cada envío, en el bucle de red solo se
+    guardan la hora y la referencia al Payload; un hilo aparte los recoge cada LOG_INTERVAL
+    y los escribe con services.message_log.log_published, que es donde se forma el JSON
+    con sangría. Así el formateo y la escritura a disco no cuestan nada por envío.
+    """
+    def __init__(self, interval=LOG_INTERVAL):
+        self.interval = interval
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def append(self, realm, topic, payload):
+        self._pending.append((time.time(), realm, topic, payload))
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="wamp-log-publicados", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """
+        Escribe lo acumulado. Devuelve el número de mensajes escritos.
+        """
+        count = len(self._pending)
+        if not count:
+            return 0
+        pop = self._pending.popleft
+        batch = [pop() for _ in range(count)]
+        try:
+            log_published(batch)
+        except Exception as e:
+            print("Error al escribir el log de publicados:", e)
+        return count
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    async def close(self):
+        self.stop()
+
+publisher_pool = PublisherPool()
+published_log = PublishedLog()
+# Los hooks se ejecutan en orden inverso: el log se vacía después de cerrar las sesiones
+network_loop.add_shutdown_hook(published_log.close)
+network_loop.add_shutdown_hook(publisher_pool.close_all)
+# Línea de tiempo de los envíos programados del proyecto (pausar/reanudar/cancelar en bloque)
+project_timeline = scheduler.timeline("proyecto")
+
+class LoadRun:
+    """
+    Ejecución de carga en curso. stats se puede consultar desde la GUI; stop() la detiene.
+    """
+    def __init__(self, topic, profile):
+        self.topic = topic
+        self.profile = profile
+        self.stats = LoadStats(profile)
+        self.future = None
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+
+    def is_stopped(self):
+        return self._stopped
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+def _log_published(topic, payload, realm=None):
+    # El JSON con sangría se forma en el hilo del log (PublishedLog), no en cada envío
+    published_log.append(realm, topic, payload)
+
+def _record_published(realm, topic, payload):
+    # Estadísticas de tráfico publicado (wamp.traffic): tamaño del JSON compacto enviado
+    published_traffic.record(realm, topic, payload.size)
+
+def _resolve(router_url, realm):
+    if router_url is not None and realm is not None:
+        return publisher_pool.get(router_url, realm)
+    return publisher_pool.default()
+
+def _start(url, realm):
+    publisher_pool.get(url, realm).connect()
+    publisher_pool.default_key = (url, realm)
+
+async def _send(topic, message, delay, router_url, realm, acknowledge):
+    pooled = _resolve(router_url, realm)
+    if pooled is None:
+        print("No hay sesión activa. Inicia el publicador primero.")
+        return PublishResult(topic, error="No hay sesión activa")
+    return await pooled.send(topic, message, delay, acknowledge)
+
+async def _send_batch(topic, messages, acknowledge, router_url, realm, max_in_flight):
+    pooled = _resolve(router_url, realm)
+    if pooled is None:
+        return BatchResult(PublishResult(topic, i, error="No hay sesión activa") for i in range(len(messages)))
+    return await pooled.publish_batch(topic, messages, acknowledge, max_in_flight)
+
+async def _run_load(run, message, router_url, realm, acknowledge):
+    pooled = _resolve(router_url, realm)
+    if pooled is None:
+        raise ConnectionError("No hay sesión activa")
+    return await pooled.run_load(run.topic, message, run.profile, run.stats, acknowledge, run.is_stopped)
+
+async def _fan_out_session(pooled, topics, payload, acknowledge):
+    try:
+        await pooled.ready()
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        return [PublishResult(topic, i, error=error) for i, topic in enumerate(topics)]
+    # Todos los topics del realm se encolan a la vez; la cola limita los no confirmados
+    return await asyncio.gather(*(pooled.send(topic, payload, 0, acknowledge) for topic in topics))
+
+async def _fan_out(plan, message, acknowledge):
+    # El contenido se genera una vez y todas las copias comparten sus codificaciones
+    payload = as_payload(message)
+    sessions = [(publisher_pool.get(*key), topics) for key, topics in plan.sessions.items()]
+    for pooled, _ in sessions:
+        # Las conexiones que falten se abren en paralelo
+        pooled.connect()
+    groups = await asyncio.gather(*(_fan_out_session(pooled, topics, payload, acknowledge)
+                                    for pooled, topics in sessions))
+    return BatchResult(result for group in groups for result in group)
+
+def _copy_result(task, result):
+    if result.done():
+        return
+    if task.cancelled():
+        # Solo este envío: en un ScheduledSend, cancel() anularía también las repeticiones
+        concurrent.futures.Future.cancel(result)
+    elif task.exception() is not None:
+        result.set_exception(task.exception())
+    else:
+        result.set_result(task.result())
+
+def start_publisher(url, realm, topic=None):
+    """
+    Abre (o reutiliza) la sesión del pool para (url, realm). El topic se mantiene por compatibilidad.
+    """
+    network_loop.call_soon(_start, url, realm)
+
+def send_message_now(topic, message, delay=0, router_url=None, realm=None, acknowledge=True,
+                     timeout=SUBMIT_TIMEOUT):
+    """
+    Programa la publicación y devuelve un concurrent.futures.Future con su PublishResult.
+    Con delay > 0 el envío pasa por el planificador (ver schedule_message).
+    `message` puede ser un objeto JSON, un Payload (comparte sus codificaciones con el log)
+    o una CompiledTemplate (wamp.templates), que se genera en cada envío.
+    Se llama desde la GUI: con la cola llena y la política "bloquear" se espera como mucho
+    `timeout` segundos y después el mensaje se da por rechazado, sin congelar la interfaz.
+    """
+    if delay > 0:
+        return schedule_message(topic, message, delay=delay, router_url=router_url, realm=realm,
+                                acknowledge=acknowledge)
+    if router_url is None or realm is None:
+        if publisher_pool.default_key is None:
+            print("No hay sesión activa. Inicia el publicador primero.")
+            result = concurrent.futures.Future()
+            result.set_result(PublishResult(topic, error="No hay sesión activa"))
+            return result
+        router_url, realm = publisher_pool.default_key
+    # Sin corrutina por mensaje: se encola directamente en la cola acotada de la sesión
+    return publisher_pool.queue(router_url, realm).submit(OutboundItem(topic, message, acknowledge), timeout)
+
+def fan_out(plan, message, delay=0, acknowledge=True):
+    """
+    Publica `message` en todos los destinos de un FanOutPlan, en paralelo por sesión, y
+    devuelve un concurrent.futures.Future con el BatchResult del conjunto. Con delay > 0
+    el envío se programa en la línea de tiempo del proyecto; cancelar el future lo anula.
+    """
+    if delay <= 0:
+        return network_loop.submit(_fan_out(plan, message, acknowledge))
+    result = concurrent.futures.Future()
+
+    def fire():
+        task = asyncio.ensure_future(_fan_out(plan, message, acknowledge))
+        task.add_done_callback(lambda t: _copy_result(t, result))
+
+    def arm():
+        if result.cancelled():
+            return
+        for key in plan.sessions:
+            publisher_pool.get(*key).connect()
+        job = scheduler.call_later(delay, fire, timeline=project_timeline)
+        result.add_done_callback(lambda f: f.cancelled() and network_loop.call_soon(scheduler.cancel, job))
+
+    network_loop.call_soon(arm)
+    return result
+
+class ScheduledSend(concurrent.futures.Future):
+    """
+    Future del primer envío de schedule_message. cancel() anula el envío programado entero,
+    también un periódico cuyo primer envío ya terminó.
+    """
+    def __init__(self):
+        super().__init__()
+        self.job = None  # ScheduledJob, asignado en el hilo de red
+        self.stopped = False
+
+    def cancel(self):
+        self.stopped = True
+        network_loop.call_soon(self._cancel_job)
+        super().cancel()
+        return True
+
+    def _cancel_job(self):
+        if self.job is not None:
+            scheduler.cancel(self.job)
+
+def schedule_message(topic, message, delay=0, at=None, interval=None, count=None,
+                     router_url=None, realm=None, acknowledge=True, timeline=None):
+    """
+    Programa la publicación en el planificador del hilo de red: tras `delay` segundos o a la
+    hora del sistema `at` (epoch). Con `interval` se repite cada `interval` segundos
+    (`count` veces o indefinidamente). Devuelve un ScheduledSend con el PublishResult del
+    primer envío; cancelarlo cancela el envío programado con todas sus repeticiones.
+    """
+    result = ScheduledSend()
+    timeline = timeline or project_timeline
+
+    def fire():
+        task = asyncio.ensure_future(_send(topic, message, 0, router_url, realm, acknowledge))
+        task.add_done_callback(lambda t: _copy_result(t, result))
+
+    def arm():
+        if result.stopped:
+            return
+        pooled = _resolve(router_url, realm)
+        if pooled is not None:
+            pooled.connect()
+        if interval:
+            start = scheduler.loop.time() + delay if at is None else scheduler.from_wallclock(at)
+            result.job = scheduler.call_every(interval, fire, start=start, count=count, timeline=timeline)
+        elif at is not None:
+            result.job = scheduler.call_at_wallclock(at, fire, timeline=timeline)
         else:
-            global_session.publish(topic, message)
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        message_json = json.dumps(message, indent=2, ensure_ascii=False)
-        log_to_file(timestamp, topic, "publicador", message_json)
-        print("Mensaje enviado en", topic, ":", message)
-    asyncio.run_coroutine_threadsafe(_send(), global_loop)
+            result.job = scheduler.call_later(delay, fire, timeline=timeline)
+
+    network_loop.call_soon(arm)
+    return result
+
+def pause_schedule():
+    network_loop.call_soon(project_timeline.pause)
+
+def resume_schedule():
+    network_loop.call_soon(project_timeline.resume)
+
+def cancel_schedule():
+    network_loop.call_soon(project_timeline.cancel)
+
+def schedule_stats():
+    """
+    Envíos pendientes del proyecto y jitter del planificador (segundos).
+    """
+    stats = scheduler.jitter_summary()
+    stats["pending"] = len(project_timeline.jobs)
+    stats["paused"] = project_timeline.paused
+    return stats
+
+def publish_batch(topic, messages, acknowledge=True, router_url=None, realm=None, max_in_flight=MAX_IN_FLIGHT):
+    """
+    Publica una lista de mensajes con concurrencia acotada y devuelve un
+    concurrent.futures.Future con el BatchResult (ack y latencia por mensaje).
+    """
+    return network_loop.submit(_send_batch(topic, list(messages), acknowledge, router_url, realm, max_in_flight))
+
+def start_load(topic, message, profile, router_url=None, realm=None, acknowledge=False, workers=1):
+    """
+    Lanza una ejecución de carga (modo "Carga") en el hilo de red y devuelve su LoadRun.
+    Con workers > 1 la carga se reparte entre procesos (ver wamp.workers) y se devuelve
+    un WorkerLoadRun con la misma interfaz.
+    """
+    if workers > 1:
+        if router_url is None or realm is None:
+            if publisher_pool.default_key is None:
+                raise ConnectionError("No hay sesión activa")
+            router_url, realm = publisher_pool.default_key
+        return WorkerLoadRun([(router_url, realm, topic)], getattr(message, "value", message),
+                             profile, workers, acknowledge)
+    run = LoadRun(topic, profile)
+    run.future = network_loop.submit(_run_load(run, message, router_url, realm, acknowledge))
+    return run
+
+def configure_queues(capacity=None, policy=None):
+    """
+    Capacidad y política (ver wamp.outbound.POLICIES) de las colas de salida de las sesiones.
+    """
+    publisher_pool.configure_queues(capacity, policy)
+
+def queue_stats():
+    """
+    Métricas de las colas de salida por (router_url, realm): profundidad, tiempo en cola,
+    descartados y rechazados. Se puede llamar desde la GUI.
+    """
+    return publisher_pool.queue_stats()
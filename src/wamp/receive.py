@@ -0,0 +1,95 @@
+# src/wamp/receive.py
+import collections
+import datetime
+import sys
+import threading
+import time
+
+# Segundos entre dos procesados por lotes
+BATCH_INTERVAL = 0.05
+# Mensajes pendientes como mucho si los sinks no dan abasto; por encima se descartan los más antiguos
+MAX_PENDING = 200000
+
+class ReceivePipeline:
+    """
+    Camino de recepción en dos etapas. on_message() es el callback de las sesiones de
+    suscriptor: en el bucle de red solo guarda la hora monotónica y las referencias a
+    args/kwargs. Un hilo aparte recoge lo acumulado cada BATCH_INTERVAL, convierte las
+    horas a reloj de pared y entrega el lote a las etapas (sinks): vista, log a archivo,
+    consola... Cada sink recibe una lista de (timestamp epoch, realm, topic, contenido),
+    con contenido = {"args": [...], "kwargs": {...}}.
+
+    Lo pendiente está acotado a `max_pending`: si los sinks (p. ej. el log a archivo) van
+    más lentos que la llegada, se descartan los más antiguos y se cuentan en `dropped`.
+    """
+    def __init__(self, interval=BATCH_INTERVAL, max_pending=MAX_PENDING):
+        self.interval = interval
+        self.sinks = []
+        self.received = 0
+        self.dropped = 0
+        self._pending = collections.deque(maxlen=max_pending)
+        self._thread = None
+        self._stop = threading.Event()
+
+    def on_message(self, realm, topic, args, kwargs):
+        # deque.append es seguro entre hilos: sin locks en el camino caliente. Con la cola
+        # llena, append descarta el más antiguo (el contador es aproximado, sin lock)
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.dropped += 1
+        pending.append((time.monotonic(), realm, topic, args, kwargs))
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="wamp-recepcion", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """
+        Procesa lo acumulado y lo entrega a los sinks. Devuelve el tamaño del lote.
+        """
+        count = len(self._pending)
+        if not count:
+            return 0
+        offset = time.time() - time.monotonic()
+        pop = self._pending.popleft
+        batch = []
+        for _ in range(count):
+            received, realm, topic, args, kwargs = pop()
+            batch.append((received + offset, realm, topic, {"args": list(args), "kwargs": kwargs}))
+        self.received += count
+        for sink in self.sinks:
+            try:
+                sink(batch)
+            except Exception as e:
+                print("Error al procesar mensajes recibidos:", e)
+        return count
+
+def echo_batch(batch, out=None):
+    """
+    Sink de consola: una línea por lote en lugar de una por mensaje.
+    """
+    out = out or sys.stdout
+    timestamp, realm, topic, _ = batch[-1]
+    when = datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+    if len(batch) == 1:
+        print(f"Mensaje recibido en realm '{realm}', topic '{topic}' a las {when}", file=out)
+    else:
+        print(f"{len(batch)} mensajes recibidos (último: realm '{realm}', topic '{topic}' a las {when})", file=out)
+    out.flush()
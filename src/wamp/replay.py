@@ -0,0 +1,325 @@
+# src/wamp/replay.py
+"""
+Reproducción de tráfico capturado (no importa PyQt5):
+
+    cd src && python -m wamp.replay logs/log.txt --router ws://127.0.0.1:60001/ws --realm default [--speed 10]
+
+Lee el archivo de forma incremental, registro a registro, y vuelve a publicar cada
+mensaje respetando los intervalos originales escalados por --speed (0 o "max" = lo
+más rápido posible). Acepta el formato de log_to_file (registros de varias líneas
+"timestamp | rol | topic | json") y capturas JSON Lines con un objeto por línea
+({"timestamp", "realm", "topic", "args", "kwargs"} o "payload").
+"""
+import argparse
+import asyncio
+import datetime
+import fnmatch
+import json
+import os
+import re
+import sys
+import time
+
+# Inicio de un registro de log_to_file: "2025-03-20 12:00:00[.123] | "
+RECORD_START = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d+)? \| ")
+SEPARATOR = " | "
+# Máximo de publicaciones sin confirmar durante la reproducción
+MAX_IN_FLIGHT = 100
+# Mensajes de error guardados como mucho; por encima solo se cuentan
+MAX_ERRORS = 100
+# Roles que escribe services.message_log; por defecto solo se reproduce lo publicado,
+# para no enviar dos veces los mensajes que el mismo log registró al recibirlos
+PUBLISHER_ROLE = "publicador"
+SUBSCRIBER_ROLE = "suscriptor"
+DEFAULT_ROLES = (PUBLISHER_ROLE,)
+
+class ReplayRecord:
+    __slots__ = ("timestamp", "role", "realm", "topic", "payload")
+
+    def __init__(self, timestamp, role, realm, topic, payload):
+        self.timestamp = timestamp
+        self.role = role
+        self.realm = realm
+        self.topic = topic
+        self.payload = payload
+
+def parse_timestamp(value):
+    """
+    Devuelve el instante en segundos (epoch) de un timestamp ISO o numérico (s o ms).
+    """
+    if isinstance(value, (int, float)):
+        return value / 1000.0 if value > 1e11 else float(value)
+    return datetime.datetime.fromisoformat(str(value).strip()).timestamp()
+
+def _split_role(role):
+    # log_to_file escribe "rol@realm" cuando conoce el realm
+    role, _, realm = role.partition("@")
+    return role, realm or None
+
+def _unwrap(args, kwargs):
+    """
+    Contenido a publicar de un evento (args, kwargs). Mismo criterio que el publicador:
+    un dict va como kwargs y otro valor como args[0], así que solo se pueden reproducir
+    eventos con kwargs o con un único argumento. Los demás (varios args, o args y kwargs
+    a la vez) se rechazan con ValueError y se cuentan como registros ilegibles en lugar
+    de publicar una parte.
+    """
+    args, kwargs = args or [], kwargs or {}
+    if len(args) > 1 or (args and kwargs):
+        raise ValueError(f"evento con {len(args)} args y {len(kwargs)} kwargs: solo se reproduce kwargs o un único arg")
+    return kwargs if kwargs or not args else args[0]
+
+def _log_record(lines):
+    text = "".join(lines).rstrip("\n")
+    parts = text.split(SEPARATOR, 3)
+    if len(parts) < 4:
+        raise ValueError("registro incompleto")
+    role, realm = _split_role(parts[1].strip())
+    try:
+        payload = json.loads(parts[3])
+    except ValueError:
+        payload = parts[3]
+    if role == SUBSCRIBER_ROLE and isinstance(payload, dict) and set(payload) <= {"args", "kwargs"}:
+        # log_received guarda el evento como {"args": [...], "kwargs": {...}}
+        payload = _unwrap(payload.get("args"), payload.get("kwargs"))
+    return ReplayRecord(parse_timestamp(parts[0]), role, realm, parts[2].strip(), payload)
+
+def _jsonl_record(line):
+    data = json.loads(line)
+    if "payload" in data:
+        payload = data["payload"]
+    else:
+        payload = _unwrap(data.get("args"), data.get("kwargs"))
+    return ReplayRecord(parse_timestamp(data["timestamp"]), data.get("role"), data.get("realm"),
+                        data["topic"], payload)
+
+def read_records(path, errors=None, stop_at=None):
+    """
+    Genera los ReplayRecord de un archivo leyendo línea a línea, sin cargarlo entero.
+    Los registros que no se pueden interpretar se saltan y se añaden a `errors`.
+    Con stop_at (bytes) no se lee más allá de ese tamaño: así reproducir el propio
+    log mientras se escribe en él no vuelve a leer lo que se acaba de publicar.
+    """
+    def fail(line_no, e):
+        if errors is not None:
+            errors.append(f"línea {line_no}: {e}")
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        pending, start_no, line_no, read = [], 0, 0, 0
+        for line in f:
+            line_no += 1
+            read += len(line.encode("utf-8"))
+            if stop_at is not None and read > stop_at:
+                break
+            if line.startswith("{") and not pending:
+                try:
+                    yield _jsonl_record(line)
+                except (ValueError, KeyError, TypeError) as e:
+                    fail(line_no, e)
+                continue
+            if RECORD_START.match(line):
+                if pending:
+                    try:
+                        yield _log_record(pending)
+                    except ValueError as e:
+                        fail(start_no, e)
+                pending, start_no = [line], line_no
+            elif pending:
+                pending.append(line)
+            elif line.strip():
+                fail(line_no, "línea fuera de un registro")
+        if pending:
+            try:
+                yield _log_record(pending)
+            except ValueError as e:
+                fail(start_no, e)
+
+def make_filter(topics=None, realms=None, roles=None):
+    """
+    Filtro por topic/realm/rol; cada uno es una lista de patrones tipo shell (app.*).
+    Un registro sin realm no pasa un filtro de realm; uno sin rol (capturas JSON Lines)
+    sí pasa el de rol.
+    """
+    def matches(value, patterns):
+        return value is not None and any(fnmatch.fnmatchcase(value, p) for p in patterns)
+
+    def accept(record):
+        if topics and not matches(record.topic, topics):
+            return False
+        if realms and not matches(record.realm, realms):
+            return False
+        if roles and record.role is not None and not matches(record.role, roles):
+            return False
+        return True
+    return accept
+
+class ErrorList(list):
+    """
+    Lista de errores acotada: guarda los `limit` primeros y cuenta todos en `total`, para
+    que un archivo entero de registros erróneos no crezca sin límite en memoria.
+    """
+    def __init__(self, limit=MAX_ERRORS):
+        super().__init__()
+        self.limit = limit
+        self.total = 0
+
+    def append(self, error):
+        self.total += 1
+        if len(self) < self.limit:
+            super().append(error)
+
+class ReplayStats:
+    def __init__(self):
+        self.read = 0
+        self.matched = 0
+        self.published = 0
+        self.failed = 0
+        self.errors = ErrorList()
+        self.max_lag = 0.0
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def to_dict(self):
+        return {"read": self.read, "matched": self.matched, "published": self.published,
+                "failed": self.failed, "skipped": self.errors.total,
+                "max_lag_ms": self.max_lag * 1000.0, "elapsed_s": self.elapsed}
+
+    def summary(self):
+        return (f"{self.published}/{self.matched} publicados ({self.read} leídos, {self.failed} fallidos, "
+                f"{self.errors.total} registros ilegibles) en {self.elapsed:.1f} s, "
+                f"retraso máx. {self.max_lag * 1000.0:.1f} ms")
+
+async def replay(records, target, speed=1.0, accept=None, stats=None, acknowledge=False,
+                 should_stop=None, max_in_flight=MAX_IN_FLIGHT):
+    """
+    Publica los registros respetando sus intervalos divididos por `speed` (0 = sin esperas).
+    target(record) devuelve la PooledSession donde publicar (se usa su send()). Se ejecuta
+    en el hilo de red.
+    """
+    stats = stats or ReplayStats()
+    loop = asyncio.get_event_loop()
+    slots = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+    origin = None
+
+    async def publish(pooled, record):
+        try:
+            # Por la cola de salida de la sesión, con su registro en el log
+            result = await pooled.send(record.topic, record.payload, 0, acknowledge)
+            if result.ok:
+                stats.published += 1
+            else:
+                stats.failed += 1
+                if stats.failed <= 10:
+                    print(f"Error al reproducir en {record.topic}:", result.error)
+        finally:
+            slots.release()
+
+    for record in records:
+        if should_stop is not None and should_stop():
+            break
+        stats.read += 1
+        if stats.read % 1000 == 0:
+            # Cede el bucle aunque no haya esperas (velocidad máxima o registros filtrados)
+            await asyncio.sleep(0)
+        if accept is not None and not accept(record):
+            continue
+        stats.matched += 1
+        if speed > 0:
+            if origin is None:
+                origin = (record.timestamp, loop.time())
+            due = origin[1] + (record.timestamp - origin[0]) / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                stats.max_lag = max(stats.max_lag, -delay)
+        try:
+            pooled = target(record)
+        except ValueError as e:
+            stats.failed += 1
+            stats.errors.append(str(e))
+            if stats.failed <= 10:
+                print("Registro no reproducible:", e)
+            continue
+        await slots.acquire()
+        task = asyncio.ensure_future(publish(pooled, record))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    stats.finished = time.monotonic()
+    return stats
+
+async def replay_file(path, router_url, realm=None, speed=1.0, topics=None, realms=None, roles=None,
+                      acknowledge=False, stats=None, should_stop=None):
+    """
+    Reproduce un archivo en router_url. Sin `realm`, cada mensaje va al realm registrado.
+    Sin `roles` solo se reproducen los registros del publicador (DEFAULT_ROLES).
+    """
+    from .publisher import publisher_pool
+    stats = stats or ReplayStats()
+
+    def target(record):
+        record_realm = realm or record.realm
+        if not record_realm:
+            raise ValueError(f"El registro de {record.topic} no indica realm; use --realm")
+        return publisher_pool.get(router_url, record_realm)
+
+    records = read_records(path, stats.errors, stop_at=os.path.getsize(path))
+    print(f"Reproduciendo {path} en {router_url} (velocidad: {'máxima' if speed <= 0 else f'{speed:g}x'})")
+    await replay(records, target, speed, make_filter(topics, realms, roles or DEFAULT_ROLES), stats,
+                 acknowledge, should_stop)
+    print("Reproducción finalizada:", stats.summary())
+    return stats
+
+def parse_speed(value):
+    if str(value).strip().lower() in ("max", "0"):
+        return 0.0
+    speed = float(str(value).rstrip("xX"))
+    if speed < 0:
+        raise argparse.ArgumentTypeError("la velocidad no puede ser negativa")
+    return speed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m wamp.replay", description="Reproduce tráfico capturado en un router WAMP.")
+    parser.add_argument("path", help="Archivo de log (log_to_file) o captura JSON Lines")
+    parser.add_argument("--router", default="ws://127.0.0.1:60001/ws", help="URL del router de destino")
+    parser.add_argument("--realm", default=None, help="Realm de destino (por defecto, el registrado en cada mensaje)")
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="Factor de velocidad: 0.5, 10, max (por defecto 1)")
+    parser.add_argument("--topic", action="append", dest="topics", help="Solo estos topics (admite *; repetible)")
+    parser.add_argument("--source-realm", action="append", dest="realms", help="Solo mensajes de estos realms (repetible)")
+    parser.add_argument("--role", action="append", dest="roles", help="Registros de este rol: publicador (por defecto), suscriptor o * (repetible)")
+    parser.add_argument("--ack", action="store_true", help="Pide confirmación al router por mensaje")
+    args = parser.parse_args(argv)
+
+    # Importación diferida: la lectura y el filtrado no necesitan autobahn
+    from .loop import network_loop
+    if not os.path.exists(args.path):
+        print(f"No existe el archivo: {args.path}", file=sys.stderr)
+        return 2
+    stats = ReplayStats()
+    future = network_loop.submit(replay_file(args.path, args.router, args.realm, args.speed, args.topics,
+                                             args.realms, args.roles, args.ack, stats))
+    try:
+        future.result()
+    except KeyboardInterrupt:
+        print("\nInterrumpido; cerrando sesiones...")
+        future.cancel()
+    except Exception as e:
+        print(f"Error en la reproducción: {e}", file=sys.stderr)
+        return 1
+    finally:
+        network_loop.stop()
+    for error in stats.errors[:10]:
+        print("Registro ignorado:", error)
+    if stats.errors.total > 10:
+        print(f"... y {stats.errors.total - 10} registros ignorados más")
+    return 1 if stats.failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
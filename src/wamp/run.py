@@ -0,0 +1,380 @@
+# src/wamp/run.py
+"""
+Ejecución sin GUI de un proyecto guardado (no importa PyQt5):
+
+    cd src && python -m wamp.run proyecto.json [--duration 60] [--probe] [--json resumen.json]
+
+Abre las sesiones necesarias, lanza las suscripciones y los escenarios del publicador
+y al terminar imprime un resumen. Sin --duration termina cuando acaban los envíos;
+si el proyecto tiene suscripciones o envíos periódicos, sigue hasta Ctrl+C.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+import time
+from .loop import network_loop, open_session
+from .load import LoadProfile, LoadStats
+from .probe import LatencyHistogram, latency_probe
+from .publisher import publisher_pool, queue_stats
+from .scheduler import scheduler
+from .sequence import SequenceChecker
+from .serializers import normalize_serializers, serializers_for, set_realm_serializers
+from .filters import compile_filters
+from .subscriber import MultiTopicSubscriber
+from .templates import load_payload
+from .topics import parse_topic, split_topics
+from .workers import MAX_WORKERS, WorkerLoadRun
+
+ON_DEMAND = "onDemand"
+PROGRAMMED = "programado"
+SYSTEM_TIME = "tiempoSistema"
+LOAD = "carga"
+# Nombres de modo usados por los distintos widgets del publicador
+MODES = {
+    "onDemand": ON_DEMAND, "On demand": ON_DEMAND,
+    "programado": PROGRAMMED, "Programado": PROGRAMMED,
+    "tiempoSistema": SYSTEM_TIME, "Hora de sistema": SYSTEM_TIME,
+    "carga": LOAD, "Carga": LOAD,
+}
+DEFAULT_ROUTER_URL = "ws://127.0.0.1:60001/ws"
+
+def load_project(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def scenario_targets(scenario):
+    """
+    Lista de (router_url, realm, topic) de un escenario, tanto en el formato de
+    PublisherTab (realm/topic) como en el de MessageConfigWidget (realms/topics por realm).
+    """
+    router_url = scenario.get("router_url", DEFAULT_ROUTER_URL)
+    if "realms" in scenario:
+        topics = scenario.get("topics", {})
+        return [(router_url, realm, topic) for realm in scenario["realms"] for topic in topics.get(realm, [])]
+    if scenario.get("topic"):
+        # MessageConfigWidget admite varios topics separados por comas
+        realm = scenario.get("realm", "default")
+        return [(router_url, realm, topic) for topic in split_topics(scenario["topic"])]
+    return []
+
+def scenario_timing(mode, time_str):
+    """
+    Devuelve (delay, at) para el modo: retardo relativo en segundos u hora absoluta (epoch).
+    """
+    if mode not in (PROGRAMMED, SYSTEM_TIME):
+        return 0, None
+    h, m, s = map(int, (time_str or "00:00:00").strip().split(":"))
+    if mode == PROGRAMMED:
+        return h * 3600 + m * 60 + s, None
+    now = datetime.datetime.now()
+    target = now.replace(hour=h, minute=m, second=s, microsecond=0)
+    if target < now:
+        target += datetime.timedelta(days=1)
+    return 0, target.timestamp()
+
+class TopicCounters:
+    def __init__(self):
+        self.sent = 0
+        self.acked = 0
+        self.errors = 0
+        self.received = 0
+        self.last_error = None
+        self.ack_latency = LatencyHistogram()
+
+    def on_result(self, result):
+        self.sent += 1
+        if result.ok:
+            self.acked += 1
+            if result.latency is not None:
+                self.ack_latency.record(result.latency)
+        else:
+            self.errors += 1
+            self.last_error = result.error
+
+class RunReport:
+    """
+    Contadores de una ejecución sin GUI por (realm, topic).
+    """
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.publishers = {}
+        self.subscribers = {}
+        self.filters = []
+        self.joins = []
+        self.sequence = None  # SequenceChecker si el proyecto lo activa
+        self.loads = []
+        self.errors = []
+        self.pending = set()
+        self.queues = {}
+        self.started = time.monotonic()
+
+    def publisher(self, realm, topic):
+        return self.publishers.setdefault((realm, topic), TopicCounters())
+
+    def on_message(self, realm, topic, args, kwargs):
+        self.subscribers.setdefault((realm, topic), TopicCounters()).received += 1
+        if self.verbose:
+            print(f"Mensaje recibido en realm '{realm}', topic '{topic}':", {"args": args, "kwargs": kwargs})
+
+    def track(self, task, counters):
+        self.pending.add(task)
+
+        def done(t):
+            self.pending.discard(t)
+            if not t.cancelled() and t.exception() is None:
+                counters.on_result(t.result())
+        task.add_done_callback(done)
+
+    def has_failures(self):
+        return bool(self.errors) or any(c.errors for c in self.publishers.values()) or \
+            any(stats.errors for _, _, stats in self.loads)
+
+    def to_dict(self):
+        def ms(value):
+            return round(value * 1000, 3) if value is not None else None
+        return {
+            "elapsed": time.monotonic() - self.started,
+            "publish": [{"realm": realm, "topic": topic, "sent": c.sent, "acked": c.acked, "errors": c.errors,
+                         "ack_p50_ms": ms(c.ack_latency.percentile(50)), "ack_p99_ms": ms(c.ack_latency.percentile(99)),
+                         "last_error": c.last_error}
+                        for (realm, topic), c in sorted(self.publishers.items())],
+            "load": [dict(realm=realm, topic=topic, **stats.snapshot()) for realm, topic, stats in self.loads],
+            "receive": [{"realm": realm, "topic": topic, "received": c.received}
+                        for (realm, topic), c in sorted(self.subscribers.items())],
+            "filters": [{"realm": realm, "topic": topic, "expression": f.expression,
+                         "matched": f.matched, "rejected": f.rejected}
+                        for realm, topic, f in self.filters],
+            "joins": [{"realm": session.config.realm, "router_url": url, "topics": len(session.subscriptions),
+                       "join_ms": ms(session.join_time),
+                       "failed": {topic: str(e) for topic, e in sorted(session.failures.items())}}
+                      for url, session in self.joins],
+            "latency": [dict(realm=realm, topic=topic, **{k: (v if k == "count" else ms(v)) for k, v in summary.items()})
+                        for (realm, topic), summary in sorted(latency_probe.snapshot().items())],
+            "scheduler_jitter_ms": {k: (v if k in ("count", "early") else ms(v))
+                                    for k, v in scheduler.jitter_summary().items()},
+            "queues": [dict(router_url=url, realm=realm, **{k: (ms(v) if k.startswith("queued_") else v)
+                                                             for k, v in stats.items()})
+                       for (url, realm), stats in sorted(self.queues.items())],
+            "sequence": ({"field": self.sequence.field, "publisher_field": self.sequence.publisher_field,
+                          "totals": self.sequence.totals(), "streams": self.sequence.report()}
+                         if self.sequence is not None else None),
+            "errors": self.errors,
+        }
+
+    def print_summary(self):
+        data = self.to_dict()
+        print(f"\n=== Resumen de ejecución ({data['elapsed']:.1f} s) ===")
+        for row in data["publish"]:
+            line = f"[pub] {row['realm']} / {row['topic']}: enviados {row['sent']}, ack {row['acked']}, errores {row['errors']}"
+            if row["ack_p50_ms"] is not None:
+                line += f", ack p50 {row['ack_p50_ms']} ms, p99 {row['ack_p99_ms']} ms"
+            print(line)
+        for realm, topic, stats in self.loads:
+            print(f"[carga] {realm} / {topic}: {stats.summary()}")
+        for row in data["receive"]:
+            print(f"[sub] {row['realm']} / {row['topic']}: {row['received']} mensajes")
+        for row in data["filters"]:
+            print(f"[filtro] {row['realm']} / {row['topic']}: {row['expression']} -> "
+                  f"{row['matched']} coinciden, {row['rejected']} descartados")
+        for row in data["joins"]:
+            print(f"[join] {row['realm']} @ {row['router_url']}: {row['topics']} topics en {row['join_ms']} ms"
+                  + (f", {len(row['failed'])} fallidos" if row["failed"] else ""))
+        for row in data["latency"]:
+            print(f"[latencia] {row['realm']} / {row['topic']}: n={row['count']} p50 {row['p50']} ms "
+                  f"p99 {row['p99']} ms p99.9 {row['p99.9']} ms máx {row['max']} ms")
+        if data["scheduler_jitter_ms"]["count"]:
+            jitter = data["scheduler_jitter_ms"]
+            print(f"[planificador] {jitter['count']} disparos, jitter p99 {jitter['p99']} ms, máx {jitter['max']} ms")
+        for row in data["queues"]:
+            if row["enqueued"]:
+                print(f"[cola] {row['realm']} @ {row['router_url']}: {row['enqueued']} encolados, máx {row['max_depth']}"
+                      f"/{row['capacity']}, espera p99 {row['queued_p99']} ms, descartados {row['dropped']},"
+                      f" rechazados {row['rejected']}")
+        if self.sequence is not None:
+            print("[secuencia]", self.sequence.summary())
+            for row in data["sequence"]["streams"]:
+                if row["missing"] or row["duplicates"] or row["reordered"] or row["late"]:
+                    publisher = f" ({row['publisher']})" if row["publisher"] else ""
+                    print(f"[secuencia] {row['realm']} / {row['topic']}{publisher}: {row['missing']} perdidos, "
+                          f"{row['duplicates']} duplicados, {row['reordered']} desordenados, {row['late']} fuera de ventana")
+        for error in self.errors:
+            print("[error]", error)
+
+async def wait_workers(run, report):
+    try:
+        await run.wait()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        report.errors.append(f"Carga multiproceso {run.topic}: {e}")
+    else:
+        report.errors.extend(f"Carga multiproceso {run.topic}: {error}" for error in run.errors)
+
+def start_scenario(scenario, report, timeline, workers=None):
+    """
+    Programa un escenario del publicador en el bucle actual. Devuelve las tareas de carga lanzadas.
+    `workers` sustituye el número de procesos de carga configurado en el escenario.
+    """
+    mode = MODES.get(scenario.get("mode"), ON_DEMAND)
+    load_tasks = []
+    try:
+        content = load_payload(scenario.get("content", {}))
+    except ValueError as e:
+        report.errors.append(f"Escenario {scenario.get('id', '?')}: contenido inválido ({e})")
+        return load_tasks
+    try:
+        delay, at = scenario_timing(mode, scenario.get("time"))
+    except ValueError as e:
+        report.errors.append(f"Escenario {scenario.get('id', '?')}: tiempo inválido ({e})")
+        return load_tasks
+    try:
+        serializers = normalize_serializers(scenario.get("serializers"))
+    except ValueError as e:
+        report.errors.append(f"Escenario {scenario.get('id', '?')}: {e}")
+        return load_tasks
+    repeat = scenario.get("repeat") or None
+    load_config = scenario.get("load", {})
+    workers = min(workers or load_config.get("workers") or 1, MAX_WORKERS)
+    if mode == LOAD and workers > 1:
+        try:
+            profile = LoadProfile.from_config(load_config)
+        except ValueError as e:
+            report.errors.append(f"Escenario {scenario.get('id', '?')}: carga inválida ({e})")
+            return load_tasks
+        targets = scenario_targets(scenario)
+        if serializers:
+            for _, realm, _ in targets:
+                set_realm_serializers(realm, serializers)
+        # WorkerLoadRun crea los procesos en su propio hilo: no detiene el bucle
+        run = WorkerLoadRun(targets, scenario.get("content", {}), profile, workers,
+                            load_config.get("acknowledge", False))
+        for target in run.targets:
+            report.loads.append((target[1], target[2], run.target_stats[target]))
+        load_tasks.append(asyncio.ensure_future(wait_workers(run, report)))
+        return load_tasks
+    for router_url, realm, topic in scenario_targets(scenario):
+        if serializers:
+            set_realm_serializers(realm, serializers)
+        pooled = publisher_pool.get(router_url, realm)
+        pooled.connect()
+        if mode == LOAD:
+            try:
+                profile = LoadProfile.from_config(load_config)
+            except ValueError as e:
+                report.errors.append(f"Escenario {scenario.get('id', '?')}: carga inválida ({e})")
+                continue
+            stats = LoadStats(profile)
+            report.loads.append((realm, topic, stats))
+            load_tasks.append(asyncio.ensure_future(
+                pooled.run_load(topic, content, profile, stats, load_config.get("acknowledge", False))))
+            continue
+        counters = report.publisher(realm, topic)
+
+        def fire(pooled=pooled, topic=topic, counters=counters):
+            report.track(asyncio.ensure_future(pooled.send(topic, content)), counters)
+        start = scheduler.loop.time() + delay if at is None else scheduler.from_wallclock(at)
+        if repeat:
+            scheduler.call_every(repeat, fire, start=start, timeline=timeline)
+        else:
+            scheduler.call_at(start, fire, timeline=timeline)
+    return load_tasks
+
+async def run_project(project, report, duration=None, workers=None):
+    loop = asyncio.get_event_loop()
+    timeline = scheduler.timeline("headless")
+    queue = project.get("publisher", {}).get("queue", {})
+    try:
+        publisher_pool.configure_queues(queue.get("capacity"), queue.get("policy"))
+    except ValueError as e:
+        report.errors.append(f"Cola de salida: {e}")
+    sequence = project.get("subscriber", {}).get("sequence") or {}
+    if sequence.get("enabled"):
+        try:
+            report.sequence = SequenceChecker(sequence.get("field") or "kwargs.seq", sequence.get("publisher_field"))
+        except ValueError as e:
+            report.errors.append(f"Secuencia: {e}")
+    # Primero las suscripciones, para no perder los primeros mensajes publicados
+    sessions = []
+    for sub in project.get("subscriber", {}).get("subscriptions", []):
+        url, realm, topics = sub.get("router_url", DEFAULT_ROUTER_URL), sub.get("realm"), sub.get("topics", [])
+        if not realm or not topics:
+            continue
+        try:
+            if sub.get("serializers"):
+                set_realm_serializers(realm, sub["serializers"])
+            for topic in topics:
+                parse_topic(topic)
+            filters = compile_filters(sub.get("filters"))
+            report.filters.extend((realm, topic, f) for topic, f in filters.items())
+            # La secuencia se comprueba antes de los filtros: lo filtrado no cuenta como perdido
+            check = report.sequence.check if report.sequence is not None else None
+            session = await open_session(url, realm, MultiTopicSubscriber.factory(topics, report.on_message, filters, check),
+                                         serializers_for(realm))
+            sessions.append(session)
+            report.joins.append((url, session))
+        except Exception as e:
+            report.errors.append(f"Suscripción {realm} @ {url}: {e}")
+    load_tasks = []
+    for scenario in project.get("publisher", {}).get("scenarios", []):
+        load_tasks.extend(start_scenario(scenario, report, timeline, workers))
+
+    deadline = loop.time() + duration if duration else None
+    try:
+        while True:
+            if deadline is not None and loop.time() >= deadline:
+                break
+            publishing = timeline.jobs or report.pending or any(not t.done() for t in load_tasks)
+            if deadline is None and not publishing and not sessions:
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        timeline.cancel()
+        for task in load_tasks:
+            task.cancel()
+        await asyncio.gather(*load_tasks, return_exceptions=True)
+        for session in sessions:
+            if session.is_attached():
+                await session.leave()
+        # Las métricas de las colas se guardan antes de cerrarlas
+        report.queues = queue_stats()
+        await publisher_pool.close_all()
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m wamp.run", description="Ejecuta un proyecto WAMP sin GUI.")
+    parser.add_argument("project", help="Archivo de proyecto (JSON) guardado desde la GUI")
+    parser.add_argument("--duration", type=float, default=None, help="Segundos de ejecución (por defecto, hasta terminar)")
+    parser.add_argument("--probe", action="store_true", help="Activa la sonda de latencia extremo a extremo")
+    parser.add_argument("--json", dest="json_path", default=None, help="Guarda el resumen en este archivo JSON")
+    parser.add_argument("--verbose", action="store_true", help="Muestra cada mensaje recibido")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Procesos por escenario de carga (máx. {MAX_WORKERS}; por defecto, el del proyecto)")
+    args = parser.parse_args(argv)
+
+    try:
+        project = load_project(args.project)
+    except Exception as e:
+        print(f"No se pudo cargar el proyecto: {e}", file=sys.stderr)
+        return 2
+    latency_probe.enabled = args.probe
+    report = RunReport(args.verbose)
+    future = network_loop.submit(run_project(project, report, args.duration, args.workers))
+    try:
+        future.result()
+    except KeyboardInterrupt:
+        print("\nInterrumpido; cerrando sesiones...")
+        future.cancel()
+    except Exception as e:
+        report.errors.append(f"Error en la ejecución: {e}")
+    finally:
+        network_loop.stop()
+    report.print_summary()
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+    return 1 if report.has_failures() else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+# src/wamp/scheduler.py
+import asyncio
+import datetime
+import heapq
+import itertools
+import time
+from .probe import LatencyHistogram
+
+# Los vencimientos a menos de la resolución del reloj se disparan juntos (como hace asyncio)
+CLOCK_RESOLUTION = time.get_clock_info("monotonic").resolution
+
+class ScheduledJob:
+    """
+    Envío programado. deadline está en tiempo del bucle (time.monotonic()).
+    Los periódicos se recalculan desde su ancla (anchor + n * interval), sin acumular deriva.
+    """
+    __slots__ = ("id", "deadline", "callback", "args", "interval", "anchor", "remaining",
+                 "tick", "runs", "missed", "cancelled", "timeline", "daily")
+
+    def __init__(self, job_id, deadline, callback, args, interval=None, count=None, timeline=None, daily=None):
+        self.id = job_id
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        self.anchor = deadline
+        self.remaining = count
+        self.tick = 0
+        self.runs = 0
+        self.missed = 0
+        self.cancelled = False
+        self.timeline = timeline
+        self.daily = daily
+
+    def __lt__(self, other):
+        return (self.deadline, self.id) < (other.deadline, other.id)
+
+    def cancel(self):
+        self.cancelled = True
+
+class Timeline:
+    """
+    Agrupa los envíos de un proyecto para pausarlos, reanudarlos o cancelarlos juntos.
+    """
+    def __init__(self, scheduler, name=""):
+        self.scheduler = scheduler
+        self.name = name
+        self.paused_at = None
+        self.parked = []
+        self.jobs = set()
+
+    @property
+    def paused(self):
+        return self.paused_at is not None
+
+    def pause(self):
+        self.scheduler.pause(self)
+
+    def resume(self):
+        self.scheduler.resume(self)
+
+    def cancel(self):
+        self.scheduler.cancel_timeline(self)
+
+class Scheduler:
+    """
+    Planificador de envíos basado en un montículo (heap) con un único temporizador del bucle
+    armado para el vencimiento más próximo. Mide el jitter (retraso real frente al previsto).
+    Todos sus métodos deben llamarse desde el hilo del bucle. No hay espera activa: el bucle
+    es compartido con todas las sesiones, así que la precisión es la de su temporizador (~1 ms).
+    """
+    def __init__(self):
+        self.jitter = LatencyHistogram()
+        self.early = 0
+        self._heap = []
+        self._ids = itertools.count()
+        self._handle = None
+        self._armed_for = None
+        self._armed_loop = None
+
+    @property
+    def loop(self):
+        # Sin caché: network_loop puede reiniciarse con un bucle nuevo
+        return asyncio.get_event_loop()
+
+    def __len__(self):
+        return sum(1 for job in self._heap if not job.cancelled)
+
+    def call_at(self, deadline, callback, *args, timeline=None):
+        return self._add(ScheduledJob(next(self._ids), deadline, callback, args, timeline=timeline))
+
+    def call_later(self, delay, callback, *args, timeline=None):
+        return self.call_at(self.loop.time() + max(0.0, delay), callback, *args, timeline=timeline)
+
+    def call_at_wallclock(self, timestamp, callback, *args, timeline=None):
+        """
+        Programa para un instante del reloj del sistema (epoch). La conversión al reloj
+        monotónico se hace aquí, en el hilo de red, justo al programar.
+        """
+        return self.call_at(self.from_wallclock(timestamp), callback, *args, timeline=timeline)
+
+    def call_every(self, interval, callback, *args, start=None, count=None, timeline=None):
+        """
+        Repite cada `interval` segundos desde `start` (tiempo del bucle; por defecto ahora + interval),
+        `count` veces o indefinidamente.
+        """
+        if interval <= 0:
+            raise ValueError("El intervalo debe ser mayor que 0")
+        deadline = start if start is not None else self.loop.time() + interval
+        return self._add(ScheduledJob(next(self._ids), deadline, callback, args,
+                                      interval=interval, count=count, timeline=timeline))
+
+    def call_daily(self, hour, minute, second, callback, *args, count=None, timeline=None):
+        """
+        Programación tipo cron: todos los días a HH:MM:SS del reloj del sistema.
+        """
+        daily = (hour, minute, second)
+        deadline = self.from_wallclock(self._next_daily(daily))
+        return self._add(ScheduledJob(next(self._ids), deadline, callback, args,
+                                      count=count, timeline=timeline, daily=daily))
+
+    def cancel(self, job):
+        job.cancel()
+        if job.timeline is not None:
+            job.timeline.jobs.discard(job)
+
+    def timeline(self, name=""):
+        return Timeline(self, name)
+
+    def pause(self, timeline):
+        if timeline.paused:
+            return
+        timeline.paused_at = self.loop.time()
+        kept = []
+        for job in self._heap:
+            (timeline.parked if job.timeline is timeline else kept).append(job)
+        heapq.heapify(kept)
+        self._heap = kept
+        self._arm()
+
+    def resume(self, timeline):
+        if not timeline.paused:
+            return
+        offset = self.loop.time() - timeline.paused_at
+        timeline.paused_at = None
+        parked, timeline.parked = timeline.parked, []
+        for job in parked:
+            if job.cancelled:
+                continue
+            # Los programados por reloj de sistema no se desplazan: siguen a la hora fijada
+            if job.daily is None:
+                job.deadline += offset
+                job.anchor += offset
+            heapq.heappush(self._heap, job)
+        self._arm()
+
+    def cancel_timeline(self, timeline):
+        for job in list(timeline.jobs) + timeline.parked:
+            job.cancel()
+        timeline.jobs.clear()
+        timeline.parked = []
+
+    def jitter_summary(self):
+        summary = self.jitter.summary()
+        summary["early"] = self.early
+        return summary
+
+    def from_wallclock(self, timestamp):
+        return self.loop.time() + (timestamp - time.time())
+
+    @staticmethod
+    def _next_daily(daily, after=None):
+        now = datetime.datetime.fromtimestamp(after if after is not None else time.time())
+        target = now.replace(hour=daily[0], minute=daily[1], second=daily[2], microsecond=0)
+        if target <= now:
+            target += datetime.timedelta(days=1)
+        return target.timestamp()
+
+    def _add(self, job):
+        if job.timeline is not None:
+            job.timeline.jobs.add(job)
+            if job.timeline.paused:
+                job.timeline.parked.append(job)
+                return job
+        heapq.heappush(self._heap, job)
+        self._arm()
+        return job
+
+    def _arm(self):
+        loop = self.loop
+        if self._handle is not None and self._armed_loop is not loop:
+            # El temporizador era de un bucle que ya terminó
+            self._handle = self._armed_for = None
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = self._armed_for = None
+            return
+        deadline = self._heap[0].deadline
+        if self._handle is not None and self._armed_for == deadline:
+            return
+        if self._handle is not None:
+            self._handle.cancel()
+        self._armed_for = deadline
+        self._armed_loop = loop
+        self._handle = loop.call_at(deadline, self._run)
+
+    def _run(self):
+        self._handle = self._armed_for = None
+        loop = self.loop
+        horizon = loop.time() + CLOCK_RESOLUTION
+        while self._heap and self._heap[0].deadline <= horizon:
+            job = heapq.heappop(self._heap)
+            if job.cancelled:
+                continue
+            now = loop.time()
+            lateness = now - job.deadline
+            if lateness < 0:
+                self.early += 1
+            self.jitter.record(max(0.0, lateness))
+            self._fire(job)
+            self._reschedule(job, now)
+        self._arm()
+
+    def _fire(self, job):
+        job.runs += 1
+        try:
+            result = job.callback(*job.args)
+            if asyncio.iscoroutine(result):
+                asyncio.ensure_future(result)
+        except Exception as e:
+            print(f"Error en el envío programado #{job.id}:", e)
+
+    def _reschedule(self, job, now):
+        if job.remaining is not None:
+            job.remaining -= 1
+        if job.cancelled or (job.remaining is not None and job.remaining <= 0):
+            self._finish(job)
+            return
+        if job.daily is not None:
+            job.deadline = self.from_wallclock(self._next_daily(job.daily, time.time() + 1))
+        elif job.interval is not None:
+            # Siguiente tick alineado al ancla; los ticks ya vencidos se cuentan como perdidos
+            tick = max(job.tick + 1, int((now - job.anchor) // job.interval) + 1)
+            job.missed += tick - job.tick - 1
+            job.tick = tick
+            job.deadline = job.anchor + tick * job.interval
+        else:
+            self._finish(job)
+            return
+        heapq.heappush(self._heap, job)
+
+    def _finish(self, job):
+        if job.timeline is not None:
+            job.timeline.jobs.discard(job)
+
+scheduler = Scheduler()
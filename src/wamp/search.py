@@ -0,0 +1,337 @@
+# src/wamp/search.py
+"""
+Búsqueda indexada en el historial de mensajes recibidos (ver wamp.history.MessageStore).
+
+El índice se actualiza al añadir cada mensaje y se consulta sin volver a leer los
+contenidos. Consultas (términos separados por espacios, todos deben cumplirse):
+
+    topic:MsgAlerts        ese topic y los que cuelgan de él (MsgAlerts.cpu...); con *
+                           al final, por prefijo de texto (igual con realm:)
+    kwargs.id:1234         valor exacto en la ruta (args[0].id o args.0.id para listas)
+    kwargs.id:*            la ruta existe
+    alarma                 palabra en cualquier texto del contenido
+    after:12:00            desde esa hora de hoy (o "2024-05-01 12:00"); before: hasta
+    "kwargs.estado:en curso"   comillas para valores con espacios
+
+Las rutas con muchos valores distintos (ids, secuencias, horas) no tienen una lista por
+valor, que ocuparía varias veces el historial: guardan el hash de ruta=valor de cada
+mensaje en un array paralelo a sus secuencias y se buscan recorriéndolo en C
+(array.index), sin decodificar contenidos.
+"""
+import bisect
+import datetime
+import heapq
+import re
+import shlex
+from array import array
+
+# Palabras más largas no se indexan como texto libre
+MAX_WORD = 64
+# Tokens como mucho por mensaje, para acotar el coste de contenidos muy grandes
+MAX_TOKENS = 512
+# Resultados como mucho por consulta (los más recientes)
+MAX_RESULTS = 10000
+# Valores distintos por ruta con una lista propia; por encima la ruta pasa a hashes
+MAX_VALUES = 256
+
+WORD = re.compile(r"\w+", re.UNICODE)
+INDEX = re.compile(r"\[(\d+)\]")
+
+class SearchError(ValueError):
+    pass
+
+def _value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    return str(value).lower()
+
+def normalize_path(path):
+    # args[0].id -> args.0.id
+    return INDEX.sub(r".\1", path).strip(".")
+
+def tokenize(content):
+    """
+    Tokens de un contenido {"args": [...], "kwargs": {...}}: "ruta" por cada clave,
+    "ruta=valor" por cada hoja y "~palabra" por cada palabra de los textos. Pensado para
+    ejecutarse fuera de la GUI (en el hilo de recepción).
+    """
+    tokens = set()
+    stack = [("", content)]
+    while stack and len(tokens) < MAX_TOKENS:
+        path, value = stack.pop()
+        if isinstance(value, dict):
+            for key, item in value.items():
+                child = f"{path}.{key}" if path else str(key)
+                tokens.add(child)
+                stack.append((child, item))
+        elif isinstance(value, (list, tuple)):
+            for i, item in enumerate(value):
+                child = f"{path}.{i}" if path else str(i)
+                tokens.add(child)
+                stack.append((child, item))
+        else:
+            text = _value(value)
+            tokens.add(f"{path}={text}")
+            if isinstance(value, str):
+                tokens.update("~" + word for word in WORD.findall(text) if len(word) <= MAX_WORD)
+    return tokens
+
+def parse_time(text, today=None):
+    """
+    "12:00", "12:00:30" (hoy) o una fecha ISO ("2024-05-01 12:00") -> epoch.
+    """
+    today = today or datetime.date.today()
+    try:
+        if len(text) <= 8 and ":" in text:
+            parts = [int(p) for p in text.split(":")]
+            moment = datetime.datetime.combine(today, datetime.time(*parts))
+        else:
+            moment = datetime.datetime.fromisoformat(text)
+    except (TypeError, ValueError):
+        raise SearchError(f"Hora no válida: {text}") from None
+    return moment.timestamp()
+
+class HistoryIndex:
+    """
+    Índices incrementales por secuencia del historial:
+
+    - tiempo: horas en orden de llegada (no decrecientes), se busca por bisección;
+    - exacto: realm y topic -> secuencias, y el realm/topic de cada secuencia;
+    - invertido: token del contenido (ver tokenize) -> secuencias.
+
+    Las listas de secuencias son arrays ordenados; las secuencias que ya salieron del
+    historial se podan con prune() en bloque, de modo que la memoria sigue al historial.
+    Una ruta con más de `max_values` valores distintos pasa a `hashed`: ruta -> (hashes,
+    secuencias), dos arrays paralelos de 8 bytes por mensaje en lugar de una lista por valor.
+    """
+    def __init__(self, max_values=MAX_VALUES):
+        self.max_values = max_values
+        self.clear()
+
+    def clear(self):
+        self._first = 0  # secuencia de _times[0]
+        self._times = array("d")
+        self._realm_of = array("I")  # id del realm de cada secuencia
+        self._topic_of = array("I")
+        self._ids = {}  # nombre de realm/topic -> id
+        self.realms = {}
+        self.topics = {}
+        self.tokens = {}
+        self.hashed = {}  # ruta -> (array de hashes de ruta=valor, array de secuencias)
+        self._distinct = {}  # ruta -> valores distintos vistos (hasta clear())
+        self.first_live = 0  # primera secuencia que sigue en el historial
+
+    def __len__(self):
+        return len(self._times)
+
+    @property
+    def next_seq(self):
+        return self._first + len(self._times)
+
+    def _intern(self, name):
+        name_id = self._ids.get(name)
+        if name_id is None:
+            name_id = self._ids[name] = len(self._ids)
+        return name_id
+
+    def add(self, seq, timestamp, realm, topic, tokens):
+        if not self._times:
+            self._first = seq
+        elif seq != self.next_seq:
+            # Hueco (p. ej. tras vaciar el historial): se empieza de nuevo
+            self.clear()
+            self._first = seq
+        if self._times and timestamp < self._times[-1]:
+            timestamp = self._times[-1]
+        self._times.append(timestamp)
+        self._realm_of.append(self._intern(realm))
+        self._topic_of.append(self._intern(topic))
+        self.realms.setdefault(realm, array("Q")).append(seq)
+        self.topics.setdefault(topic, array("Q")).append(seq)
+        postings = self.tokens
+        hashed = self.hashed
+        for token in tokens:
+            posting = postings.get(token)
+            if posting is None:
+                path, sep, _ = token.partition("=")
+                if sep:
+                    columns = hashed.get(path)
+                    if columns is None:
+                        distinct = self._distinct[path] = self._distinct.get(path, 0) + 1
+                        if distinct > self.max_values:
+                            columns = self._to_hashes(path)
+                    if columns is not None:
+                        columns[0].append(hash(token))
+                        columns[1].append(seq)
+                        continue
+                posting = postings[token] = array("Q")
+            posting.append(seq)
+
+    def _to_hashes(self, path):
+        # Las listas por valor de la ruta se funden en los arrays paralelos, por secuencia
+        prefix = path + "="
+        rows = []
+        for token in [token for token in self.tokens if token.startswith(prefix)]:
+            token_hash = hash(token)
+            rows.extend((seq, token_hash) for seq in self.tokens.pop(token))
+        rows.sort()
+        columns = self.hashed[path] = (array("q", (h for _, h in rows)), array("Q", (seq for seq, _ in rows)))
+        return columns
+
+    def _hash_posting(self, path, token):
+        """
+        Secuencias (ascendentes) de los mensajes con ese ruta=valor en una ruta de `hashed`.
+        """
+        hashes, seqs = self.hashed[path]
+        token_hash = hash(token)
+        posting = array("Q")
+        find = hashes.index
+        i = 0
+        try:
+            while True:
+                i = find(token_hash, i)
+                posting.append(seqs[i])
+                i += 1
+        except ValueError:
+            return posting
+
+    def prune(self, first_live):
+        """
+        Marca como fuera del historial las secuencias < first_live. Las listas se
+        recortan cuando lo muerto supera a lo vivo (coste amortizado O(1) por mensaje).
+        """
+        self.first_live = max(self.first_live, first_live)
+        dead = self.first_live - self._first
+        if dead <= 0 or dead < len(self._times) - dead:
+            return
+        del self._times[:dead]
+        del self._realm_of[:dead]
+        del self._topic_of[:dead]
+        self._first = self.first_live
+        for table in (self.realms, self.topics, self.tokens):
+            for key in list(table):
+                posting = table[key]
+                cut = bisect.bisect_left(posting, self.first_live)
+                if cut == len(posting):
+                    del table[key]
+                elif cut:
+                    del posting[:cut]
+        for hashes, seqs in self.hashed.values():
+            cut = bisect.bisect_left(seqs, self.first_live)
+            del hashes[:cut]
+            del seqs[:cut]
+
+    def time_range(self, after=None, before=None):
+        """
+        Secuencias [lo, hi) recibidas en [after, before].
+        """
+        lo = self._first + (bisect.bisect_left(self._times, after) if after is not None else 0)
+        hi = self._first + (bisect.bisect_right(self._times, before) if before is not None else len(self._times))
+        return max(lo, self.first_live), hi
+
+    def _names(self, kind, pattern):
+        """
+        (ids, postings) de los realms/topics que cumplen el patrón: el nombre exacto y los
+        que cuelgan de él (topic:MsgAlerts incluye MsgAlerts.cpu); con * al final, por prefijo.
+        """
+        table = self.topics if kind == "topic" else self.realms
+        if pattern.endswith("*"):
+            prefix = pattern[:-1]
+            names = [name for name in table if name.startswith(prefix)]
+        else:
+            children = pattern + "."
+            names = [name for name in table if name == pattern or name.startswith(children)]
+        return {self._ids[name] for name in names}, [table[name] for name in names]
+
+    def search(self, query, limit=MAX_RESULTS, today=None):
+        """
+        Devuelve las secuencias (ascendentes) que cumplen la consulta, como mucho las
+        `limit` más recientes. Lanza SearchError si la consulta no es válida.
+        """
+        try:
+            terms = shlex.split(query)
+        except ValueError as e:
+            raise SearchError(f"Consulta no válida: {e}") from None
+        after = before = None
+        tokens = []  # postings de contenido: todos deben cumplirse
+        names = []  # (columna, ids, postings) de realm/topic
+        hashed = []  # postings ya resueltos de rutas en `hashed`
+        for term in terms:
+            key, sep, value = term.partition(":")
+            key = key.lower()
+            if sep and key in ("after", "before", "desde", "hasta"):
+                moment = parse_time(value, today)
+                if key in ("after", "desde"):
+                    after = moment
+                else:
+                    before = moment
+            elif sep and key in ("topic", "realm"):
+                ids, postings = self._names(key, value)
+                names.append((self._topic_of if key == "topic" else self._realm_of, ids, postings))
+            elif sep and value:
+                path = normalize_path(term[:len(term) - len(value) - 1])
+                if value != "*" and path in self.hashed:
+                    hashed.append(self._hash_posting(path, f"{path}={value.lower()}"))
+                else:
+                    tokens.append(path if value == "*" else f"{path}={value.lower()}")
+            else:
+                tokens.extend("~" + word for word in WORD.findall(term.lower()))
+        lo, hi = self.time_range(after, before)
+        if lo >= hi:
+            return []
+        postings = [_slice(posting, lo, hi) for posting in hashed]
+        for token in tokens:
+            posting = self.tokens.get(token)
+            if posting is None:
+                return []
+            postings.append(_slice(posting, lo, hi))
+        postings.sort(key=len)
+        # Se parte del conjunto más pequeño: una lista de tokens o la unión de un filtro de nombres
+        sized = [(sum(_count(p, lo, hi) for p in group[2]), i) for i, group in enumerate(names)]
+        smallest = min(sized) if sized else None
+        first = self._first
+        if not postings and len(names) == 1 and len(names[0][2]) == 1:
+            return list(_slice(names[0][2][0], lo, hi)[-limit:])
+        if not postings and smallest is not None and smallest[0] > limit:
+            # Solo realm/topic con muchas coincidencias: se recorre hacia atrás hasta tener `limit`
+            (column, ids, _), others = names[0], names[1:]
+            result = []
+            for seq in range(hi - 1, lo - 1, -1):
+                if column[seq - first] in ids and all(c[seq - first] in i for c, i, _ in others):
+                    result.append(seq)
+                    if len(result) == limit:
+                        break
+            return result[::-1]
+        if smallest is not None and (not postings or smallest[0] < len(postings[0])):
+            column, ids, group = names.pop(smallest[1])
+            result = array("Q", heapq.merge(*(_slice(p, lo, hi) for p in group)))
+        elif postings:
+            result = postings.pop(0)
+        else:
+            return list(range(max(lo, hi - limit), hi))
+        for other in postings:
+            if not result:
+                break
+            result = _intersect(result, other)
+        for column, ids, _ in names:
+            result = [seq for seq in result if column[seq - first] in ids]
+        return list(result[-limit:])
+
+def _count(posting, lo, hi):
+    return bisect.bisect_left(posting, hi) - bisect.bisect_left(posting, lo)
+
+def _slice(posting, lo, hi):
+    return posting[bisect.bisect_left(posting, lo):bisect.bisect_left(posting, hi)]
+
+def _intersect(shorter, other):
+    # Se recorre la lista más corta y se busca por bisección en la otra
+    find = bisect.bisect_left
+    n = len(other)
+    kept = array("Q")
+    for seq in shorter:
+        i = find(other, seq)
+        if i < n and other[i] == seq:
+            kept.append(seq)
+    return kept
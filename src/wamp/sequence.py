@@ -0,0 +1,207 @@
+# src/wamp/sequence.py
+"""
+Detección de pérdidas, duplicados y desorden en los mensajes recibidos a partir de un
+campo de secuencia del contenido (p. ej. kwargs.seq, generado con {{seq}} en la
+plantilla del publicador). Cada flujo (realm, topic, publicador) guarda la secuencia
+más alta vista y un bitmap circular de las últimas WINDOW secuencias: memoria fija por
+flujo y coste O(1) amortizado por mensaje, aunque la prueba dure horas.
+
+Los campos se escriben como en los filtros: kwargs.seq, kwargs.meta.seq, args[0].seq.
+La comprobación debe ver los mensajes antes de los filtros de suscripción (wamp.filters):
+si no, cada mensaje filtrado contaría como perdido (ver MultiTopicSubscriber.observe_callback).
+"""
+import re
+import threading
+
+# Secuencias recordadas por flujo (bits del bitmap)
+WINDOW = 4096
+# Flujos como mucho; los mensajes de flujos nuevos por encima se cuentan como no seguidos
+MAX_STREAMS = 10000
+
+_INDEX = re.compile(r"\[(\d+)\]")
+
+def compile_path(path):
+    """
+    "kwargs.a.b" / "args[0].seq" -> función(args, kwargs) que devuelve el valor o None.
+    """
+    parts = [p for p in _INDEX.sub(r".\1", path.strip()).split(".") if p]
+    if not parts or parts[0] not in ("args", "kwargs"):
+        raise ValueError(f"Campo no válido: {path!r} (debe empezar por args o kwargs)")
+    root, keys = parts[0], [int(p) if p.isdigit() else p for p in parts[1:]]
+
+    def get(args, kwargs):
+        value = args if root == "args" else kwargs
+        for key in keys:
+            if isinstance(value, dict):
+                # Las claves numéricas de JSON llegan como texto
+                value = value.get(str(key)) if str(key) in value else value.get(key)
+            elif isinstance(value, (list, tuple)) and isinstance(key, int) and key < len(value):
+                value = value[key]
+            else:
+                return None
+        return value
+    return get
+
+class SequenceStream:
+    """
+    Estado de un flujo. `missing` son las secuencias saltadas que aún no han llegado
+    (si llegan tarde dentro de la ventana se restan y cuentan como desordenadas);
+    `late` son las que llegan con más de WINDOW de retraso, sin poder distinguir si
+    son duplicadas o desordenadas. Volver a la primera secuencia del flujo (o a una
+    anterior) cuenta como reinicio del publicador, no como duplicado ni desorden.
+    """
+    __slots__ = ("window", "low", "high", "bits", "received", "missing", "duplicates", "reordered", "late", "restarts")
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.low = None  # primera secuencia del flujo desde el último reinicio
+        self.high = None
+        self.bits = bytearray((window + 7) // 8)
+        self.received = 0
+        self.missing = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.late = 0
+        self.restarts = 0
+
+    def _test(self, seq):
+        index = seq % self.window
+        return self.bits[index >> 3] & (1 << (index & 7))
+
+    def _set(self, seq):
+        index = seq % self.window
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def _clear(self, seq):
+        index = seq % self.window
+        self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def _reset(self, seq):
+        self.bits[:] = bytes(len(self.bits))
+        self.low = self.high = seq
+        self._set(seq)
+
+    def observe(self, seq):
+        """
+        Registra una secuencia y devuelve "ok", "gap", "duplicate", "reordered", "late" o "restart".
+        """
+        self.received += 1
+        if self.high is None:
+            self._reset(seq)
+            return "ok"
+        ahead = seq - self.high
+        if ahead > 0:
+            # Las posiciones que reutilizan las nuevas secuencias se liberan
+            if ahead >= self.window:
+                self.bits[:] = bytes(len(self.bits))
+            else:
+                for s in range(self.high + 1, seq):
+                    self._clear(s)
+            self._set(seq)
+            self.high = seq
+            if ahead > 1:
+                self.missing += ahead - 1
+                return "gap"
+            return "ok"
+        if seq < self.low or (seq == self.low and self.high > seq):
+            # Vuelve a la primera secuencia vista o por debajo: el publicador se reinició
+            # (si no, una prueba corta repetida contaría todo como duplicado)
+            self.restarts += 1
+            self._reset(seq)
+            return "restart"
+        if -ahead < self.window:
+            if self._test(seq):
+                self.duplicates += 1
+                return "duplicate"
+            self._set(seq)
+            self.reordered += 1
+            self.missing -= 1
+            return "reordered"
+        if seq < self.window:
+            # Cae a una secuencia pequeña tras más de WINDOW: también es un reinicio
+            self.restarts += 1
+            self._reset(seq)
+            return "restart"
+        self.late += 1
+        return "late"
+
+    def summary(self):
+        return {"received": self.received, "last_seq": self.high, "missing": self.missing,
+                "duplicates": self.duplicates, "reordered": self.reordered, "late": self.late,
+                "restarts": self.restarts}
+
+class SequenceChecker:
+    """
+    Comprobador opcional de secuencia para el camino de recepción. `field` es la ruta del
+    número de secuencia; `publisher_field`, opcional, la del identificador del publicador
+    (sin él, cada (realm, topic) es un único flujo).
+    """
+    def __init__(self, field="kwargs.seq", publisher_field=None, window=WINDOW, max_streams=MAX_STREAMS):
+        self.field = field
+        self.publisher_field = publisher_field or None
+        self._get_seq = compile_path(field)
+        self._get_publisher = compile_path(publisher_field) if publisher_field else None
+        self.window = window
+        self.max_streams = max_streams
+        self.streams = {}
+        self.without_seq = 0  # mensajes sin campo de secuencia entero
+        self.untracked = 0  # mensajes de flujos por encima de max_streams
+        self._lock = threading.Lock()
+
+    def _check(self, realm, topic, args, kwargs):
+        seq = self._get_seq(args, kwargs)
+        if isinstance(seq, bool) or not isinstance(seq, int):
+            self.without_seq += 1
+            return None
+        publisher = self._get_publisher(args, kwargs) if self._get_publisher else None
+        key = (realm, topic, str(publisher) if publisher is not None else "")
+        stream = self.streams.get(key)
+        if stream is None:
+            if len(self.streams) >= self.max_streams:
+                self.untracked += 1
+                return None
+            stream = self.streams[key] = SequenceStream(self.window)
+        return stream.observe(seq)
+
+    def check(self, realm, topic, args, kwargs):
+        with self._lock:
+            return self._check(realm, topic, args, kwargs)
+
+    def check_batch(self, batch):
+        """
+        Sink de wamp.receive.ReceivePipeline: lotes de (timestamp, realm, topic, contenido).
+        """
+        with self._lock:
+            for _, realm, topic, content in batch:
+                self._check(realm, topic, content["args"], content["kwargs"])
+
+    def totals(self):
+        with self._lock:
+            totals = {"streams": len(self.streams), "received": 0, "missing": 0, "duplicates": 0,
+                      "reordered": 0, "late": 0, "restarts": 0}
+            for stream in self.streams.values():
+                for key in ("received", "missing", "duplicates", "reordered", "late", "restarts"):
+                    totals[key] += getattr(stream, key)
+            totals["without_seq"] = self.without_seq
+            totals["untracked"] = self.untracked
+            return totals
+
+    def report(self):
+        """
+        Resumen por flujo, ordenado por (realm, topic, publicador).
+        """
+        with self._lock:
+            return [dict(realm=realm, topic=topic, publisher=publisher, **stream.summary())
+                    for (realm, topic, publisher), stream in sorted(self.streams.items())]
+
+    def summary(self):
+        t = self.totals()
+        text = (f"Secuencia ({self.field}): {t['received']} recibidos en {t['streams']} flujos, "
+                f"{t['missing']} perdidos, {t['duplicates']} duplicados, {t['reordered']} desordenados")
+        if t["late"]:
+            text += f", {t['late']} fuera de ventana"
+        if t["restarts"]:
+            text += f", {t['restarts']} reinicios"
+        if t["without_seq"]:
+            text += f", {t['without_seq']} sin secuencia"
+        return text
@@ -0,0 +1,127 @@
+# src/wamp/serializers.py
+"""
+Serializadores WAMP por realm. En los archivos de configuración de realms cada entrada
+puede llevar "serializers": ["msgpack", "json"] (en orden de preferencia); sin él se usa
+la negociación por defecto de autobahn. Las bibliotecas binarias son opcionales:
+msgpack, cbor2 y py-ubjson.
+"""
+import json
+import time
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+try:
+    import ubjson
+except ImportError:
+    ubjson = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+CBOR = "cbor"
+UBJSON = "ubjson"
+SERIALIZERS = (MSGPACK, CBOR, UBJSON, JSON)
+# Clase de autobahn.wamp.serializer para cada nombre
+AUTOBAHN_CLASSES = {
+    JSON: "JsonSerializer",
+    MSGPACK: "MsgPackSerializer",
+    CBOR: "CBORSerializer",
+    UBJSON: "UBJSONSerializer",
+}
+# Código WAMP del mensaje PUBLISH, usado para estimar el tamaño en el cable
+WAMP_PUBLISH = 16
+
+# Serializadores configurados por realm: realm -> lista de nombres (None = negociación por defecto)
+realm_serializers = {}
+
+def normalize_serializers(value):
+    """
+    Acepta una lista o un texto separado por comas y devuelve la lista de nombres
+    validada (o None si está vacía). Lanza ValueError con nombres desconocidos.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    names = []
+    for name in value:
+        name = str(name).strip().lower()
+        if not name:
+            continue
+        if name not in SERIALIZERS:
+            raise ValueError(f"Serializador desconocido: {name} (válidos: {', '.join(SERIALIZERS)})")
+        if name not in names:
+            names.append(name)
+    return names or None
+
+def set_realm_serializers(realm, value):
+    names = normalize_serializers(value)
+    if names:
+        realm_serializers[realm] = names
+    else:
+        realm_serializers.pop(realm, None)
+    return names
+
+def serializers_for(realm):
+    return realm_serializers.get(realm)
+
+def make_serializers(names):
+    """
+    Instancia los serializadores de autobahn para ApplicationRunner(serializers=...).
+    Devuelve None si no hay nombres (negociación por defecto).
+    """
+    if not names:
+        return None
+    from autobahn.wamp import serializer
+    instances = []
+    for name in names:
+        cls = getattr(serializer, AUTOBAHN_CLASSES[name], None)
+        if cls is None:
+            raise ValueError(f"El serializador {name} no está disponible (falta su biblioteca)")
+        instances.append(cls())
+    return instances
+
+def _codecs():
+    codecs = {JSON: (lambda obj: json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+                     lambda data: json.loads(data.decode("utf-8")))}
+    if msgpack is not None:
+        codecs[MSGPACK] = (lambda obj: msgpack.packb(obj, use_bin_type=True),
+                           lambda data: msgpack.unpackb(data, raw=False))
+    if cbor2 is not None:
+        codecs[CBOR] = (cbor2.dumps, cbor2.loads)
+    if ubjson is not None:
+        codecs[UBJSON] = (ubjson.dumpb, ubjson.loadb)
+    return codecs
+
+def compare_serializers(payload, topic="topic", repeat=200):
+    """
+    Mide, para el payload dado envuelto en un mensaje PUBLISH, el tamaño serializado y el
+    coste medio de codificar y decodificar con cada serializador disponible.
+    Devuelve una lista de dicts: name, available, size, encode_us, decode_us.
+    """
+    args, kwargs = ([], payload) if isinstance(payload, dict) else ([payload], {})
+    message = [WAMP_PUBLISH, 1, {}, topic, args, kwargs]
+    codecs = _codecs()
+    rows = []
+    for name in SERIALIZERS:
+        if name not in codecs:
+            rows.append({"name": name, "available": False, "size": None, "encode_us": None, "decode_us": None})
+            continue
+        encode, decode = codecs[name]
+        data = encode(message)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            encode(message)
+        encode_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(repeat):
+            decode(data)
+        decode_time = time.perf_counter() - start
+        rows.append({"name": name, "available": True, "size": len(data),
+                     "encode_us": encode_time / repeat * 1e6, "decode_us": decode_time / repeat * 1e6})
+    return rows
@@ -1,54 +1,330 @@
 # src/wamp/subscriber.py
 import asyncio
-import threading
-from autobahn.asyncio.wamp import ApplicationSession, ApplicationRunner
+import time
+from autobahn.asyncio.wamp import ApplicationSession
+from autobahn.wamp.types import SubscribeOptions
+from .loop import network_loop, open_session
+from .probe import latency_probe
+from .serializers import serializers_for
+from .topics import TopicTrie, parse_topic
 
-global_session_sub = None
+# Suscripciones en vuelo a la vez por sesión al unirse o aplicar cambios
+SUBSCRIBE_WINDOW = 32
+
+async def for_each_topic(action, topics, window=SUBSCRIBE_WINDOW):
+    """
+    Ejecuta action(topic) para todos los topics con como mucho `window` en vuelo, en
+    lugar de un viaje de ida y vuelta al router detrás de otro. Los fallos no detienen
+    al resto: se devuelven como {topic: excepción}.
+    """
+    semaphore = asyncio.Semaphore(max(1, window))
+    failures = {}
+
+    async def run(topic):
+        async with semaphore:
+            try:
+                await action(topic)
+            except Exception as e:
+                failures[topic] = e
+    await asyncio.gather(*(run(topic) for topic in topics))
+    return failures
 
 class MultiTopicSubscriber(ApplicationSession):
     def __init__(self, config):
         super().__init__(config)
         self.topics = []  # Se asigna mediante la factoría
         self.on_message_callback = None
+        # callback(realm, topic, args, kwargs) con todos los eventos, antes de los filtros
+        # (p. ej. wamp.sequence: lo filtrado no debe contar como perdido)
+        self.observe_callback = None
+        self.subscriptions = {}  # topic -> Subscription de autobahn
+        self.filters = {}  # topic -> SubscriptionFilter (wamp.filters), compartido con RealmSubscription
+        self.trie = TopicTrie()  # topics y patrones suscritos (wamp.topics)
+        self.join_time = None  # segundos desde el join hasta tener todos los topics suscritos
+        self.failures = {}  # topic -> error de la última suscripción fallida
 
     async def onJoin(self, details):
-        global global_session_sub
         realm_name = self.config.realm
-        print(f"Suscriptor conectado en realm: {realm_name}")
-        global_session_sub = self
-        for t in self.topics:
-            await self.subscribe(
-                lambda *args, topic=t, **kwargs: self.on_event(realm_name, topic, *args, **kwargs),
-                t
-            )
-
-    def on_event(self, realm, topic, *args, **kwargs):
-        message_data = {"args": args, "kwargs": kwargs}
-        if self.on_message_callback:
-            self.on_message_callback(realm, topic, message_data)
+        started = time.monotonic()
+        self.failures = await for_each_topic(self.add_topic, list(self.topics))
+        self.join_time = time.monotonic() - started
+        print(f"Suscriptor conectado en realm: {realm_name} "
+              f"({len(self.subscriptions)} topics en {self.join_time * 1000:.1f} ms)")
+        for topic, e in sorted(self.failures.items()):
+            print(f"Error al suscribirse a {topic} (realm: {realm_name}):", e)
+
+    async def add_topic(self, topic):
+        """
+        Suscribe un topic exacto o un patrón (MsgAlerts.*, app.*.estado; ver wamp.topics).
+        Los patrones usan match="prefix"/"wildcard" en el router: una sola suscripción
+        en lugar de una por topic.
+        """
+        if topic in self.subscriptions:
+            return
+        pattern = parse_topic(topic)
+        # Los exactos también van al trie: así un patrón que los cubre les cede el evento
+        self.trie.add(pattern)
+        try:
+            if pattern.is_exact:
+                self.subscriptions[topic] = await self.subscribe(self.handler(self.config.realm, topic), topic)
+            else:
+                self.subscriptions[topic] = await self.subscribe(
+                    self.pattern_handler(self.config.realm, topic), pattern.uri,
+                    options=SubscribeOptions(match=pattern.match, details=True))
+        except Exception:
+            self.trie.remove(topic)
+            raise
+
+    def handler(self, realm, topic):
+        """
+        Manejador de eventos del topic. Se ejecuta en el bucle de red por cada mensaje, así
+        que solo pasa las referencias a args/kwargs: el formato y el log van por lotes
+        (ver wamp.receive.ReceivePipeline). El filtro del topic, si lo hay, se evalúa aquí
+        para que lo descartado no llegue ni a la vista ni al log; la sonda de latencia y
+        observe_callback ven todos los eventos.
+        """
+        observe = latency_probe.observe
+        filters = self.filters
+
+        def on_event(*args, **kwargs):
+            if kwargs:
+                observe(realm, topic, kwargs)
+            precheck = self.observe_callback
+            if precheck is not None:
+                precheck(realm, topic, args, kwargs)
+            predicate = filters.get(topic)
+            if predicate is not None and not predicate(realm, topic, args, kwargs):
+                return
+            callback = self.on_message_callback
+            if callback is not None:
+                callback(realm, topic, args, kwargs)
+        return on_event
+
+    def pattern_handler(self, realm, pattern):
+        """
+        Manejador de una suscripción por patrón. El topic real llega en details.topic y
+        se resuelve en el trie: si otra suscripción más específica (un exacto o un prefijo
+        más largo) también lo cubre, el router entrega el evento a ambas y aquí se ignora.
+        Latencia, filtros y callback usan el topic real; el filtro es el del patrón salvo
+        que el topic real tenga uno propio.
+        """
+        observe = latency_probe.observe
+        filters = self.filters
+        best = self.trie.best
+
+        def on_event(*args, details=None, **kwargs):
+            topic = getattr(details, "topic", None) or pattern
+            if best(topic) not in (pattern, None):
+                return
+            if kwargs:
+                observe(realm, topic, kwargs)
+            precheck = self.observe_callback
+            if precheck is not None:
+                precheck(realm, topic, args, kwargs)
+            predicate = filters.get(topic) or filters.get(pattern)
+            if predicate is not None and not predicate(realm, topic, args, kwargs):
+                return
+            callback = self.on_message_callback
+            if callback is not None:
+                callback(realm, topic, args, kwargs)
+        return on_event
+
+    async def remove_topic(self, topic):
+        self.trie.remove(topic)
+        subscription = self.subscriptions.pop(topic, None)
+        if subscription is not None and subscription.active:
+            await subscription.unsubscribe()
 
     @classmethod
-    def factory(cls, topics, on_message_callback):
+    def factory(cls, topics, on_message_callback, filters=None, observe_callback=None):
         def create_session(config):
             session = cls(config)
             session.topics = topics
             session.on_message_callback = on_message_callback
+            session.observe_callback = observe_callback
+            if filters is not None:
+                session.filters = filters
             return session
         return create_session
 
-def start_subscriber(url, realm, topics, on_message_callback):
-    global global_session_sub
-    if global_session_sub is not None:
+class RealmSubscription:
+    """
+    Sesión de suscriptor de un (router_url, realm). `topics` es la selección deseada;
+    sync() conecta si hace falta y aplica la diferencia con lo suscrito en el router
+    (suscribe los topics nuevos y cancela los retirados) sin reconectar.
+    """
+    def __init__(self, router_url, realm, callback, observe_callback=None):
+        self.router_url = router_url
+        self.realm = realm
+        self.callback = callback
+        self.observe_callback = observe_callback
+        self.topics = set()
+        self.filters = {}
+        self.session = None
+        self.serializers = serializers_for(realm)
+        self.join_time = None  # última conexión + suscripción completa, en segundos
+        self.sync_time = None  # última aplicación de cambios, en segundos
+        self.failures = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def key(self):
+        return (self.router_url, self.realm)
+
+    @property
+    def subscribed(self):
+        return set(self.session.subscriptions) if self.session is not None else set()
+
+    def set_filters(self, filters):
+        # Se cambia el contenido del dict, que la sesión comparte: sin resuscribir
+        self.filters.clear()
+        self.filters.update(filters or {})
+
+    def set_callback(self, callback, observe_callback=None):
+        # Los callbacks se pueden cambiar sin recrear la sesión
+        self.callback = callback
+        self.observe_callback = observe_callback
+        if self.session is not None:
+            self.session.on_message_callback = callback
+            self.session.observe_callback = observe_callback
+
+    async def sync(self):
+        async with self._lock:
+            started = time.monotonic()
+            connected = False
+            if self.session is None or not self.session.is_attached():
+                if not self.topics:
+                    return
+                self.session = await open_session(
+                    self.router_url, self.realm, MultiTopicSubscriber.factory([], self.callback, self.filters, self.observe_callback),
+                    self.serializers)
+                connected = True
+            current = set(self.session.subscriptions)
+            added, removed = self.topics - current, current - self.topics
+            failed = await for_each_topic(self.session.remove_topic, sorted(removed))
+            for topic, e in sorted(failed.items()):
+                print(f"Error al cancelar la suscripción a {topic} (realm: {self.realm}):", e)
+            self.failures = await for_each_topic(self.session.add_topic, sorted(added))
+            for topic, e in sorted(self.failures.items()):
+                print(f"Error al suscribirse a {topic} (realm: {self.realm}):", e)
+            self.sync_time = time.monotonic() - started
+            if connected:
+                self.join_time = self.sync_time
+            if added or removed:
+                print(f"Suscripciones en realm {self.realm}: +{len(added)} -{len(removed)} "
+                      f"({len(self.session.subscriptions)} activas, {self.sync_time * 1000:.1f} ms)")
+
+    def join_stats(self):
+        def ms(value):
+            return round(value * 1000, 3) if value is not None else None
+        return {"join_ms": ms(self.join_time), "sync_ms": ms(self.sync_time), "subscribed": len(self.subscribed),
+                "failed": {topic: str(e) for topic, e in sorted(self.failures.items())}}
+
+    async def close(self):
+        self.topics = set()
+        async with self._lock:
+            session, self.session = self.session, None
+            if session is not None and session.is_attached():
+                await session.leave()
+
+class SubscriberManager:
+    """
+    Mantiene una sesión de suscriptor por (router_url, realm). Los cambios de selección
+    se aplican como diferencia: los realms nuevos se conectan, los retirados se cierran
+    y en los demás solo se suscriben/cancelan los topics que cambian.
+    Los métodos se ejecutan en el hilo de red; desde la GUI se usan las funciones del módulo.
+    """
+    def __init__(self):
+        self._realms = {}
+
+    def update(self, router_url, realm, topics, callback, filters=None, observe_callback=None):
+        """
+        Fija los topics de un (router_url, realm), sus filtros ({topic: SubscriptionFilter})
+        y el callback previo a los filtros, y devuelve la tarea que los aplica.
+        """
+        key = (router_url, realm)
+        entry = self._realms.get(key)
+        if entry is not None and entry.serializers != serializers_for(realm):
+            # Cambió el serializador configurado para el realm: se reconecta
+            asyncio.ensure_future(entry.close())
+            entry = None
+        if entry is None:
+            entry = self._realms[key] = RealmSubscription(router_url, realm, callback)
+        entry.set_callback(callback, observe_callback)
+        entry.set_filters(filters)
+        entry.topics = set(topics)
+        if not entry.topics:
+            del self._realms[key]
+            return asyncio.ensure_future(entry.close())
+        return asyncio.ensure_future(self._sync(entry))
+
+    async def _sync(self, entry):
         try:
-            global_session_sub.leave()
-            print("Sesión previa cerrada.")
+            await entry.sync()
         except Exception as e:
-            print("Error al cerrar la sesión previa:", e)
-        global_session_sub = None
-
-    def run():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        runner = ApplicationRunner(url=url, realm=realm)
-        runner.run(MultiTopicSubscriber.factory(topics, on_message_callback))
-    threading.Thread(target=run, daemon=True).start()
+            print(f"Error al conectar el suscriptor ({entry.realm} @ {entry.router_url}):", e)
+
+    async def apply(self, selection, callback, filters=None, observe_callback=None):
+        """
+        selection: {(router_url, realm): topics}; filters: {(router_url, realm): {topic: filtro}}.
+        Los realms ausentes se cierran.
+        """
+        filters = filters or {}
+        tasks = [self.update(url, realm, [], callback) for url, realm in list(self._realms) if (url, realm) not in selection]
+        tasks += [self.update(url, realm, topics, callback, filters.get((url, realm)), observe_callback)
+                  for (url, realm), topics in selection.items()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return self.status()
+
+    def status(self):
+        return {key: sorted(entry.subscribed) for key, entry in self._realms.items()}
+
+    def join_stats(self):
+        return {key: entry.join_stats() for key, entry in self._realms.items()}
+
+    def filter_stats(self):
+        return {(url, realm, topic): f for (url, realm), entry in self._realms.items()
+                for topic, f in entry.filters.items()}
+
+    async def close_all(self):
+        entries = list(self._realms.values())
+        self._realms.clear()
+        await asyncio.gather(*(entry.close() for entry in entries), return_exceptions=True)
+
+subscriber_manager = SubscriberManager()
+network_loop.add_shutdown_hook(subscriber_manager.close_all)
+
+def start_subscriber(url, realm, topics, on_message_callback):
+    """
+    Suscribe (url, realm) exactamente a `topics`, reutilizando su sesión si ya existe.
+    Las sesiones de otros realms no se tocan. on_message_callback(realm, topic, args, kwargs)
+    se llama en el hilo de red por cada evento: debe ser rápido (ver wamp.receive).
+    """
+    network_loop.call_soon(subscriber_manager.update, url, realm, list(topics), on_message_callback)
+
+def update_subscriptions(selection, on_message_callback, filters=None, observe_callback=None):
+    """
+    Aplica una selección completa {(router_url, realm): topics}: conecta los realms
+    nuevos, cierra los que ya no están y ajusta los topics del resto. `filters` da los
+    filtros compilados (wamp.filters) por (router_url, realm) y topic; observe_callback,
+    opcional, recibe también los eventos que los filtros descartan. Devuelve un
+    concurrent.futures.Future con los topics suscritos por (router_url, realm).
+    """
+    selection = {key: list(topics) for key, topics in selection.items()}
+    return network_loop.submit(subscriber_manager.apply(selection, on_message_callback, filters, observe_callback))
+
+def stop_subscriber(url, realm):
+    network_loop.call_soon(subscriber_manager.update, url, realm, [], None)
+
+def filter_stats():
+    """
+    Filtros activos por (router_url, realm, topic) con sus contadores matched/rejected.
+    """
+    return subscriber_manager.filter_stats()
+
+def join_stats():
+    """
+    Por (router_url, realm): join_ms (conexión + suscripción de todos los topics),
+    sync_ms (último cambio aplicado), topics suscritos y fallos por topic.
+    """
+    return subscriber_manager.join_stats()
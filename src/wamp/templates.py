@@ -0,0 +1,278 @@
+# src/wamp/templates.py
+"""
+Plantillas de payload con marcadores por mensaje, p. ej.:
+
+    {"id": {{seq}}, "ts": "{{now_iso}}", "ref": "msg-{{uuid}}", "nivel": {{rand_int(0, 100)}},
+     "estado": {{choice(["OK", "ALARM"])}}}
+
+Un string que es exactamente un marcador toma el tipo del valor generado (número, string...);
+si el marcador va dentro de un texto, se interpola como string. Dentro de strings JSON los
+argumentos deben usar comillas simples: "{{choice(['a', 'b'])}}". Las claves no admiten marcadores.
+
+La plantilla se compila una vez: el JSON compacto se parte en segmentos literales ya
+codificados y huecos variables, de modo que cada mensaje solo genera los huecos.
+"""
+import ast
+import datetime
+import itertools
+import json
+import random
+import re
+import time
+import uuid
+from .payload import Payload
+
+MARKER_RE = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+CALL_RE = re.compile(r"^([A-Za-z_]\w*)\s*(?:\((.*)\))?$", re.S)
+# Carácter de uso privado para marcar los huecos en el JSON compacto
+SENTINEL = "\ue000"
+SLOT_RE = re.compile('"' + SENTINEL + r"(\d+)" + SENTINEL + '"')
+
+def _now_iso(seq):
+    return datetime.datetime.now().isoformat(timespec="milliseconds")
+
+def _now_ms(seq):
+    return int(time.time() * 1000)
+
+def _uuid(seq):
+    return str(uuid.uuid4())
+
+# Marcadores sin argumentos: nombre -> función(seq)
+SIMPLE_MARKERS = {
+    "seq": lambda seq: seq,
+    "now_iso": _now_iso,
+    "now_ms": _now_ms,
+    "uuid": _uuid,
+}
+
+def _rand_int(low, high):
+    low, high = int(low), int(high)
+    return lambda seq: random.randint(low, high)
+
+def _rand_float(low, high):
+    low, high = float(low), float(high)
+    return lambda seq: random.uniform(low, high)
+
+def _choice(options):
+    options = list(options)
+    if not options:
+        raise ValueError("choice() necesita al menos una opción")
+    return lambda seq: random.choice(options)
+
+# Marcadores con argumentos: nombre -> fábrica(*args) de función(seq)
+CALL_MARKERS = {
+    "rand_int": _rand_int,
+    "rand_float": _rand_float,
+    "choice": _choice,
+}
+
+def compile_marker(expr):
+    """
+    Convierte el texto de un marcador ("seq", "rand_int(0,100)"...) en una función(seq).
+    """
+    match = CALL_RE.match(expr)
+    if not match:
+        raise ValueError(f"Marcador inválido: {{{{{expr}}}}}")
+    name, args_text = match.group(1), match.group(2)
+    if args_text is None:
+        if name not in SIMPLE_MARKERS:
+            raise ValueError(f"Marcador desconocido: {{{{{expr}}}}}")
+        return SIMPLE_MARKERS[name]
+    if name not in CALL_MARKERS:
+        raise ValueError(f"Marcador desconocido: {{{{{expr}}}}}")
+    try:
+        args = ast.literal_eval(f"({args_text},)") if args_text.strip() else ()
+    except (ValueError, SyntaxError) as e:
+        raise ValueError(f"Argumentos inválidos en {{{{{expr}}}}}: {e}")
+    return CALL_MARKERS[name](*args)
+
+def quote_bare_markers(text):
+    """
+    Entrecomilla los marcadores escritos fuera de strings JSON ({"n": {{seq}}})
+    para que el texto sea JSON válido.
+    """
+    out = []
+    i, n = 0, len(text)
+    in_string = False
+    while i < n:
+        ch = text[i]
+        if in_string:
+            out.append(ch)
+            if ch == "\\" and i + 1 < n:
+                out.append(text[i + 1])
+                i += 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif text.startswith("{{", i):
+            end = text.find("}}", i + 2)
+            if end < 0:
+                raise ValueError("Marcador sin cerrar: falta '}}'")
+            out.append(json.dumps(text[i:end + 2], ensure_ascii=False))
+            i = end + 1
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+class _Slot:
+    """
+    Hueco variable: un string que contiene marcadores.
+    """
+    __slots__ = ("parts", "typed")
+
+    def __init__(self, text):
+        self.parts = []
+        pos = 0
+        for match in MARKER_RE.finditer(text):
+            if match.start() > pos:
+                self.parts.append(text[pos:match.start()])
+            self.parts.append(compile_marker(match.group(1)))
+            pos = match.end()
+        if pos < len(text):
+            self.parts.append(text[pos:])
+        # Un string que es solo un marcador conserva el tipo del valor generado
+        self.typed = len(self.parts) == 1 and callable(self.parts[0])
+
+    def value(self, seq):
+        if self.typed:
+            return self.parts[0](seq)
+        return "".join(p if isinstance(p, str) else str(p(seq)) for p in self.parts)
+
+def _encode(value):
+    if value.__class__ is int:
+        return str(value)
+    return json.dumps(value, ensure_ascii=False)
+
+class CompiledTemplate:
+    """
+    Payload compilado. render() devuelve el objeto para publicar (copiando solo los
+    contenedores que llevan huecos) y render_bytes() el JSON compacto ya serializado.
+    """
+    def __init__(self, source_obj):
+        self.source_obj = source_obj
+        self._slots = []
+        self._seq = itertools.count(1)
+        skeleton = self._extract(source_obj, ())
+        self._patch = self._build_patch()
+        compact = json.dumps(skeleton, ensure_ascii=False, separators=(",", ":"))
+        pieces = SLOT_RE.split(compact)
+        # pieces alterna literal, índice de hueco, literal, ...
+        self._literals = [p.encode("utf-8") for p in pieces[0::2]]
+        self._order = [int(i) for i in pieces[1::2]]
+        self._static_bytes = compact.encode("utf-8") if not self._slots else None
+
+    @property
+    def is_static(self):
+        return not self._slots
+
+    @property
+    def value(self):
+        """
+        Objeto estático (solo válido si is_static).
+        """
+        return self.source_obj
+
+    def _extract(self, node, path):
+        if isinstance(node, dict):
+            return {k: self._extract(v, path + (k,)) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self._extract(v, path + (i,)) for i, v in enumerate(node)]
+        if isinstance(node, str) and MARKER_RE.search(node):
+            index = len(self._slots)
+            self._slots.append((path, _Slot(node)))
+            return f"{SENTINEL}{index}{SENTINEL}"
+        return node
+
+    def _build_patch(self):
+        patch = {}
+        for index, (path, _) in enumerate(self._slots):
+            if not path:
+                return index
+            node = patch
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = index
+        return patch
+
+    def next_seq(self):
+        return next(self._seq)
+
+    def _values(self, seq):
+        return [slot.value(seq) for _, slot in self._slots]
+
+    def _apply(self, node, patch, values):
+        copy = dict(node) if isinstance(node, dict) else list(node)
+        for key, sub in patch.items():
+            copy[key] = values[sub] if isinstance(sub, int) else self._apply(node[key], sub, values)
+        return copy
+
+    def _object(self, values):
+        if not self._slots:
+            return self.source_obj
+        if isinstance(self._patch, int):
+            return values[self._patch]
+        return self._apply(self.source_obj, self._patch, values)
+
+    def _bytes(self, values):
+        if self._static_bytes is not None:
+            return self._static_bytes
+        literals = self._literals
+        out = [literals[0]]
+        for n, index in enumerate(self._order):
+            out.append(_encode(values[index]).encode("utf-8"))
+            out.append(literals[n + 1])
+        return b"".join(out)
+
+    def render(self, seq=None):
+        return self._object(self._values(self.next_seq() if seq is None else seq))
+
+    def render_bytes(self, seq=None):
+        return self._bytes(self._values(self.next_seq() if seq is None else seq))
+
+    def render_pair(self, seq=None):
+        """
+        Objeto y bytes del mismo mensaje (mismos valores aleatorios en ambos).
+        """
+        values = self._values(self.next_seq() if seq is None else seq)
+        return self._object(values), self._bytes(values)
+
+    def __call__(self, seq=None):
+        return self.render(seq)
+
+def compile_payload(source):
+    """
+    Compila el texto del editor (o un objeto ya cargado de un proyecto) en una CompiledTemplate.
+    Lanza ValueError si el JSON o algún marcador no son válidos.
+    """
+    if isinstance(source, str):
+        try:
+            source = json.loads(quote_bare_markers(source))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {e}")
+    return CompiledTemplate(source)
+
+def load_payload(source):
+    """
+    Como compile_payload(), pero si no hay marcadores devuelve un Payload que reutiliza
+    el JSON compacto ya generado al compilar.
+    """
+    template = compile_payload(source)
+    if template.is_static:
+        return Payload(template.value, data=template.render_bytes(0))
+    return template
+
+def as_payload(message):
+    """
+    Payload listo para publicar: genera la plantilla o envuelve el objeto tal cual. De una
+    plantilla se toman objeto y bytes del mismo render_pair(): el JSON compacto no se vuelve
+    a serializar.
+    """
+    if isinstance(message, Payload):
+        return message
+    if isinstance(message, CompiledTemplate):
+        obj, data = message.render_pair()
+        return Payload(obj, data=data)
+    return Payload(message)
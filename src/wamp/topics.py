@@ -0,0 +1,159 @@
+# src/wamp/topics.py
+"""
+Patrones de topic para el suscriptor:
+
+    MsgAlerts.*        prefijo   -> match="prefix", uri "MsgAlerts."
+    app.*.estado       comodín   -> match="wildcard", uri "app..estado" (un componente cualquiera)
+    app.sensor.1       exacto
+
+El router entrega el topic real en details.topic; TopicTrie lo resuelve localmente al
+patrón más específico que lo cubre, para que estadísticas y filtros sigan siendo por
+topic y un evento cubierto por varias suscripciones solo se procese una vez.
+"""
+EXACT = "exact"
+PREFIX = "prefix"
+WILDCARD = "wildcard"
+# Máximo de topics reales resueltos que se guardan en caché
+CACHE_SIZE = 10000
+
+class TopicPattern:
+    __slots__ = ("pattern", "uri", "match", "components")
+
+    def __init__(self, pattern, uri, match, components):
+        self.pattern = pattern
+        self.uri = uri
+        self.match = match
+        self.components = components
+
+    @property
+    def is_exact(self):
+        return self.match == EXACT
+
+    def __repr__(self):
+        return f"TopicPattern({self.pattern!r}, match={self.match})"
+
+def parse_topic(pattern):
+    """
+    Interpreta un topic de la GUI/proyecto. Lanza ValueError si el patrón no es válido.
+    """
+    pattern = pattern.strip()
+    if not pattern:
+        raise ValueError("Topic vacío")
+    components = pattern.split(".")
+    if components[-1] == "*" and "*" not in components[:-1] and "" not in components[:-1]:
+        if len(components) == 1:
+            raise ValueError("El prefijo '*' suscribiría a todos los topics")
+        prefix = components[:-1]
+        return TopicPattern(pattern, ".".join(prefix) + ".", PREFIX, tuple(prefix))
+    if "*" in components or "" in components:
+        if any("*" in c and c != "*" for c in components):
+            raise ValueError(f"Comodín inválido en {pattern}: use '*' como componente completo")
+        parts = tuple("" if c == "*" else c for c in components)
+        return TopicPattern(pattern, ".".join(parts), WILDCARD, parts)
+    if "*" in pattern:
+        raise ValueError(f"Comodín inválido en {pattern}")
+    return TopicPattern(pattern, pattern, EXACT, tuple(components))
+
+def split_topics(text):
+    """
+    "MsgEP, MsgCrEnt" -> ["MsgEP", "MsgCrEnt"]: topics de publicación separados por comas,
+    sin vacíos ni repetidos y en el orden escrito.
+    """
+    topics = []
+    for topic in (text or "").split(","):
+        topic = topic.strip()
+        if topic and topic not in topics:
+            topics.append(topic)
+    return topics
+
+class _Node:
+    __slots__ = ("children", "exact", "prefix", "wildcard")
+
+    def __init__(self):
+        self.children = {}
+        self.exact = None
+        self.prefix = None
+        self.wildcard = None
+
+class TopicTrie:
+    """
+    Trie por componentes de los patrones suscritos. best(topic) devuelve el patrón
+    (texto) más específico que cubre el topic: exacto, luego el prefijo más largo,
+    luego comodín; None si ninguno. Los resultados se guardan en caché.
+    """
+    def __init__(self):
+        self._root = _Node()
+        self._patterns = {}
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def __contains__(self, pattern):
+        return pattern in self._patterns
+
+    def add(self, pattern):
+        parsed = pattern if isinstance(pattern, TopicPattern) else parse_topic(pattern)
+        node = self._root
+        for component in parsed.components:
+            node = node.children.setdefault(component, _Node())
+        setattr(node, parsed.match, parsed.pattern)
+        self._patterns[parsed.pattern] = parsed
+        self._cache.clear()
+        return parsed
+
+    def remove(self, pattern):
+        parsed = self._patterns.pop(pattern, None)
+        if parsed is None:
+            return
+        node = self._root
+        for component in parsed.components:
+            node = node.children[component]
+        setattr(node, parsed.match, None)
+        self._cache.clear()
+
+    def best(self, topic):
+        try:
+            return self._cache[topic]
+        except KeyError:
+            pass
+        result = self._resolve(topic.split("."))
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[topic] = result
+        return result
+
+    def _resolve(self, components):
+        # Exacto
+        node = self._root
+        for component in components:
+            node = node.children.get(component)
+            if node is None:
+                break
+        else:
+            if node.exact is not None:
+                return node.exact
+        # Prefijo más largo (debe quedar al menos un componente tras el prefijo)
+        best_prefix = None
+        node = self._root
+        for component in components[:-1]:
+            node = node.children.get(component)
+            if node is None:
+                break
+            if node.prefix is not None:
+                best_prefix = node.prefix
+        if best_prefix is not None:
+            return best_prefix
+        # Comodín: mismo número de componentes, "" acepta cualquiera
+        return self._wildcard(self._root, components, 0)
+
+    def _wildcard(self, node, components, index):
+        if index == len(components):
+            return node.wildcard
+        for key in (components[index], ""):
+            child = node.children.get(key)
+            if child is not None:
+                found = self._wildcard(child, components, index + 1)
+                if found is not None:
+                    return found
+        return None
@@ -0,0 +1,124 @@
+# src/wamp/traffic.py
+import math
+import threading
+import time
+from .probe import LatencyHistogram
+
+# Constante de tiempo (segundos) de las medias móviles exponenciales de tasa
+EWMA_TAU = 10.0
+
+class TopicTraffic:
+    """
+    Contadores de tráfico de un (realm, topic). record() es O(1): suma contadores,
+    actualiza mínimo/máximo y registra el intervalo entre llegadas en un histograma
+    logarítmico. Las tasas se calculan al tomar una instantánea.
+    """
+    __slots__ = ("count", "bytes", "min_size", "max_size", "last", "gaps",
+                 "_prev_count", "_prev_bytes", "_prev_time", "rate", "byte_rate", "ewma_rate", "ewma_byte_rate")
+
+    def __init__(self, now):
+        self.count = 0
+        self.bytes = 0
+        self.min_size = None
+        self.max_size = None
+        self.last = None
+        self.gaps = LatencyHistogram()
+        self._prev_count = 0
+        self._prev_bytes = 0
+        self._prev_time = now
+        self.rate = 0.0
+        self.byte_rate = 0.0
+        self.ewma_rate = None
+        self.ewma_byte_rate = None
+
+    def record(self, size, now):
+        self.count += 1
+        self.bytes += size
+        if self.min_size is None or size < self.min_size:
+            self.min_size = size
+        if self.max_size is None or size > self.max_size:
+            self.max_size = size
+        if self.last is not None:
+            self.gaps.record(max(0.0, now - self.last))
+        self.last = now
+
+    def tick(self, now):
+        """
+        Tasa instantánea desde la instantánea anterior y su media móvil exponencial.
+        """
+        elapsed = now - self._prev_time
+        if elapsed <= 0:
+            return
+        self.rate = (self.count - self._prev_count) / elapsed
+        self.byte_rate = (self.bytes - self._prev_bytes) / elapsed
+        if self.ewma_rate is None:
+            self.ewma_rate, self.ewma_byte_rate = self.rate, self.byte_rate
+        else:
+            alpha = 1.0 - math.exp(-elapsed / EWMA_TAU)
+            self.ewma_rate += alpha * (self.rate - self.ewma_rate)
+            self.ewma_byte_rate += alpha * (self.byte_rate - self.ewma_byte_rate)
+        self._prev_count, self._prev_bytes, self._prev_time = self.count, self.bytes, now
+
+    def summary(self):
+        return {
+            "count": self.count, "bytes": self.bytes,
+            "rate": self.rate, "ewma_rate": self.ewma_rate or 0.0,
+            "byte_rate": self.byte_rate, "ewma_byte_rate": self.ewma_byte_rate or 0.0,
+            "min_size": self.min_size, "avg_size": self.bytes / self.count if self.count else None,
+            "max_size": self.max_size,
+            "gap_p50": self.gaps.percentile(50), "gap_p99": self.gaps.percentile(99),
+            "gap_max": self.gaps.max / 1e6 if self.gaps.max is not None else None,
+        }
+
+class TrafficStats:
+    """
+    Tráfico por (realm, topic) de un sentido (recibido o publicado). record() se llama
+    desde el camino de envío/recepción; snapshot() desde la GUI a baja frecuencia.
+    `clock` da la escala de los timestamps que se pasen (por defecto, time.monotonic).
+    """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._topics = {}
+        self._lock = threading.Lock()
+
+    def record(self, realm, topic, size, now=None):
+        now = self.clock() if now is None else now
+        key = (realm, topic)
+        with self._lock:
+            traffic = self._topics.get(key)
+            if traffic is None:
+                traffic = self._topics[key] = TopicTraffic(now)
+            traffic.record(size, now)
+
+    def record_many(self, rows):
+        """
+        Registra un lote de (timestamp, realm, topic, tamaño) tomando el lock una vez.
+        Los timestamps deben estar en la escala de `clock`.
+        """
+        with self._lock:
+            topics = self._topics
+            for timestamp, realm, topic, size in rows:
+                traffic = topics.get((realm, topic))
+                if traffic is None:
+                    traffic = topics[(realm, topic)] = TopicTraffic(timestamp)
+                traffic.record(size, timestamp)
+
+    def snapshot(self, now=None):
+        """
+        Actualiza las tasas y devuelve el resumen por (realm, topic).
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            result = {}
+            for key, traffic in self._topics.items():
+                traffic.tick(now)
+                result[key] = traffic.summary()
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._topics = {}
+
+# Lo recibido llega con timestamps de reloj de pared (ver wamp.receive)
+received_traffic = TrafficStats(clock=time.time)
+published_traffic = TrafficStats()
@@ -0,0 +1,208 @@
+# src/wamp/workers.py
+"""
+Modo de carga multiproceso: N procesos abren sus propias sesiones para los mismos
+(router_url, realm, topic), se reparten la tasa objetivo y envían sus contadores
+(enviados, ack, errores, histograma de latencia de ack) al proceso principal por un Pipe.
+Así la serialización y el framing WebSocket no quedan limitados por el GIL de un solo proceso.
+"""
+import asyncio
+import concurrent.futures
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import time
+from .load import LoadProfile, LoadStats
+from .probe import latency_probe
+from .serializers import realm_serializers, set_realm_serializers
+
+# Máximo de procesos: uno por núcleo
+MAX_WORKERS = os.cpu_count() or 1
+# Segundos entre envíos de contadores de cada proceso al principal
+REPORT_INTERVAL = 0.5
+
+def split_profile(profile, workers):
+    """
+    Reparte un perfil de carga entre `workers` procesos: misma duración y rampa,
+    tasa y número de mensajes divididos. Devuelve la lista de perfiles (puede ser
+    más corta que `workers` si hay menos mensajes que procesos).
+    """
+    workers = max(1, min(int(workers), MAX_WORKERS))
+    if profile.count is not None:
+        workers = min(workers, profile.count)
+    profiles = []
+    for i in range(workers):
+        count = None
+        if profile.count is not None:
+            count = profile.count // workers + (1 if i < profile.count % workers else 0)
+        profiles.append(LoadProfile(profile.rate / workers, duration=profile.duration, count=count,
+                                    ramp_up=profile.ramp_up, ramp=profile.ramp,
+                                    burst=max(1, profile.burst // workers)))
+    return profiles
+
+def _parts(stats):
+    return {target: s.to_dict() for target, s in stats.items()}
+
+async def _report(index, conn, stats):
+    while True:
+        await asyncio.sleep(REPORT_INTERVAL)
+        conn.send(("stats", index, _parts(stats), None))
+
+async def _worker(index, targets, content, profile, acknowledge, stop_event, conn, stats):
+    # Importación diferida: solo la necesita el proceso hijo
+    from .publisher import PooledSession
+    from .templates import load_payload
+    message = load_payload(content)
+    message = getattr(message, "obj", message)
+    sessions = {}
+    tasks = []
+    for target in targets:
+        router_url, realm, topic = target
+        pooled = sessions.get((router_url, realm))
+        if pooled is None:
+            pooled = sessions[(router_url, realm)] = PooledSession(router_url, realm)
+        stats[target] = LoadStats(profile)
+        tasks.append(asyncio.ensure_future(
+            pooled.run_load(topic, message, profile, stats[target], acknowledge, stop_event.is_set)))
+    reporter = asyncio.ensure_future(_report(index, conn, stats))
+    try:
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        reporter.cancel()
+        for pooled in sessions.values():
+            await pooled.close()
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+def _worker_main(index, targets, content, profile_config, acknowledge, serializers, probe, stop_event, conn):
+    """
+    Punto de entrada de cada proceso de carga.
+    """
+    latency_probe.enabled = probe
+    for realm, names in serializers.items():
+        set_realm_serializers(realm, names)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    stats = {}
+    error = None
+    try:
+        profile = LoadProfile.from_config(profile_config)
+        loop.run_until_complete(_worker(index, targets, content, profile, acknowledge, stop_event, conn, stats))
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    finally:
+        conn.send(("done", index, _parts(stats), error))
+        conn.close()
+        loop.close()
+
+class WorkerLoadRun:
+    """
+    Carga repartida entre varios procesos. Ofrece la misma interfaz que LoadRun
+    (stats, stop(), done(), future) con los contadores ya sumados; target_stats
+    los da por (router_url, realm, topic). Un hilo lector los actualiza en vivo.
+    El constructor no bloquea: arrancar procesos "spawn" tarda, así que se crean en el
+    hilo lector y no en el de quien llama (la GUI o el bucle de red).
+    """
+    def __init__(self, targets, content, profile, workers, acknowledge=False):
+        self.targets = [tuple(t) for t in targets]
+        self.topic = ", ".join(topic for _, _, topic in self.targets)
+        self.profile = profile
+        self.stats = LoadStats(profile)
+        self.target_stats = {target: LoadStats(profile) for target in self.targets}
+        self.future = concurrent.futures.Future()
+        self.errors = []
+        self._parts = {}
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._processes = []
+        parts = split_profile(profile, workers)
+        self.workers = len(parts)
+        self._reader = threading.Thread(target=self._run, args=(content, parts, acknowledge),
+                                        name="wamp-carga-lector", daemon=True)
+        self._reader.start()
+
+    def _spawn(self, content, parts, acknowledge):
+        conns = {}
+        for index, part in enumerate(parts):
+            if self._stop.is_set():
+                break
+            parent_conn, child_conn = self._ctx.Pipe(duplex=False)
+            process = self._ctx.Process(
+                target=_worker_main, name=f"wamp-carga-{index}", daemon=True,
+                args=(index, self.targets, content, part.to_config(), acknowledge,
+                      dict(realm_serializers), latency_probe.enabled, self._stop, child_conn))
+            try:
+                process.start()
+            except Exception as e:
+                parent_conn.close()
+                child_conn.close()
+                self.errors.append(f"Proceso {index}: no se pudo iniciar ({e})")
+                continue
+            child_conn.close()
+            self._processes.append(process)
+            conns[parent_conn] = index
+        self.workers = len(self._processes)
+        print(f"Carga iniciada en {self.workers} procesos: {self.topic} ({self.profile.rate:.0f} msgs/s en total)")
+        return conns
+
+    def _run(self, content, parts, acknowledge):
+        self._read(self._spawn(content, parts, acknowledge))
+
+    def stop(self):
+        self._stop.set()
+
+    def is_stopped(self):
+        return self._stop.is_set()
+
+    def done(self):
+        return self.future.done()
+
+    async def wait(self):
+        """
+        Espera el final desde un bucle asyncio; si se cancela, detiene los procesos.
+        """
+        try:
+            return await asyncio.wrap_future(self.future)
+        except asyncio.CancelledError:
+            self.stop()
+            raise
+
+    def _read(self, conns):
+        pending = dict(conns)
+        while pending:
+            for conn in multiprocessing.connection.wait(list(pending)):
+                index = pending[conn]
+                try:
+                    kind, _, parts, error = conn.recv()
+                except EOFError:
+                    kind, parts, error = "done", None, "el proceso terminó inesperadamente"
+                if parts:
+                    self._parts[index] = parts
+                    self._update()
+                if kind == "done":
+                    del pending[conn]
+                    conn.close()
+                    if error:
+                        self.errors.append(f"Proceso {index}: {error}")
+        for process in self._processes:
+            process.join()
+        self._finish()
+
+    def _update(self):
+        parts = list(self._parts.values())
+        for target, stats in self.target_stats.items():
+            stats.set_totals([p[target] for p in parts if target in p])
+        self.stats.set_totals([s for p in parts for s in p.values()])
+
+    def _finish(self):
+        # Los procesos que murieron sin informar no deben dejar la ejecución abierta
+        now = time.monotonic()
+        for stats in [self.stats] + list(self.target_stats.values()):
+            if stats.finished is None:
+                stats.finished = now
+        print(f"Carga finalizada en {self.workers} procesos:", self.stats.summary())
+        if self.errors and not self.stats.sent:
+            self.future.set_exception(RuntimeError("; ".join(self.errors)))
+        else:
+            self.future.set_result(self.stats)